@@ -0,0 +1,168 @@
+'''Core operation benchmarks
+
+Installs generated mod archives into a synthetic game and times fetching, installing, enabling, disabling,
+reinstalling and uninstalling them and reading and writing the mod list at 10, 100 and 1,000 mods.
+Installs, reinstalls and uninstalls are batched like in the mod manager, the batch commits are timed separately.
+The results can be saved as a baseline and later runs compared against it.
+
+Usage: python -m benchmarks.core [--sizes 10,100,1000] [--save FILE] [--compare FILE] [--tolerance 0.5]
+'''
+# pylint: disable=invalid-name,missing-docstring
+
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from time import perf_counter
+from typing import Callable, Dict, List
+
+from benchmarks.gametree import makeGame, makeModArchive
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'core_baseline.json')
+OPERATIONS = (
+    'fetchModFromDirectory', 'installMod', 'install commit', 'Model.write', 'Model.reload',
+    'Mod.disable', 'Mod.enable', 'reinstallMod', 'reinstall commit', 'uninstallMod', 'uninstall commit')
+
+
+class Timings:
+    '''Collects the durations of every call of each operation'''
+
+    def __init__(self):
+        self.durations: Dict[str, List[float]] = {}
+
+    def time(self, operation: str, call: Callable, *args):
+        start = perf_counter()
+        result = call(*args)
+        self.durations.setdefault(operation, []).append(perf_counter() - start)
+        return result
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {operation: {'count': len(durations), 'total': sum(durations), 'mean': sum(durations) / len(durations),
+                            'max': max(durations)}
+                for operation, durations in self.durations.items()}
+
+
+def runSize(mods: int, seed: int) -> Dict[str, Dict[str, float]]:
+    '''Runs every operation on a fresh game with the given number of mods'''
+    from src.configuration.config import Configuration
+    from src.core.fetcher import fetchModFromDirectory
+    from src.core.installer import Installer
+    from src.core.model import Model
+    from src.core.policy import ConflictPolicy
+    from src.globals import data
+
+    root = tempfile.mkdtemp(prefix='w3mm-core-')
+    timings = Timings()
+    try:
+        tree = makeGame(root, 0, seed)
+        archives = [makeModArchive(root + '/archives', index, dlcs=1 if index % 10 == 0 else 0, seed=seed)
+                    for index in range(mods)]
+        with redirect_stdout(io.StringIO()):
+            data.config = Configuration(tree.documents, tree.exe, tree.config)
+
+            for archive in archives:
+                source = root + '/sources/' + os.path.splitext(os.path.basename(archive))[0]
+                shutil.unpack_archive(archive, root + '/sources')
+                timings.time('fetchModFromDirectory', fetchModFromDirectory, source)
+
+            model = Model(ignorelock=True)
+            policy = ConflictPolicy()
+            policy.unattended = True
+            installer = Installer(model, ask=False, policy=policy)
+
+            installer.beginBatch()
+            for archive in archives:
+                timings.time('installMod', installer.installMod, archive)
+            timings.time('install commit', installer.commitBatch)
+
+            for _ in range(3):
+                timings.time('Model.write', model.write)
+                timings.time('Model.reload', model.reload)
+
+            installed = list(model.all())
+            for mod in installed:
+                timings.time('Mod.disable', mod.disable)
+            for mod in installed:
+                timings.time('Mod.enable', mod.enable)
+
+            installer.beginBatch()
+            for mod in installed:
+                timings.time('reinstallMod', installer.reinstallMod, mod)
+            timings.time('reinstall commit', installer.commitBatch)
+
+            installer.beginBatch()
+            for mod in installed:
+                timings.time('uninstallMod', installer.uninstallMod, mod)
+            timings.time('uninstall commit', installer.commitBatch)
+            model.write()
+        if len(installed) != mods:
+            raise RuntimeError(f"installed {len(installed)} of {mods} generated mods")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    return timings.summary()
+
+
+def compare(results: Dict[str, Dict[str, Dict[str, float]]], baseline: Dict[str, Dict[str, Dict[str, float]]],
+            tolerance: float) -> List[str]:
+    '''Returns the operations whose mean duration exceeds the baseline by more than the tolerance'''
+    regressions = []
+    for size, operations in results.items():
+        for operation, measured in operations.items():
+            expected = baseline.get(size, {}).get(operation)
+            if expected and measured['mean'] > expected['mean'] * (1 + tolerance):
+                regressions.append(f"{operation} at {size} mods: {measured['mean'] * 1000:.2f}ms, "
+                                   f"baseline {expected['mean'] * 1000:.2f}ms")
+    return regressions
+
+
+def saveAndCompare(results: Dict[str, Dict[str, Dict[str, float]]], save: str, baselinePath: str,
+                   tolerance: float, **meta) -> int:
+    '''Saves the results as baseline and compares them with a saved baseline when the paths are given.
+    Returns the exit code, 1 if there are regressions or the baseline is missing'''
+    if save:
+        with open(save, 'w', encoding='utf-8') as file:
+            json.dump({**meta, 'results': results}, file, indent=2)
+        print(f"saved baseline to {save}")
+    if baselinePath:
+        if not os.path.isfile(baselinePath):
+            print(f"no baseline at {baselinePath}, save one with --save")
+            return 1
+        with open(baselinePath, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)['results']
+        regressions = compare(results, baseline, tolerance)
+        for regression in regressions:
+            print(f"regression: {regression}")
+        if regressions:
+            return 1
+        print(f"no regressions against {baselinePath}")
+    return 0
+
+
+def main() -> int:
+    parser = ArgumentParser(description="core operation benchmarks")
+    parser.add_argument("--sizes", default="10,100,1000", help="comma separated numbers of mods")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the generated mods")
+    parser.add_argument("--save", nargs='?', const=BASELINE, default="", help="save the results as baseline")
+    parser.add_argument("--compare", nargs='?', const=BASELINE, default="", help="compare with a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed slowdown against the baseline")
+    args = parser.parse_args()
+
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for size in (int(size) for size in args.sizes.split(',') if size):
+        results[str(size)] = runSize(size, args.seed)
+        print(f"{size} mods:")
+        for operation in OPERATIONS:
+            if operation in results[str(size)]:
+                measured = results[str(size)][operation]
+                print(f"  {operation:<22} {measured['count']:6} calls  total {measured['total'] * 1000:10.1f}ms  "
+                      f"mean {measured['mean'] * 1000:9.2f}ms")
+
+    return saveAndCompare(results, args.save, args.compare, args.tolerance, seed=args.seed)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
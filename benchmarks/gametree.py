@@ -0,0 +1,104 @@
+'''Synthetic game, documents and configuration folders for benchmarks'''
+# pylint: disable=invalid-name,missing-docstring
+
+import os
+import random
+import shutil
+import xml.etree.ElementTree as XML
+from base64 import b64encode
+from types import SimpleNamespace
+
+INPUT_XML = '<?xml version="1.0" encoding="UTF-16"?>\n<UserConfig>\n<!-- [BASE_CharacterMovement] -->\n</UserConfig>\n'
+HIDDEN_XML = '<?xml version="1.0" encoding="UTF-16"?>\n<UserConfig>\n<VisibleVars>\n</VisibleVars>\n</UserConfig>\n'
+README = "This mod changes a few things.\nInstall it with the mod manager and run Script Merger afterwards.\n" * 20
+
+
+def writeFile(filename: str, content: bytes) -> None:
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    with open(filename, 'wb') as file:
+        file.write(content)
+
+
+def makeGame(root: str, mods: int = 500, seed: int = 0) -> SimpleNamespace:
+    '''Creates a game folder with installed mods, a documents folder and a configuration
+    folder with the matching installed.xml below root'''
+    rng = random.Random(seed)
+    tree = SimpleNamespace(
+        game=root + '/game',
+        exe=root + '/game/bin/x64/witcher3.exe',
+        mods=root + '/game/Mods',
+        dlc=root + '/game/DLC',
+        menu=root + '/game/bin/config/r4game/user_config_matrix/pc',
+        documents=root + '/documents',
+        settings=root + '/documents/The Witcher 3',
+        config=root + '/config',
+        names=[])
+    writeFile(tree.exe, b'')
+    writeFile(tree.game + '/content/content0/texture.cache', b'\0' * 4096)
+    writeFile(tree.dlc + '/dlc1/content/blob0.bundle', b'\0' * 4096)
+    os.makedirs(tree.mods, exist_ok=True)
+    os.makedirs(tree.dlc, exist_ok=True)
+    os.makedirs(tree.config, exist_ok=True)
+    writeFile(tree.menu + '/input.xml', INPUT_XML.encode('utf-16'))
+    writeFile(tree.menu + '/hidden.xml', HIDDEN_XML.encode('utf-16'))
+    for filelist in ('dx11filelist.txt', 'dx12filelist.txt'):
+        writeFile(tree.menu + '/' + filelist, 'audio.xml;\ngameplay.xml;\n'.encode('utf-16'))
+    writeFile(tree.settings + '/user.settings', b'[Gameplay]\nEnableUberMovement=1\n\n[Rendering]\nMaxFPS=60\n')
+    writeFile(tree.settings + '/input.settings', b'[Exploration]\nIK_W=(Action=MoveForward)\n')
+
+    installed = XML.Element('installed')
+    modsSettings = []
+    for index in range(mods):
+        name = f'Benchmark Mod {index:04}'
+        folder = f'modBench{index:04}'
+        tree.names.append(name)
+        for part in range(rng.randint(1, 4)):
+            writeFile(f'{tree.mods}/{folder}/content/scripts/local/part{part}.ws',
+                      b'// script\n' * rng.randint(10, 2000))
+        writeFile(f'{tree.mods}/{folder}/content/blob0.bundle', os.urandom(rng.randint(1024, 64 * 1024)))
+        elem = XML.SubElement(installed, 'mod')
+        elem.set('name', name)
+        elem.set('enabled', 'True')
+        elem.set('date', '2024-01-01 00:00:00')
+        elem.set('priority', str(index % 10) if index % 3 == 0 else '-')
+        elem.set('dlcscheme', 'folder')
+        XML.SubElement(elem, 'data').text = folder
+        for key in range(rng.randint(0, 12)):
+            ky = XML.SubElement(elem, 'key')
+            ky.text = f'IK_F{key + 1}=(Action=BenchmarkAction{index}_{key})'
+            ky.set('context', '[Exploration]')
+        readme = XML.SubElement(elem, 'readmeb64')
+        readme.text = b64encode(README.encode('utf-8')).decode('ascii')
+        if index % 3 == 0:
+            modsSettings.append(f'[{folder}]\nEnabled=1\nPriority={index % 10}\n')
+    XML.ElementTree(installed).write(tree.config + '/installed.xml', encoding='utf-8')
+    writeFile(tree.settings + '/mods.settings', '\n'.join(modsSettings).encode('utf-8'))
+    return tree
+
+
+def makeModArchive(folder: str, index: int, files: int = 4, size: int = 16 * 1024, keys: int = 8,
+                   usersettings: int = 2, dlcs: int = 0, seed: int = 0) -> str:
+    '''Creates a zip archive of a mod with one data folder holding files of about size bytes each,
+    keys input keys and usersettings user settings in its readme-style settings file and dlcs dlc folders.
+    Returns the path of the archive'''
+    rng = random.Random(seed * 100003 + index)
+    name = f'Generated Mod {index:04}'
+    source = f'{folder}/source/{name}'
+    data = f'{source}/modGenerated{index:04}/content'
+    for file in range(files):
+        if file % 2:
+            writeFile(f'{data}/scripts/local/generated{file}.ws', b'// script\n' * max(1, size // 10))
+        else:
+            writeFile(f'{data}/blob{file}.bundle', rng.randbytes(size))
+    for dlc in range(dlcs):
+        writeFile(f'{source}/dlc/dlcgenerated{index:04}{dlc}/content/blob0.bundle', rng.randbytes(size))
+    settings = '[Exploration]\n' + ''.join(
+        f'IK_F{key % 12 + 1}=(Action=GeneratedAction{index}_{key})\n' for key in range(keys))
+    if usersettings:
+        settings += f'\n[Generated{index:04}]\n' + ''.join(
+            f'Setting{setting}=1\n' for setting in range(usersettings))
+    writeFile(f'{source}/settings.txt', settings.encode('utf-8'))
+    writeFile(f'{source}/readme.txt', README.encode('utf-8'))
+    archive = shutil.make_archive(f'{folder}/{name}', 'zip', f'{folder}/source', name)
+    shutil.rmtree(source)
+    return archive
@@ -0,0 +1,146 @@
+'''Mod list refresh benchmarks
+
+Runs the main widget under Qt's offscreen platform against a synthetic game with installed mods and times
+refreshing the mod list and the load order, typing a search, changing the sort column and toggling mods.
+Every duration includes processing the events queued by the operation, like the repaint of the lists,
+so it is the time the window stays blocked. Calls blocking longer than a frame are counted separately.
+
+Usage: python -m benchmarks.gui [--sizes 100,1000] [--repeat N] [--save FILE] [--compare FILE] [--tolerance 0.5]
+'''
+# pylint: disable=invalid-name,missing-docstring
+
+import io
+import os
+import shutil
+import sys
+import tempfile
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from time import monotonic
+from typing import Callable, Dict
+
+from benchmarks.core import Timings, saveAndCompare
+from benchmarks.gametree import makeGame
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gui_baseline.json')
+FRAME = 1 / 60
+SEARCHES = ('Benchmark Mod 0042', 'key:IK_F3', 'data:modbench01')
+OPERATIONS = ('refreshList', 'refreshLoadOrder', 'search keystroke', 'sort column', 'toggle')
+
+
+def blocking(app, call: Callable, *args) -> Callable[[], None]:
+    '''Wraps call so it also processes the events it queued, like repaints'''
+    def run():
+        call(*args)
+        app.processEvents()
+    return run
+
+
+def settle(app, widget, timeout: float = 60.0) -> None:
+    '''Processes events until the sizes of all mods are computed, so the size worker doesn't skew the timings'''
+    deadline = monotonic() + timeout
+    while monotonic() < deadline and any(widget.model.sizes.total(mod.files) is None for mod in widget.model.all()):
+        app.processEvents()
+    app.processEvents()
+
+
+def runSize(app, mods: int, repeat: int, seed: int) -> Dict[str, Dict[str, float]]:
+    '''Times the refresh operations of a main widget showing the given number of mods'''
+    from PySide2.QtCore import Qt
+
+    from src.configuration.config import Configuration
+    from src.core.model import Model
+    from src.globals import data
+    from src.gui.main_widget import CustomMainWidget
+    from src.gui.main_window import CustomMainWindow
+    from src.gui.mod_list import COLUMN_COUNT, COLUMN_ENABLED
+
+    root = tempfile.mkdtemp(prefix='w3mm-gui-')
+    timings = Timings()
+    try:
+        tree = makeGame(root, mods, seed)
+        with redirect_stdout(io.StringIO()):
+            data.config = Configuration(tree.documents, tree.exe, tree.config)
+            # the script merger reminder after toggles would block on a message box
+            data.config.allowpopups = '0'
+            mainWindow = CustomMainWindow()
+            widget = CustomMainWidget(mainWindow, Model(ignorelock=True))
+            mainWindow.show()
+            widget.loadOrderTimer.stop()
+            widget.applyLoadOrder()
+            settle(app, widget)
+
+            def applyLoadOrder(folders=None, reload=False):
+                # the load order is applied by a timer, apply it right away to include it in the duration
+                widget.refreshLoadOrder(folders, reload)
+                widget.loadOrderTimer.stop()
+                widget.applyLoadOrder()
+
+            for _ in range(repeat):
+                timings.time('refreshList', blocking(app, widget.updateList))
+                timings.time('refreshLoadOrder', blocking(app, applyLoadOrder, None, True))
+
+            for query in SEARCHES:
+                for length in range(1, len(query) + 1):
+                    timings.time('search keystroke', blocking(app, widget.searchWidget.setText, query[:length]))
+                for length in range(len(query) - 1, -1, -1):
+                    timings.time('search keystroke', blocking(app, widget.searchWidget.setText, query[:length]))
+
+            for column in range(COLUMN_COUNT):
+                for order in (Qt.AscendingOrder, Qt.DescendingOrder):
+                    timings.time('sort column', blocking(app, widget.treeWidget.sortByColumn, column, order))
+            widget.treeWidget.sortByColumn(1, Qt.AscendingOrder)
+
+            rows = widget.modList.rowCount()
+            sample = sorted(set(row * rows // min(rows, repeat) for row in range(min(rows, repeat))))
+            names = [widget.modList.mod(row).name for row in sample]
+            for state in (Qt.Unchecked, Qt.Checked):
+                for name in names:
+                    index = widget.modList.index(widget.modList.row(name), COLUMN_ENABLED)
+                    timings.time('toggle', blocking(app, widget.modList.setData, index, state, Qt.CheckStateRole))
+                    widget.loadOrderTimer.stop()
+                    widget.applyLoadOrder()
+                    app.processEvents()
+
+            mainWindow.close()
+            mainWindow.deleteLater()
+            app.processEvents()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    summary = timings.summary()
+    for operation, durations in timings.durations.items():
+        summary[operation]['frames'] = sum(1 for duration in durations if duration > FRAME)
+    return summary
+
+
+def main() -> int:
+    parser = ArgumentParser(description="mod list refresh benchmarks")
+    parser.add_argument("--sizes", default="100,1000", help="comma separated numbers of mods")
+    parser.add_argument("--repeat", type=int, default=20, help="number of refreshes and toggled mods")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the generated mods")
+    parser.add_argument("--save", nargs='?', const=BASELINE, default="", help="save the results as baseline")
+    parser.add_argument("--compare", nargs='?', const=BASELINE, default="", help="compare with a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed slowdown against the baseline")
+    args = parser.parse_args()
+
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PySide2.QtWidgets import QApplication
+    from src.globals import data
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    data.app = app
+
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for size in (int(size) for size in args.sizes.split(',') if size):
+        results[str(size)] = runSize(app, size, args.repeat, args.seed)
+        print(f"{size} mods:")
+        for operation in OPERATIONS:
+            if operation in results[str(size)]:
+                measured = results[str(size)][operation]
+                print(f"  {operation:<17} {measured['count']:5} calls  mean {measured['mean'] * 1000:8.2f}ms  "
+                      f"max {measured['max'] * 1000:8.2f}ms  {measured['frames']:5} over a frame")
+
+    return saveAndCompare(results, args.save, args.compare, args.tolerance, seed=args.seed, repeat=args.repeat)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+'''Memory budget benchmark
+
+Loads the mod list of a synthetic game with installed mods under tracemalloc and compares the memory held
+by the model, and by the search index and mod list rows built on top of it, per 100 mods with the budgets
+in memory_budget.json.
+
+Usage: python -m benchmarks.memory [--sizes 100,1000] [--report FILE]
+'''
+# pylint: disable=invalid-name,missing-docstring
+
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import tracemalloc
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from typing import Any, Dict, List, Tuple
+
+from benchmarks.gametree import makeGame
+from src.util.profiling import MemoryProfile
+
+BUDGETS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'memory_budget.json')
+STAGES = ('Model.reload', 'search index and rows')
+
+
+def measure(mods: int, seed: int) -> Tuple[Dict[str, float], List[Dict[str, Any]]]:
+    '''Returns the traced bytes per 100 mods held after each stage and the memory profile reports'''
+    from src.configuration.config import Configuration
+    from src.core.model import Model
+    from src.core.snapshot import ModRow
+    from src.globals import data
+
+    root = tempfile.mkdtemp(prefix='w3mm-memory-')
+    profile = MemoryProfile()
+    profile.enabled = True
+    profile.output = os.devnull
+    try:
+        tree = makeGame(root, mods, seed)
+        with redirect_stdout(io.StringIO()):
+            data.config = Configuration(tree.documents, tree.exe, tree.config)
+            profile.start()
+            baseline = profile.snapshot(f"setup of {mods} mods")
+            model = Model(ignorelock=True)
+            loaded = profile.snapshot("Model.reload")
+            rows = [ModRow.fromMod(mod, model.sizes) for mod in model.all()]
+            if model.search.search('key:IK_F1') is None:
+                raise RuntimeError("search index could not be built")
+            indexed = profile.snapshot("search index and rows")
+        if len(rows) != mods:
+            raise RuntimeError(f"loaded {len(rows)} of {mods} mods")
+        return {stage: (snapshot['current'] - baseline['current']) * 100 / mods
+                for stage, snapshot in zip(STAGES, (loaded, indexed))}, profile.reports
+    finally:
+        tracemalloc.stop()
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main() -> int:
+    parser = ArgumentParser(description="memory budget benchmark")
+    parser.add_argument("--sizes", default="", help="comma separated numbers of mods, defaults to the budget file")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the generated mods")
+    parser.add_argument("--report", default="", help="write the allocation sites and object counts to this file")
+    args = parser.parse_args()
+
+    with open(BUDGETS, 'r', encoding='utf-8') as file:
+        budgets = json.load(file)
+    sizes = [int(size) for size in args.sizes.split(',') if size] if args.sizes else budgets['mods']
+
+    failed = False
+    reports: List[Dict[str, Any]] = []
+    for size in sizes:
+        measured, profile = measure(size, args.seed)
+        reports.extend(profile)
+        print(f"{size} mods, per 100 mods:")
+        for stage, value in measured.items():
+            budget = budgets['per100mods'][stage] * 1048576
+            failed = failed or value > budget
+            print(f"  {stage:<22} {value / 1048576:6.2f} MB  budget {budget / 1048576:6.2f} MB  "
+                  f"{'ok' if value <= budget else 'over budget'}")
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as file:
+            file.write('\n'.join(MemoryProfile.format(report) for report in reports))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
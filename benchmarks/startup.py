@@ -0,0 +1,113 @@
+'''Cold start benchmark
+
+Starts the manager with --startup-profile against a synthetic game with installed mods, waits for the
+startup timeline and compares the time to the first paint and to the complete startup with the targets
+in startup_target.json. Runs once without and once with a mod list snapshot.
+
+Usage: python -m benchmarks.startup [--runs N] [--mods N] [--json FILE]
+'''
+# pylint: disable=invalid-name,missing-docstring
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from statistics import median
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+from benchmarks.gametree import makeGame
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TARGETS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'startup_target.json')
+METRICS = ('first paint', 'startup complete')
+
+
+def writeSnapshot(tree: SimpleNamespace, config: str) -> None:
+    '''Writes the snapshot the manager would have written on its last exit'''
+    from src.core.snapshot import ModRow, writeSnapshot as write
+    from src.globals import data
+    data.config = SimpleNamespace(configuration=config)
+    write(ModRow(name, True, '-', (1, 0, 0, 0, 0, 0), False, None, '2024-01-01 00:00:00') for name in tree.names)
+
+
+def runOnce(tree: SimpleNamespace, snapshot: bool, timeout: float) -> Optional[Dict[str, float]]:
+    '''Starts the manager with a fresh copy of the configuration and returns the timeline marks in seconds'''
+    work = tempfile.mkdtemp(prefix='w3mm-startup-')
+    try:
+        config = work + '/config'
+        shutil.copytree(tree.config, config)
+        if snapshot:
+            writeSnapshot(tree, config)
+        profile = work + '/profile.json'
+        env = dict(os.environ)
+        env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        process = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, 'main.py'), '--startup-profile', profile,
+             '-u', tree.documents, '-g', tree.exe, '-c', config],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + timeout
+        while not os.path.isfile(profile) and process.poll() is None and time.monotonic() < deadline:
+            time.sleep(0.05)
+        process.kill()
+        process.wait()
+        if not os.path.isfile(profile):
+            return None
+        with open(profile, 'r', encoding='utf-8') as file:
+            timeline = json.load(file)
+        return {phase['name']: phase['end'] for phase in timeline['phases'] if phase['name'] in METRICS}
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def main() -> int:
+    parser = ArgumentParser(description="cold start benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="number of runs per mode")
+    parser.add_argument("--mods", type=int, default=0, help="number of installed mods, defaults to the target file")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for a single startup")
+    parser.add_argument("--json", default="", help="write the results to this file")
+    args = parser.parse_args()
+
+    with open(TARGETS, 'r', encoding='utf-8') as file:
+        targets = json.load(file)
+    mods = args.mods or targets['mods']
+
+    root = tempfile.mkdtemp(prefix='w3mm-game-')
+    results: Dict[str, Dict[str, float]] = {}
+    failed = False
+    try:
+        tree = makeGame(root, mods)
+        for mode, snapshot in (('cold', False), ('snapshot', True)):
+            runs: List[Dict[str, float]] = []
+            for _ in range(args.runs):
+                marks = runOnce(tree, snapshot, args.timeout)
+                if marks is None:
+                    print(f"{mode}: the manager did not finish starting within {args.timeout}s")
+                    return 1
+                runs.append(marks)
+            results[mode] = {metric: median(run[metric] for run in runs) for metric in METRICS}
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    print(f"startup with {mods} mods, median of {args.runs} runs:")
+    for mode, measured in results.items():
+        for metric, value in measured.items():
+            target = targets['targets'][mode].get(metric)
+            verdict = ''
+            if target is not None:
+                verdict = 'ok' if value <= target else 'over target'
+                failed = failed or value > target
+            print(f"  {mode:<9} {metric:<17} {value * 1000:8.1f}ms  target {target * 1000 if target else 0:8.1f}ms  "
+                  f"{verdict}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({'mods': mods, 'runs': args.runs, 'results': results}, file, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
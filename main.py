@@ -7,15 +7,26 @@ from os import environ
 
 if __name__ == "__main__":
     try:
-        from PySide2.QtWidgets import QApplication, QMessageBox
+        from src.util.profiling import MEMORY, TIMELINE, TRACER
 
-        from src.configuration.config import Configuration
-        from src.core.model import Model
-        from src.globals import data
-        from src.gui.alerts import *
-        from src.gui.main_widget import CustomMainWidget
-        from src.gui.main_window import CustomMainWindow
-        from src.util.util import *
+        # enabled before parsing the arguments to include the imports
+        TIMELINE.enabled = any(arg.startswith("--startup-profile") for arg in sys.argv)
+        MEMORY.enabled = any(arg.startswith("--memory-profile") for arg in sys.argv)
+        MEMORY.start()
+
+        with TIMELINE.phase("import Qt"):
+            from PySide2.QtCore import QTimer
+            from PySide2.QtWidgets import QApplication, QMessageBox
+
+        with TIMELINE.phase("import manager"):
+            from src.configuration.config import Configuration
+            from src.core.model import Model
+            from src.core.snapshot import readSnapshot, writeSnapshot
+            from src.globals import data
+            from src.gui.alerts import *
+            from src.gui.main_widget import CustomMainWidget
+            from src.gui.main_window import CustomMainWindow
+            from src.util.util import *
 
         # correct screen scaling
         if "QT_DEVICE_PIXEL_RATIO" in environ:
@@ -33,6 +44,16 @@ if __name__ == "__main__":
             parser.add_argument(
                 "-v", "--version", dest="version", action="store_true", default=False,
                 help="show version information and exit")
+            parser.add_argument(
+                "--startup-profile", dest="startupprofile", nargs="?", const="-", default="", metavar="FILE",
+                help="print a timeline of the startup phases, or write it to FILE as JSON")
+            parser.add_argument(
+                "--memory-profile", dest="memoryprofile", nargs="?", const="-", default="", metavar="FILE",
+                help="report the top allocation sites and object counts after loading and each operation, "
+                     "or write them to FILE")
+            parser.add_argument(
+                "--trace", dest="trace", type=str, default="", metavar="FILE",
+                help="record the duration of operations and write them to FILE as Chrome trace")
             dirs = parser.add_argument_group(
                 title='start overrides'
             )
@@ -53,43 +74,65 @@ if __name__ == "__main__":
             documentsPath = args.userdocuments
             gamePath = args.game
             configPath = args.config
+            TIMELINE.output = args.startupprofile
+            TRACER.enabled = bool(args.trace)
+            MEMORY.output = args.memoryprofile
+            TRACER.output = args.trace
         except Exception as e:
             print(str(e))
 
-        data.app = QApplication(sys.argv)
-        data.config = Configuration(documentsPath, gamePath, configPath)
-        translateToChosenLanguage()
+        with TIMELINE.phase("application"):
+            data.app = QApplication(sys.argv)
+        with TIMELINE.phase("configuration"):
+            data.config = Configuration(documentsPath, gamePath, configPath)
+        with TIMELINE.phase("translation"):
+            translateToChosenLanguage()
 
         if not Configuration.getCorrectGamePath(data.config.gameexe):
             if not reconfigureGamePath():
                 sys.exit(1)
 
-        try:
-            modModel = Model()
-        except IOError as err:
-            print(err, file=sys.stderr)
-            if MessageAlertOtherInstance() == QMessageBox.Yes:
-                modModel = Model(ignorelock=True)
-            else:
+        # with a snapshot of the last list the mods are read in the background after the window is shown
+        with TIMELINE.phase("snapshot"):
+            snapshot = readSnapshot()
+        with TIMELINE.phase("model"):
+            try:
+                modModel = Model(load=snapshot is None)
+            except IOError as err:
+                print(err, file=sys.stderr)
+                if MessageAlertOtherInstance() == QMessageBox.Yes:
+                    modModel = Model(ignorelock=True, load=snapshot is None)
+                else:
+                    sys.exit(1)
+            except Exception as e:
+                MessageInitializationFailed(formatUserError(e))
                 sys.exit(1)
-        except Exception as e:
-            MessageInitializationFailed(formatUserError(e))
-            sys.exit(1)
 
-        fixUserSettingsDuplicateBrackets()
+        if snapshot is None:
+            with TIMELINE.phase("user.settings fix"):
+                fixUserSettingsDuplicateBrackets()
 
-        mainWindow = CustomMainWindow()
-        mainWidget = CustomMainWidget(mainWindow, modModel)
-        mainWindow.dropCallback = mainWidget.installModFiles
-        data.app.setWindowIcon(getIcon("w3a.ico"))
+        with TIMELINE.phase("main window"):
+            mainWindow = CustomMainWindow()
+            mainWidget = CustomMainWidget(mainWindow, modModel, snapshot)
+            mainWindow.dropCallback = mainWidget.installModFiles
+            data.app.setWindowIcon(getIcon("w3a.ico"))
 
-        mainWindow.show()
+        with TIMELINE.phase("show"):
+            mainWindow.show()
+        # runs once the event loop processed the first paint
+        QTimer.singleShot(0, mainWidget.firstShown)
 
         ret = data.app.exec_()
+        mainWidget.stallMonitor.stop()
+        mainWidget.changeFeed.stop()
         data.config.saveWindowSettings(mainWidget, mainWindow)
         data.config.write_priority().join()
         data.config.write_config().join()
-        modModel.write()
+        if modModel.loaded:
+            modModel.write()
+            writeSnapshot(mainWidget.modList.modRows())
+        TRACER.finish()
 
         sys.exit(ret)
 
@@ -31,6 +31,7 @@ class Configuration:
 
     configLastWritten: configparser.ConfigParser = None  # type: ignore
     priorityLastWritten: configparser.ConfigParser = None  # type: ignore
+    priorityStamp: str = ''
 
     def __init__(self, documentsPath: str = '', gamePath: str = '', configPath: str = ''):
 
@@ -85,13 +86,14 @@ class Configuration:
         if gamePath:
             correctGamePath = self.getCorrectGamePath(gamePath)
             if correctGamePath:
-                self.game = correctGamePath
+                self.set('PATHS', 'gameexe', correctGamePath, False)
             else:
                 print(
                     f'game path override {gamePath} is invalid, starting with existing configuration')
 
         self._DLC = None
         self._MODS = None
+        self._DISABLEDDLC = None
 
         if not self.get('PATHS', 'scriptmerger'):
             self.set('PATHS', 'scriptmerger', '', False)
@@ -116,6 +118,21 @@ class Configuration:
                     MessageAlertReadingConfigINI(file, e)
             else:
                 print("mods.settings not found, creating new file")
+            self.priorityStamp = self.getPriorityStamp()
+
+    def getPriorityStamp(self) -> str:
+        try:
+            stat = os.stat(self.__userSettingsPath + '/mods.settings')
+            return f'{stat.st_size}:{stat.st_mtime_ns}'
+        except OSError:
+            return ''
+
+    def readPriorityIfChanged(self) -> bool:
+        '''Reads mods.settings only if it was changed since it was last read or written by the manager'''
+        if self.getPriorityStamp() == self.priorityStamp:
+            return False
+        self.readPriority()
+        return True
 
     def readConfig(self):
         print(f"reading config.ini from {self.__configPath + '/config.ini'}")
@@ -161,6 +178,7 @@ class Configuration:
                     priority.write(file, space_around_delimiters)
                     file.flush()
                     os.fsync(file.fileno())
+                self.priorityStamp = self.getPriorityStamp()
             self.priorityLastWritten = deepcopy(self.priority)
 
     def get(self, section: str, option: str):
@@ -188,10 +206,11 @@ class Configuration:
             self.priority.set(section, 'enabled', '1')
         self.priority.set(section, 'priority', option)
 
-    def removePriority(self, section: str):
+    def removePriority(self, section: str, write: bool = True):
         if self.priority.has_section(section):
             self.priority.remove_section(section)
-        self.write_priority()
+        if write:
+            self.write_priority()
 
     def getWindowSection(self, section: str, prefix: str = ''):
         value = self.get('WINDOW', prefix+'section'+str(section))
@@ -233,6 +252,7 @@ class Configuration:
         self.set('PATHS', 'gameexe', gameexe)
         self._MODS = None
         self._DLC = None
+        self._DISABLEDDLC = None
 
     @property
     def game(self):
@@ -271,6 +291,27 @@ class Configuration:
     def language(self, value):
         self.set('SETTINGS', 'language', value)
 
+    @property
+    def maxconfigfilesize(self) -> int:
+        '''Size cap in bytes for text files searched for settings, configured in KB'''
+        value = self.get('SETTINGS', 'MaxConfigFileSize')
+        return int(value) * 1024 if value and value.isdecimal() else 1024 * 1024
+
+    @property
+    def stallthreshold(self) -> int:
+        '''Milliseconds the GUI thread has to be blocked for a stall to be logged, 0 disables the stall monitor'''
+        value = self.get('SETTINGS', 'StallThreshold')
+        return int(value) if value and value.isdecimal() else 500
+
+    @property
+    def usersettingsstamp(self) -> str:
+        '''Content stamp (size:mtime:sha1) of the last user.settings verified to have no duplicate brackets'''
+        return self.get('SETTINGS', 'UserSettingsStamp') or ''
+
+    @usersettingsstamp.setter
+    def usersettingsstamp(self, value: str):
+        self.set('SETTINGS', 'UserSettingsStamp', value)
+
     @property
     def lastpath(self):
         return self.get('PATHS', 'lastpath')
@@ -297,6 +338,17 @@ class Configuration:
         self._DLC = self.verifyInternalPath(self.game + '/DLC', create=True)
         return self._DLC
 
+    @property
+    def disableddlc(self):
+        '''Directory outside of DLC where disabled DLC folders are moved to.
+        It is only created when a dlc is disabled, until then the path doesn't exist'''
+        if self._DISABLEDDLC is not None:
+            return self._DISABLEDDLC
+        if not self.game:
+            return None
+        self._DISABLEDDLC = self.verifyInternalPath(self.game + '/DLC.disabled')
+        return self._DISABLEDDLC or path.abspath(self.game + '/DLC.disabled')
+
     @property
     def menu(self):
         return self.game and self.game + '/bin/config/r4game/user_config_matrix/pc'
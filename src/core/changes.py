@@ -0,0 +1,143 @@
+'''Filesystem change feed'''
+# pylint: disable=invalid-name,missing-docstring
+
+from dataclasses import dataclass
+from os import path
+from threading import Lock, Thread
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from PySide2.QtCore import QObject, QTimer, Signal
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+
+ROOT_MODS = 'mods'
+ROOT_DLC = 'dlc'
+ROOT_MENU = 'menu'
+ROOT_SETTINGS = 'settings'
+
+CHANGE_MOD_LISTING = 'mod-listing'
+CHANGE_MOD_CONTENT = 'mod-content'
+CHANGE_DLC = 'dlc'
+CHANGE_MENU = 'menu'
+CHANGE_SETTINGS = 'settings'
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    '''Invalidation event for an entry of a watched folder. For the Mods folder the name is the
+    top-level entry for listing changes and the data folder without the disabled ~ prefix for content changes'''
+
+    kind: str
+    name: str
+    path: str
+
+
+def classify(roots: List[Tuple[str, str]], eventPath: str) -> Optional[ChangeEvent]:
+    '''Maps a changed path to the event of the first watched folder containing it'''
+    for folder, root in roots:
+        relative = path.relpath(eventPath, folder)
+        if relative == '.' or relative.startswith('..'):
+            continue
+        parts = relative.replace('\\', '/').split('/')
+        entry = path.join(folder, parts[0])
+        if root == ROOT_MODS:
+            if len(parts) == 1:
+                return ChangeEvent(CHANGE_MOD_LISTING, parts[0], entry)
+            name = parts[0][1:] if parts[0].startswith('~') else parts[0]
+            return ChangeEvent(CHANGE_MOD_CONTENT, name, path.join(folder, name))
+        if len(parts) > 1:
+            return None
+        if root == ROOT_DLC:
+            return ChangeEvent(CHANGE_DLC, parts[0], entry)
+        if root == ROOT_MENU:
+            return ChangeEvent(CHANGE_MENU, parts[0], entry)
+        return ChangeEvent(CHANGE_SETTINGS, parts[0], entry)
+    return None
+
+
+class ChangeFeed(QObject):
+    '''Watches the Mods, DLC, menu and settings folders and publishes coalesced, typed
+    invalidation events to the subscribers on the GUI thread'''
+
+    received = Signal()
+
+    def __init__(self, interval: int = 250, parent=None):
+        super().__init__(parent)
+        self.roots: List[Tuple[str, str]] = []
+        self.pending: Set[ChangeEvent] = set()
+        self.lock = Lock()
+        self.subscribers: Dict[str, List[Callable[[List[ChangeEvent]], Any]]] = {}
+        self.handler = FileSystemEventHandler()
+        self.handler.on_any_event = self.onEvent
+        self.observer = Observer()
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.flush)
+        self.received.connect(self.schedule)
+
+    def watch(self, folder: Optional[str], root: str, recursive: bool = False) -> None:
+        if not folder or not path.isdir(folder):
+            print(f"not watching {root} folder {folder}")
+            return
+        folder = path.normpath(folder)
+        # nested folders have to be matched first. The list is replaced, not changed, as the observer thread reads it
+        self.roots = sorted(self.roots + [(folder, root)], key=lambda item: len(item[0]), reverse=True)
+        self.observer.schedule(self.handler, path=folder, recursive=recursive)
+
+    def clear(self) -> None:
+        '''Removes all watches and drops the pending events, like before watching the folders of another game'''
+        self.observer.unschedule_all()
+        self.roots = []
+        with self.lock:
+            self.pending = set()
+
+    def start(self) -> None:
+        # adding the recursive watches walks the whole Mods folder, so it is done off the GUI thread
+        Thread(target=self.observer.start, daemon=True).start()
+
+    def stop(self) -> None:
+        self.observer.stop()
+        if self.observer.is_alive():
+            self.observer.join()
+
+    def subscribe(self, kind: str, callback: Callable[[List[ChangeEvent]], Any]) -> None:
+        self.subscribers.setdefault(kind, []).append(callback)
+
+    def onEvent(self, event) -> None:
+        '''Collects the event on the observer thread'''
+        events = set()
+        for eventPath in (event.src_path, getattr(event, 'dest_path', '')):
+            if eventPath:
+                change = classify(self.roots, path.normpath(eventPath))
+                if change is not None:
+                    events.add(change)
+        if event.event_type == 'moved' and len(events) == 1 and next(iter(events)).kind == CHANGE_MOD_CONTENT:
+            # moves within the same data folder, like enabling or disabling it, keep its contents
+            return
+        if events:
+            with self.lock:
+                self.pending |= events
+            self.received.emit()
+
+    def schedule(self) -> None:
+        # the first event starts the timer, so a steady stream of events is still published regularly
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def flush(self) -> None:
+        with self.lock:
+            events = self.pending
+            self.pending = set()
+        self.publish(events)
+
+    def publish(self, events: Set[ChangeEvent]) -> None:
+        byKind: Dict[str, List[ChangeEvent]] = {}
+        for event in sorted(events, key=lambda event: (event.kind, event.name)):
+            byKind.setdefault(event.kind, []).append(event)
+        for kind, changes in byKind.items():
+            for callback in self.subscribers.get(kind, []):
+                try:
+                    callback(changes)
+                except Exception as err:  # pylint: disable=broad-except
+                    print(f"could not handle {kind} changes: {err}")
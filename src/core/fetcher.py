@@ -6,18 +6,21 @@ import subprocess
 from os import listdir, mkdir, path, walk
 from os.path import isfile, join
 from sys import platform
-from typing import List, Tuple
+from typing import Any, Callable, List, Tuple
 
 from src.domain.key import Key
 from src.domain.mod import Mod
 from src.domain.usersetting import Usersetting
 from src.globals import data
+from src.globals.constants import translate
 from src.util.util import (
     detectEncoding,
     getProgramRootFolder,
     normalizePath,
     removeDirectory,
+    sniffTextFile,
 )
+from src.util.profiling import traced
 
 XMLPATTERN = re.compile(r"<Var.+\/>", re.UNICODE)
 INPUTPATTERN = re.compile(
@@ -26,11 +29,11 @@ USERPATTERN = re.compile(r"(\[.*\]\s*(.*=(?!.*(\(|\))).*\s*)+)+", re.UNICODE)
 INPUT_XML_PATTERN = r'id="PCInput".+<!--\s*\[BASE_CharacterMovement\]\s*-->'
 
 
-def fetchMod(modPath: str) -> Tuple[Mod, List[str], List[str]]:
+def fetchMod(modPath: str, output: Callable[[str], Any] = lambda _: None) -> Tuple[Mod, List[str], List[str]]:
     if isArchive(modPath):
         modPath = extractArchive(modPath)
     if isValidModFolder(modPath):
-        return fetchModFromDirectory(modPath)
+        return fetchModFromDirectory(modPath, output)
     raise IOError(
         "Not detected as a valid mod (manual installation may be required)")
 
@@ -48,7 +51,8 @@ def isValidModFolder(modPath: str) -> bool:
     return False
 
 
-def fetchModFromDirectory(modPath: str) -> Tuple[Mod, List[str], List[str]]:
+@traced("fetchModFromDirectory", lambda modPath, *_: modPath)
+def fetchModFromDirectory(modPath: str, output: Callable[[str], Any] = lambda _: None) -> Tuple[Mod, List[str], List[str]]:
     mod = Mod(path.split(modPath)[1])
     mod_dirs: List[str] = []
     mod_xmls: List[str] = []
@@ -56,7 +60,7 @@ def fetchModFromDirectory(modPath: str) -> Tuple[Mod, List[str], List[str]]:
     for current_dir, _, _ in walk(modPath):
         if fetchDataIfRelevantFolder(current_dir, mod):
             mod_dirs.append(normalizePath(current_dir))
-        mod_xmls += fetchDataFromRelevantFiles(current_dir, mod)
+        mod_xmls += fetchDataFromRelevantFiles(current_dir, mod, output)
         mod_readmes.extend(fetchReadmes(current_dir))
     mod.readmes = mod_readmes
     return mod, mod_dirs, mod_xmls
@@ -110,13 +114,20 @@ def fetchDataIfRelevantFolder(current_dir: str, mod: Mod) -> bool:
     return False
 
 
-def fetchDataFromRelevantFiles(current_dir: str, mod: Mod) -> List[str]:
+def fetchDataFromRelevantFiles(current_dir: str, mod: Mod, output: Callable[[str], Any] = lambda _: None) -> List[str]:
     mod_xmls: List[str] = []
     for file in getAllFilesFromDirectory(current_dir):
         if isMenuXmlFile(file):
             mod.menus.append(file)
             mod_xmls.append(normalizePath(current_dir + "/" + file))
         elif isTxtOrInputXmlFile(file):
+            skipped = sniffTextFile(
+                current_dir + "/" + file, data.config.maxconfigfilesize)
+            if skipped:
+                print("skipping", current_dir + "/" + file, skipped)
+                output(translate("MainWindow", "Skipped searching for settings in") +
+                       f" {file} ({skipped})")
+                continue
             with open(current_dir + "/" + file, 'rb') as file_:
                 file_contents = file_.read()
                 try:
@@ -257,6 +268,7 @@ def isArchive(modPath: str) -> bool:
     return bool(re.match(r".+\.(zip|rar|7z)$", path.basename(modPath)))
 
 
+@traced("extractArchive", lambda modPath: modPath)
 def extractArchive(modPath: str) -> str:
     extractedDir = normalizePath(data.config.extracted)
     modPath = normalizePath(modPath)
@@ -0,0 +1,147 @@
+'''Game configuration files patched by mods'''
+# pylint: disable=invalid-name,missing-docstring
+
+import os
+from hashlib import sha1
+from os import path
+from typing import Callable, Iterable, List, Optional, Set
+
+from src.domain.mod import Mod
+from src.globals import data
+from src.globals.constants import translate
+from src.util.profiling import traced
+from src.util.util import detectEncoding
+
+INPUT_XML_MARKER = '<!-- [BASE_CharacterMovement] -->'
+HIDDEN_XML_MARKER = '</VisibleVars>'
+MENU_FILELISTS = ("dx11filelist.txt", "dx12filelist.txt")
+VANILLA_MENUS = ("audio.xml", "display.xml", "dx11filelist.txt", "dx12filelist.txt", "gameplay.xml", "gamma.xml",
+                 "graphics.xml", "graphicsdx11.xml", "hidden.xml", "hud.xml", "input.xml", "localization.xml",
+                 "postprocess.xml", "rendering.xml")
+
+
+def readGameFile(filename: str) -> str:
+    with open(filename, 'r', encoding=detectEncoding(filename)) as userfile:
+        return userfile.read()
+
+
+def writeGameFile(filename: str, text: str, encoding: str = "utf-16") -> None:
+    with open(filename, 'w', encoding=encoding) as userfile:
+        userfile.write(text)
+        userfile.flush()
+        os.fsync(userfile.fileno())
+
+
+def textStamp(text: str) -> str:
+    return sha1(text.encode('utf-8')).hexdigest()
+
+
+def baselineFolder() -> str:
+    return data.config.configuration + '/baseline'
+
+
+def stripContributions(text: str, contributions: Set[str]) -> str:
+    '''Removes all lines that are mod contributions from the text'''
+    return '\n'.join(line for line in text.split('\n') if line.strip() not in contributions)
+
+
+def loadBaseline(filename: str, current: str, contributions: Set[str]) -> str:
+    '''Returns the captured vanilla state of a game config file. The baseline is captured
+    from the current file with all known mod contributions removed if it doesn't exist yet,
+    or if the file was changed since it was last written by the manager'''
+    name = path.basename(filename)
+    baseline = baselineFolder() + '/' + name
+    stamp = baselineFolder() + '/' + name + '.written'
+    written = ''
+    if path.isfile(stamp):
+        with open(stamp, 'r', encoding='utf-8') as file:
+            written = file.read().strip()
+    if path.isfile(baseline) and written == textStamp(current):
+        with open(baseline, 'r', encoding='utf-8') as file:
+            return file.read()
+    print(f"capturing baseline of {filename}")
+    text = stripContributions(current, contributions)
+    if not path.isdir(baselineFolder()):
+        os.makedirs(baselineFolder())
+    with open(baseline, 'w', encoding='utf-8') as file:
+        file.write(text)
+    return text
+
+
+def materializeXml(baseline: str, contributions: Iterable[str], marker: str) -> str:
+    '''Inserts the contributions not yet present in the baseline in front of the marker'''
+    before, found, after = baseline.partition(marker)
+    if not found:
+        raise ValueError(translate("MainWindow", "Marker not found: ") + marker)
+    existing = set(line.strip() for line in baseline.split('\n'))
+    added = []
+    for xml in contributions:
+        if xml not in existing:
+            existing.add(xml)
+            added.append(xml + '\n')
+    return before + ''.join(added) + found + after
+
+
+def materializeFilelist(baseline: str, contributions: Iterable[str]) -> str:
+    '''Appends the menu entries not yet present in the baseline'''
+    existing = set(line.strip() for line in baseline.split('\n'))
+    text = baseline.rstrip('\r\n')
+    for menu in contributions:
+        if menu + ';' not in existing:
+            existing.add(menu + ';')
+            text += '\n' + menu + ';'
+    return text
+
+
+@traced("rebuildGameFile", lambda filename, *_: filename)
+def rebuildGameFile(filename: str, mods: List[Mod], contributions: Callable[[Mod], Iterable[str]],
+                    materialize: Callable[[str, List[str]], str], line: Callable[[str], str] = lambda c: c,
+                    removed: Iterable[Mod] = ()) -> None:
+    '''Materializes a game config file from its baseline and the contributions of all enabled mods.
+    The contributions of removed mods are stripped when the baseline is captured, but not materialized'''
+    ordered = [c for mod in mods if mod.enabled for c in contributions(mod)]
+    if not path.exists(filename):
+        if ordered:
+            raise FileNotFoundError(filename)
+        return
+    known = set(line(c) for mod in [*mods, *removed] for c in contributions(mod))
+    current = readGameFile(filename)
+    text = materialize(loadBaseline(filename, current, known), ordered)
+    if text != current:
+        writeGameFile(filename, text)
+    with open(baselineFolder() + '/' + path.basename(filename) + '.written', 'w', encoding='utf-8') as file:
+        file.write(textStamp(text))
+
+
+@traced("rebuildGameConfigs")
+def rebuildGameConfigs(mods: Iterable[Mod], output: Optional[Callable[[str], None]] = None,
+                       removed: Iterable[Mod] = ()) -> List[str]:
+    '''Rebuilds input.xml, hidden.xml and the menu filelists from their baselines in a single pass each.
+    The contributions of the removed mods, like just uninstalled ones, never end up in a captured baseline.
+    Returns the files that could not be rebuilt'''
+    mods = list(mods)
+    removed = list(removed)
+    incomplete = []
+    rebuilds = [
+        ("input.xml", "input.xml", lambda mod: mod.xmlkeys,
+         lambda text, added: materializeXml(text, added, INPUT_XML_MARKER), lambda c: c),
+        ("hidden.xml", "hidden.xml", lambda mod: mod.hidden,
+         lambda text, added: materializeXml(text, added, HIDDEN_XML_MARKER), lambda c: c),
+    ]
+    if data.config.gameversion == "ng":
+        rebuilds += [
+            (filelist, translate("MainWindow", "menu xml files"),
+             lambda mod: [menu for menu in mod.menus if menu not in VANILLA_MENUS],
+             materializeFilelist, lambda c: c + ';')
+            for filelist in MENU_FILELISTS]
+    for filename, label, contributions, materialize, line in rebuilds:
+        try:
+            rebuildGameFile(data.config.menu + "/" + filename,
+                            mods, contributions, materialize, line, removed)
+        except Exception as err:
+            print(f"failed to rebuild {filename}: {err}")
+            if output:
+                output(str(err))
+            if label not in incomplete:
+                incomplete.append(label)
+    return incomplete
@@ -1,19 +1,25 @@
 '''Core functionality'''
 # pylint: disable=invalid-name,superfluous-parens,bare-except,broad-except,wildcard-import,unused-wildcard-import,missing-docstring
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from os import listdir, mkdir, path, remove
 from shutil import copyfile
 from time import gmtime, strftime
-from typing import Any, Callable
+from typing import Any, Callable, List, Optional
 
 from PySide2.QtWidgets import QMessageBox
 
 from src.core.fetcher import *
+from src.core.gameconfig import VANILLA_MENUS, rebuildGameConfigs
 from src.core.model import Model
+from src.core.ownership import applyUserSettings
+from src.core.policy import CONFLICT_FOLDER, POLICY_KEEP, POLICY_OVERWRITE, ConflictPolicy
+from src.core.profiles import Profiles
+from src.core.transaction import SettingsTransaction
 from src.globals import data
 from src.globals.constants import translate
 from src.gui.alerts import MessageAlertModFromGamePath, MessageOverwrite
+from src.util.profiling import traced
 from src.util.util import *
 
 
@@ -27,6 +33,34 @@ class Installer:
     progress: Callable[[float], Any] = lambda _: None
     output: Callable[[str], Any] = lambda _: None
 
+    transaction: Optional[SettingsTransaction] = None
+    policy: Optional[ConflictPolicy] = None
+    # mods removed from the model since the last rebuild, their contributions are still known to the baselines
+    removed: List[Mod] = field(default_factory=list)
+
+    def beginBatch(self) -> None:
+        '''Buffers all game config edits of the following operations until commitBatch'''
+        self.transaction = SettingsTransaction()
+
+    def commitBatch(self) -> List[str]:
+        '''Rebuilds the merged config files and writes every buffered config file once.
+        Returns the files that could not be rebuilt'''
+        transaction = self.transaction
+        self.transaction = None
+        if transaction is None:
+            return []
+        incomplete = self.rebuildConfigs()
+        try:
+            written = transaction.commit()
+            print(f"committed {written} settings files")
+        except Exception as err:
+            self.output(formatUserError(err))
+            self.output(translate("MainWindow", "Note: Additions to ") +
+                        "user.settings, input.settings" + translate("MainWindow", " could not be automatically installed."))
+            incomplete.append("user.settings")
+        return incomplete
+
+    @traced("installMod", lambda _, modPath: modPath)
     def installMod(self, modPath: str) -> Tuple[bool, int, int]:
         '''Installs mod from given path. If given mod is an archive first extracts it'''
 
@@ -44,8 +78,9 @@ class Installer:
         self.progress(0.1)
         mod = None
         result = True
+        savepoint = self.transaction.savepoint() if self.transaction else None
         try:
-            mod, directories, xmls = fetchMod(modPath)
+            mod, directories, xmls = fetchMod(modPath, self.output)
 
             mod.date = strftime("%Y-%m-%d %H:%M:%S", gmtime())
             mod.name = modname
@@ -58,7 +93,9 @@ class Installer:
                     translate("MainWindow", "DLC folder does not exist and could not be created."))
 
             installed_mods = listdir(data.config.mods)
-            installed_dlcs = listdir(data.config.dlc)
+            # disabled dlcs still belong to their mods
+            installed_dlcs = listdir(data.config.dlc) + (
+                listdir(data.config.disableddlc) if data.config.disableddlc and path.isdir(data.config.disableddlc) else [])
 
             self.progress(0.2)
             res = None
@@ -73,10 +110,25 @@ class Installer:
                 if basepath is not None:
                     datapath = basepath + "/" + name
                     if (modfolder and name in installed_mods) or (dlcfolder and name in installed_dlcs):
-                        if self.ask:
+                        decision = self.policy.resolveFolder(
+                            mod.name, name, 'mod' if modfolder else 'dlc') if self.policy else None
+                        if decision:
+                            self.output(translate("MainWindow", "Conflict policy") + f": {name} " +
+                                        (translate("MainWindow", "overwritten") if decision == POLICY_OVERWRITE
+                                         else translate("MainWindow", "kept")))
+                        elif self.ask:
                             res = MessageOverwrite(
                                 name, translate("MainWindow", 'Mod') if modfolder else translate("MainWindow", 'DLC'))
-                        if res == QMessageBox.Yes:
+                            if self.policy:
+                                self.policy.log(mod.name, CONFLICT_FOLDER, 'mod' if modfolder else 'dlc', name,
+                                                POLICY_OVERWRITE if res in (QMessageBox.Yes, QMessageBox.YesToAll)
+                                                else POLICY_KEEP, "user")
+                        if decision == POLICY_OVERWRITE:
+                            copyFolder(directory, datapath)
+                            installCount += 1
+                        elif decision == POLICY_KEEP:
+                            pass
+                        elif res == QMessageBox.Yes:
                             copyFolder(directory, datapath)
                             installCount += 1
                         elif res == QMessageBox.YesToAll:
@@ -114,21 +166,7 @@ class Installer:
 
             incomplete = False
             try:
-                mod.installMenus()
-            except Exception as err:
-                incomplete = True
-                self.output(formatUserError(err))
-                self.output(translate("MainWindow", "Note: Additions to ") +
-                            translate("MainWindow", "menu xml files") + translate("MainWindow", " could not be automatically installed."))
-            try:
-                mod.installXmlKeys()
-            except Exception as err:
-                incomplete = True
-                self.output(formatUserError(err))
-                self.output(translate("MainWindow", "Note: Additions to ") +
-                            "input.xml" + translate("MainWindow", " could not be automatically installed."))
-            try:
-                added, skipped = mod.installInputKeys()
+                added, skipped = mod.installInputKeys(self.transaction, self.policy)
                 self.output(
                     translate("MainWindow", "Added") + f" {added} " + translate("MainWindow", "input keys") +
                     (f" ({translate('MainWindow', 'skipped')} {skipped})" if skipped > 0 else ""))
@@ -137,18 +175,8 @@ class Installer:
                 self.output(formatUserError(err))
                 self.output(translate("MainWindow", "Note: Additions to ") +
                             "input.settings" + translate("MainWindow", " could not be automatically installed."))
-            try:
-                mod.installUserSettings()
-            except Exception as err:
-                incomplete = True
-                self.output(formatUserError(err))
-                self.output(translate("MainWindow", "Note: Additions to ") +
-                            "user.settings" + translate("MainWindow", " could not be automatically installed."))
             mod.checkPriority()
 
-            if incomplete:
-                incompleteCount += 1
-
             if mod.readmes:
                 self.output(
                     translate("MainWindow", "Detected one or more README files."))
@@ -157,8 +185,11 @@ class Installer:
 
             self.progress(0.9)
             exists = False
+            owners = [mod]
             for installed in self.model.all():
                 if mod.files == installed.files and mod.name == installed.name:
+                    # options the previous version set and the new one doesn't are resolved again too
+                    owners = [installed, Mod(usersettings=installed.usersettings)]
                     installed.usersettings = mod.usersettings
                     installed.hidden = mod.hidden
                     installed.xmlkeys = mod.xmlkeys
@@ -167,10 +198,24 @@ class Installer:
                     installed.menus = mod.menus
                     installed.inputsettings = mod.inputsettings
                     installed.readmes = mod.readmes
+                    self.model.update(installed)
                     exists = True
                     break
+            self.model.sizes.invalidate(mod.files)
             if not exists:
                 self.model.add(mod.name, mod)
+            try:
+                # the values of options other installed mods also set are resolved by priority
+                self.updateUserSettings(owners)
+            except Exception as err:
+                incomplete = True
+                self.output(formatUserError(err))
+                self.output(translate("MainWindow", "Note: Additions to ") +
+                            "user.settings" + translate("MainWindow", " could not be automatically installed."))
+            if incomplete:
+                incompleteCount += 1
+            if not self.transaction and self.rebuildConfigs():
+                incompleteCount = 1
 
             self.progress(1.0)
             result = True
@@ -178,6 +223,9 @@ class Installer:
             self.output(formatUserError(err))
             if mod:
                 self.uninstallMod(mod)
+            if self.transaction and savepoint is not None:
+                # restores the buffered config files to their state before this mod
+                self.transaction.rollback(savepoint)
             result = False
             installCount = 0
         finally:
@@ -185,66 +233,46 @@ class Installer:
                 removeDirectory(data.config.extracted)
         return result, installCount, incompleteCount
 
+    @traced("uninstallMod", lambda _, mod: mod.name)
     def uninstallMod(self, mod: Mod) -> bool:
         '''Uninstalls given mod'''
         try:
             self.output(
                 translate("MainWindow", "Uninstalling") + " " + mod.name)
-            if not mod.enabled:
-                incomplete = mod.enable()
-                if incomplete:
-                    for i in incomplete:
-                        self.output(translate("MainWindow", "Note: Additions to ") +
-                                    i + translate("MainWindow", " could not be automatically installed."))
-            mod.uninstallMenus()
-            mod.uninstallXmlKeys()
-            mod.uninstallUserSettings()
+            mod.enable()
+            self.updateUserSettings([mod], exclude=mod)
             self.removeModMenus(mod)
             self.removeModDlcs(mod)
             self.removeModData(mod)
+            self.model.sizes.invalidate(mod.files)
             self.model.remove(mod.name)
+            self.removed.append(mod)
+            if not self.transaction:
+                self.rebuildConfigs()
             return True
         except Exception as err:
             self.output(formatUserError(err))
             return False
 
+    @traced("reinstallMod", lambda _, mod: mod.name)
     def reinstallMod(self, mod: Mod) -> Tuple[bool, bool]:
         try:
             self.output(
                 translate("MainWindow", "Reinstalling") + " " + mod.name)
-            if not mod.enabled:
-                incomplete = mod.enable()
-                if incomplete:
-                    for i in incomplete:
-                        self.output(translate("MainWindow", "Note: Additions to ") +
-                                    i + translate("MainWindow", " could not be automatically installed."))
+            mod.enable()
             incomplete = False
-            mod.uninstallUserSettings()
+            self.model.update(mod)
             try:
-                mod.installUserSettings()
+                self.updateUserSettings([mod])
             except Exception as err:
                 incomplete = True
                 self.output(formatUserError(err))
                 self.output(translate("MainWindow", "Note: Additions to ") +
                             "user.settings" + translate("MainWindow", " could not be automatically installed."))
-            mod.uninstallXmlKeys()
-            try:
-                mod.installXmlKeys()
-            except Exception as err:
-                incomplete = True
-                self.output(formatUserError(err))
-                self.output(translate("MainWindow", "Note: Additions to ") +
-                            "input.xml" + translate("MainWindow", " could not be automatically installed."))
-            mod.uninstallMenus()
-            try:
-                mod.installMenus()
-            except Exception as err:
+            if not self.transaction and self.rebuildConfigs():
                 incomplete = True
-                self.output(formatUserError(err))
-                self.output(translate("MainWindow", "Note: Additions to ") +
-                            translate("MainWindow", "menu xml files") + translate("MainWindow", " could not be automatically installed."))
             try:
-                added, skipped = mod.installInputKeys()
+                added, skipped = mod.installInputKeys(self.transaction, self.policy)
                 self.output(
                     translate("MainWindow", "Added") + f" {added} " + translate("MainWindow", "input keys") +
                     (f" ({translate('MainWindow', 'skipped')} {skipped})" if skipped > 0 else ""))
@@ -259,6 +287,72 @@ class Installer:
             self.output(formatUserError(err))
             return (False, False)
 
+    def toggleMods(self, enable: List[Mod], disable: List[Mod]) -> List[str]:
+        '''Enables and disables the given mods in one batch. Every config file is rebuilt once,
+        and the model is written once at the end. Returns the files that could not be rebuilt'''
+        toggled = [mod for mod in disable if mod.enabled] + \
+            [mod for mod in enable if not mod.enabled]
+        for index, mod in enumerate(toggled):
+            try:
+                if mod.enabled:
+                    mod.disable()
+                else:
+                    mod.enable()
+            except Exception as err:
+                self.output(formatUserError(err))
+            self.progress((index + 1) / len(toggled))
+        if not toggled:
+            return []
+        incomplete = rebuildGameConfigs(self.model.all(), self.output)
+        try:
+            self.updateUserSettings(toggled)
+        except Exception as err:
+            self.output(formatUserError(err))
+            incomplete.append("user.settings")
+        self.model.write()
+        return incomplete
+
+    @traced("updateUserSettings", lambda _, mods, *__: ', '.join(mod.name for mod in mods))
+    def updateUserSettings(self, mods: List[Mod], exclude: Optional[Mod] = None) -> None:
+        '''Sets the user settings of the given mods to the value of their highest-priority enabled owner.
+        Options no other enabled mod claims anymore are removed'''
+        keys = {(setting.context, setting.option): None for mod in mods for setting in mod.usersettings}
+        if not keys:
+            return
+        transaction = self.transaction or SettingsTransaction()
+        applyUserSettings(keys, lambda context, option: self.model.ownership.value(
+            context, option, exclude), transaction)
+        if self.transaction is None:
+            transaction.commit()
+
+    def rebuildConfigs(self) -> List[str]:
+        '''Rebuilds the game config files from the enabled mods of the model, and outputs the ones that failed'''
+        incomplete = rebuildGameConfigs(self.model.all(), self.output, self.removed)
+        self.removed = []
+        for i in incomplete:
+            self.output(translate("MainWindow", "Note: Additions to ") +
+                        i + translate("MainWindow", " could not be automatically installed."))
+        return incomplete
+
+    def activateProfile(self, profiles: Profiles, name: str) -> List[str]:
+        '''Applies the minimal set of toggles and priority changes to switch to the named profile
+        in one batch, with a single mods.settings write. Returns the files that could not be patched'''
+        enable, disable, priorities, missing = profiles.diff(name, self.model)
+        self.output(translate("MainWindow", "Activating profile") + f" '{name}': " +
+                    translate("MainWindow", "enabling") + f" {len(enable)}, " +
+                    translate("MainWindow", "disabling") + f" {len(disable)}, " +
+                    translate("MainWindow", "changing priority of") + f" {len(priorities)}")
+        for modname in missing:
+            self.output(translate("MainWindow", "Note: Mod in profile is not installed: ") + modname)
+        for mod, priority in priorities:
+            mod.setPriority(None if priority == '-' else priority, write=False)
+        if priorities:
+            data.config.write_priority()
+        incomplete = self.toggleMods(enable, disable)
+        if priorities and not enable and not disable:
+            self.model.write()
+        return incomplete
+
     def removeModData(self, mod):
         '''Removes mod data'''
         if not data.config.mods or not path.exists(data.config.mods):
@@ -269,6 +363,10 @@ class Installer:
 
     def removeModDlcs(self, mod):
         '''Removes dlc data'''
+        if data.config.disableddlc and path.exists(data.config.disableddlc):
+            for dlc in mod.dlcs:
+                if path.exists(data.config.disableddlc + "/" + dlc):
+                    removeDirectory(data.config.disableddlc + "/" + dlc)
         if not data.config.dlc or not path.exists(data.config.dlc):
             return
         for dlc in mod.dlcs:
@@ -281,7 +379,7 @@ class Installer:
             return
         for menu in mod.menus:
             if path.exists(data.config.menu + "/" + menu):
-                if menu in ("audio.xml", "display.xml", "dx11filelist.txt", "dx12filelist.txt", "gameplay.xml", "gamma.xml", "graphics.xml", "graphicsdx11.xml", "hidden.xml", "hud.xml", "input.xml", "localization.xml", "postprocess.xml", "rendering.xml"):
+                if menu in VANILLA_MENUS:
                     self.output(translate("MainWindow", "Note: Additions to ") +
                                 menu + translate("MainWindow", " will not be removed."))
                 else:
@@ -0,0 +1,108 @@
+'''Load order'''
+# pylint: disable=invalid-name,missing-docstring,wildcard-import,unused-wildcard-import
+
+import sys
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from os import listdir, path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from src.globals import data
+from src.util.util import *
+
+CHANGE_INSERT = 'insert'
+CHANGE_REMOVE = 'remove'
+CHANGE_MOVE = 'move'
+
+
+@dataclass
+class LoadOrderChange:
+    '''Change of a single load order row. The row is the position before the change for
+    removals and moves and the position after the change for insertions, the target is
+    the position after a move'''
+
+    type: str
+    folder: str
+    row: int
+    target: int = -1
+    priority: Optional[int] = None
+
+
+class LoadOrder:
+    '''In-memory load order of the data folders in the Mods folder, sorted by priority.
+    Updates return the changes needed to bring a view in sync instead of rebuilding it'''
+
+    def __init__(self):
+        self.priorities: Dict[str, Optional[int]] = {}
+        self.order: List[Tuple[int, str, str]] = []
+
+    @staticmethod
+    def sortKey(folder: str, priority: Optional[int]) -> Tuple[int, str, str]:
+        return (priority if priority is not None else sys.maxsize, folder.lower(), folder)
+
+    @staticmethod
+    def priorityOf(folder: str) -> Optional[int]:
+        value = data.config.getPriority(folder)
+        try:
+            return int(value) if value else None
+        except ValueError:
+            return None
+
+    def folders(self) -> List[str]:
+        return [folder for _, _, folder in self.order]
+
+    def row(self, folder: str) -> int:
+        return bisect_left(self.order, self.sortKey(folder, self.priorities[folder]))
+
+    def insert(self, folder: str, priority: Optional[int]) -> LoadOrderChange:
+        self.priorities[folder] = priority
+        insort(self.order, self.sortKey(folder, priority))
+        return LoadOrderChange(CHANGE_INSERT, folder, self.row(folder), priority=priority)
+
+    def remove(self, folder: str) -> LoadOrderChange:
+        row = self.row(folder)
+        del self.order[row]
+        del self.priorities[folder]
+        return LoadOrderChange(CHANGE_REMOVE, folder, row)
+
+    def move(self, folder: str, priority: Optional[int]) -> LoadOrderChange:
+        row = self.row(folder)
+        del self.order[row]
+        self.priorities[folder] = priority
+        insort(self.order, self.sortKey(folder, priority))
+        return LoadOrderChange(CHANGE_MOVE, folder, row, self.row(folder), priority)
+
+    def sync(self, present: Set[str], checked: Iterable[str]) -> List[LoadOrderChange]:
+        '''Brings the checked folders in line with the present ones and their current priorities'''
+        changes = []
+        for folder in checked:
+            if folder not in present:
+                if folder in self.priorities:
+                    changes.append(self.remove(folder))
+                continue
+            priority = self.priorityOf(folder)
+            if folder not in self.priorities:
+                changes.append(self.insert(folder, priority))
+            elif self.priorities[folder] != priority:
+                changes.append(self.move(folder, priority))
+        return changes
+
+    def scan(self) -> List[LoadOrderChange]:
+        '''Lists the Mods folder once and syncs every folder'''
+        present = set(folder for folder in listdir(data.config.mods) if isData(folder))
+        return self.sync(present, sorted(present | set(self.priorities)))
+
+    def check(self, folders: Iterable[str]) -> List[LoadOrderChange]:
+        '''Syncs only the given folders, both in their enabled and disabled form'''
+        checked = set()
+        for folder in folders:
+            folder = folder[1:] if folder.startswith('~') else folder
+            checked.add(folder)
+            checked.add('~' + folder)
+        present = set(folder for folder in checked
+                      if isData(folder) and path.isdir(data.config.mods + "/" + folder))
+        return self.sync(present, sorted(checked))
+
+    def reprioritize(self) -> List[LoadOrderChange]:
+        '''Re-applies the in-memory priorities of mods.settings to every folder'''
+        return self.sync(set(self.priorities), list(self.priorities))
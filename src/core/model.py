@@ -1,17 +1,21 @@
 '''Mod management model'''
-# pylint: disable=invalid-name,missing-docstring,wildcard-import,unused-wildcard-import
+# pylint: disable=invalid-name,missing-docstring,wildcard-import,unused-wildcard-import,protected-access
 
-from typing import Dict, List, KeysView, ValuesView
+from typing import Dict, List, KeysView, Optional, ValuesView
 from os import path
 import xml.etree.ElementTree as XML
 from base64 import b64decode, b64encode
 
 from fasteners import InterProcessLock
 
-from src.domain.mod import Mod
+from src.core.ownership import SettingsOwnership
+from src.core.search import SearchIndex
+from src.core.sizes import SizeCache
+from src.domain.mod import DLC_SCHEME_FILES, Mod
 from src.domain.key import Key
 from src.globals import data
 from src.core.fetcher import *
+from src.util.profiling import MEMORY, traced
 from src.util.util import *
 from src.util.syntax import *
 from src.gui.alerts import MessageAlertReadingConfigurationFailed, MessageAlertWritingFailed
@@ -20,30 +24,51 @@ from src.gui.alerts import MessageAlertReadingConfigurationFailed, MessageAlertW
 class Model:
     '''Mod management model'''
 
-    def __init__(self, ignorelock=False):
+    def __init__(self, ignorelock=False, load=True):
         if not ignorelock:
             self.lock = InterProcessLock(self.lockfile)
             if not self.lock.acquire(False):
                 raise IOError('could not lock ' + self.lockfile)
         self.modList: Dict[str, Mod] = {}
-        self.reload()
+        self.ownership = SettingsOwnership()
+        self._search: Optional[SearchIndex] = None
+        self.sizes = SizeCache()
+        self.loaded = False
+        if load:
+            self.reload()
 
     def reload(self) -> None:
-        self.modList = {}
+        try:
+            self.setMods(self.read())
+        except XML.ParseError as e:
+            MessageAlertReadingConfigurationFailed(self.xmlfile, e)
+            raise e
+
+    def read(self) -> Dict[str, Mod]:
+        '''Parses installed.xml without changing the model, so it can run in the background'''
+        mods: Dict[str, Mod] = {}
         if path.exists(self.xmlfile):
-            try:
-                encoding = detectEncoding(self.xmlfile)
-                with open(self.xmlfile, 'r', encoding=encoding) as file:
-                    tree = XML.parse(file)
-                root = tree.getroot()
-                for xmlmod in root.findall('mod'):
-                    mod = self.populateModFromXml(Mod(), xmlmod)
-                    self.modList[mod.name] = mod
-            except XML.ParseError as e:
-                MessageAlertReadingConfigurationFailed(self.xmlfile, e)
-                raise e
-
+            encoding = detectEncoding(self.xmlfile)
+            with open(self.xmlfile, 'r', encoding=encoding) as file:
+                tree = XML.parse(file)
+            root = tree.getroot()
+            for xmlmod in root.findall('mod'):
+                mod = self.populateModFromXml(Mod(), xmlmod)
+                mods[mod.name] = mod
+        return mods
+
+    def setMods(self, mods: Dict[str, Mod]) -> None:
+        self.modList = mods
+        self.ownership = SettingsOwnership(self.all())
+        self._search = None
+        self.loaded = True
+        MEMORY.snapshot("mods loaded")
+
+    @traced("Model.write")
     def write(self) -> None:
+        if not self.loaded:
+            # never overwrite the mod list before it was read
+            return
         root = XML.ElementTree(XML.Element('installed'))
         for mod in self.all():
             root = self.writeModToXml(mod, root)
@@ -74,11 +99,25 @@ class Model:
         return self.modList.values()
 
     def add(self, modname: str, mod: Mod):
+        if modname in self.modList:
+            self.ownership.remove(self.modList[modname])
         self.modList[modname] = mod
+        self.ownership.add(mod)
+        if self._search is not None:
+            self._search.add(mod)
         self.write()
 
+    def update(self, mod: Mod):
+        '''Refreshes the indexes after the data of an installed mod changed'''
+        self.ownership.update(mod)
+        if self._search is not None:
+            self._search.update(mod)
+
     def remove(self, modname: str):
         if modname in self.modList:
+            self.ownership.remove(self.modList[modname])
+            if self._search is not None:
+                self._search.remove(modname)
             del self.modList[modname]
         self.write()
 
@@ -89,6 +128,9 @@ class Model:
         del self.modList[modname]
         mod.name = newname
         self.modList[newname] = mod
+        if self._search is not None:
+            self._search.remove(modname)
+            self._search.add(mod)
         self.write()
         return True
 
@@ -99,6 +141,13 @@ class Model:
                 ('/~' if not mod.enabled else '/') + file
             openFolder(moddir)
 
+    @property
+    def search(self) -> SearchIndex:
+        '''Search index of the mods, built on first use and updated incrementally afterwards'''
+        if self._search is None:
+            self._search = SearchIndex(self.all())
+        return self._search
+
     @property
     def xmlfile(self) -> str:
         return data.config.configuration + '/installed.xml'
@@ -116,9 +165,16 @@ class Model:
         else:
             mod.enabled = False
         mod.name = str(root.get('name'))
+        dlcscheme = root.get('dlcscheme')
+        if dlcscheme:
+            mod.dlcscheme = str(dlcscheme)
+        elif not mod.enabled:
+            # disabled before dlcs were moved as a whole
+            mod.dlcscheme = DLC_SCHEME_FILES
         prt = str(root.get('priority'))
-        if prt != 'Not Set':
-            mod.priority = prt
+        if prt.isdecimal():
+            # the mods.settings config is only read by the GUI thread, reading the model can run in the background
+            mod._priority = str(int(prt))
         for elem in root.findall('data'):
             mod.files.append(str(elem.text))
         for elem in root.findall('dlc'):
@@ -130,7 +186,9 @@ class Model:
         for elem in root.findall('hidden'):
             mod.hidden.append(str(elem.text))
         for elem in root.findall('key'):
-            key = Key(elem.get('context'), str(elem.text))
+            text = elem.text or ''
+            # empty context keys were written as =(None) before
+            key = Key(elem.get('context'), '' if text == '=(None)' else text)
             mod.inputsettings.append(key)
         for elem in root.findall('settings'):
             # legacy usersetting storage format
@@ -160,6 +218,7 @@ class Model:
         elem.set('enabled', str(mod.enabled))
         elem.set('date', mod.date)
         elem.set('priority', mod.priority)
+        elem.set('dlcscheme', mod.dlcscheme)
         if mod.files:
             for file in mod.files:
                 XML.SubElement(elem, 'data').text = file
@@ -0,0 +1,82 @@
+'''User settings ownership'''
+# pylint: disable=invalid-name,missing-docstring
+
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.core.transaction import SettingsTransaction
+from src.domain.mod import Mod
+from src.globals import data
+from src.util.settingsdocument import SettingsDocument
+
+
+class SettingsOwnership:
+    '''Index of the mods contributing to each user setting, keyed by (context, option).
+    The number of owners of an option is its reference count'''
+
+    def __init__(self, mods: Iterable[Mod] = ()):
+        self.owners: Dict[Tuple[str, str], List[Tuple[Mod, str]]] = {}
+        for mod in mods:
+            self.add(mod)
+
+    def add(self, mod: Mod) -> None:
+        for setting in mod.usersettings:
+            owners = self.owners.setdefault((setting.context, setting.option), [])
+            owners[:] = [owner for owner in owners if owner[0] is not mod]
+            owners.append((mod, setting.value))
+
+    def remove(self, mod: Mod) -> None:
+        for setting in mod.usersettings:
+            key = (setting.context, setting.option)
+            owners = [owner for owner in self.owners.get(key, []) if owner[0] is not mod]
+            if owners:
+                self.owners[key] = owners
+            elif key in self.owners:
+                del self.owners[key]
+
+    def update(self, mod: Mod) -> None:
+        '''Re-indexes a mod whose settings were changed in place'''
+        for key, owners in list(self.owners.items()):
+            owners = [owner for owner in owners if owner[0] is not mod]
+            if owners:
+                self.owners[key] = owners
+            else:
+                del self.owners[key]
+        self.add(mod)
+
+    def count(self, context: str, option: str) -> int:
+        return len(self.owners.get((context, option), []))
+
+    def value(self, context: str, option: str, exclude: Optional[Mod] = None) -> Optional[str]:
+        '''Returns the value of the highest-priority enabled owner of the option, or None if it is unclaimed.
+        Lower priority numbers win like in mods.settings, then the most recently installed mod'''
+        # owners are indexed in install order, newest first breaks ties of dates within the same second
+        claims = [(mod, value) for mod, value in reversed(self.owners.get((context, option), []))
+                  if mod.enabled and mod is not exclude]
+        if not claims:
+            return None
+        claims.sort(key=lambda claim: claim[0].date, reverse=True)
+        claims.sort(key=lambda claim: int(claim[0].priority) if claim[0].priority.isdecimal() else float('inf'))
+        return claims[0][1]
+
+
+def applyUserSettings(keys: Iterable[Tuple[str, str]], resolve: Callable[[str, str], Optional[str]],
+                      transaction: SettingsTransaction) -> None:
+    '''Sets every option to its resolved value in the user.settings files, or removes it if it resolves to None'''
+    keys = list(keys)
+    if not keys:
+        return
+    fileNames = ["user.settings"]
+    if data.config.gameversion == "ng":
+        fileNames.append("dx12user.settings")
+    for fileName in fileNames:
+        absFilePath = data.config.settings + '/' + fileName
+        # a missing file is only created when an option is set
+        document = SettingsDocument(transaction.read(absFilePath) or '')
+        for context, option in keys:
+            value = resolve(context, option)
+            if value is None:
+                document.remove(context, option)
+            else:
+                document.set(context, option, value)
+        if document.changed:
+            transaction.write(absFilePath, document.text())
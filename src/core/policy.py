@@ -0,0 +1,153 @@
+'''Conflict resolution policies'''
+# pylint: disable=invalid-name,missing-docstring,wildcard-import,unused-wildcard-import
+
+import copy
+import xml.etree.ElementTree as XML
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from os import path
+from time import localtime, strftime
+from typing import List, Optional, Tuple
+
+from src.domain.key import Key
+from src.globals import data
+from src.gui.alerts import MessageAlertReadingConfigurationFailed, MessageAlertWritingFailed
+from src.util.syntax import *
+from src.util.util import *
+
+CONFLICT_FOLDER = 'folder'
+CONFLICT_KEY = 'key'
+
+POLICY_OVERWRITE = 'overwrite'
+POLICY_KEEP = 'keep'
+POLICY_KEYBOARD = 'keyboard'
+POLICY_CONTROLLER = 'controller'
+
+
+@dataclass
+class PolicyRule:
+    '''Decision for the conflicts matching the mod, context, action and key patterns.
+    For folder conflicts the context is 'mod' or 'dlc' and the action is the folder name'''
+
+    type: str
+    decision: str
+    mod: str = '*'
+    context: str = '*'
+    action: str = '*'
+    key: str = '*'
+
+    def matches(self, type: str, modname: str, context: str, action: str, key: str = '') -> bool:  # pylint: disable=redefined-builtin
+        return self.type == type and \
+            fnmatchcase(modname.lower(), self.mod.lower()) and \
+            fnmatchcase(context.lower(), self.context.lower()) and \
+            fnmatchcase(action.lower(), self.action.lower()) and \
+            fnmatchcase(key.lower(), self.key.lower())
+
+
+class ConflictPolicy:
+    '''Resolves install conflicts without any UI by evaluating the rules in order.
+    If no rule matches the conflict is left to the user, or decided by the defaults when unattended.
+    Every decision is appended to the conflict log'''
+
+    def __init__(self):
+        self.rules: List[PolicyRule] = []
+        self.unattended = False
+        self.folder = POLICY_OVERWRITE
+        self.key = POLICY_OVERWRITE
+        self.reload()
+
+    def reload(self) -> None:
+        self.rules = []
+        if path.exists(self.xmlfile):
+            try:
+                with open(self.xmlfile, 'r', encoding=detectEncoding(self.xmlfile)) as file:
+                    root = XML.parse(file).getroot()
+                self.unattended = root.get('unattended') == 'True'
+                self.folder = root.get('folder', POLICY_OVERWRITE)
+                self.key = root.get('key', POLICY_OVERWRITE)
+                for xmlrule in root.findall('rule'):
+                    self.rules.append(PolicyRule(
+                        str(xmlrule.get('type', CONFLICT_KEY)), str(xmlrule.get('decision', POLICY_OVERWRITE)),
+                        str(xmlrule.get('mod', '*')), str(xmlrule.get('context', '*')),
+                        str(xmlrule.get('action', '*')), str(xmlrule.get('key', '*'))))
+            except XML.ParseError as e:
+                MessageAlertReadingConfigurationFailed(self.xmlfile, e)
+
+    def write(self) -> None:
+        root = XML.ElementTree(XML.Element('policies'))
+        root.getroot().set('unattended', str(self.unattended))
+        root.getroot().set('folder', self.folder)
+        root.getroot().set('key', self.key)
+        for rule in self.rules:
+            xmlrule = XML.SubElement(root.getroot(), 'rule')
+            xmlrule.set('type', rule.type)
+            xmlrule.set('mod', rule.mod)
+            xmlrule.set('context', rule.context)
+            xmlrule.set('action', rule.action)
+            xmlrule.set('key', rule.key)
+            xmlrule.set('decision', rule.decision)
+        indent(root.getroot())
+        print(f"writing conflict policies to {self.xmlfile}")
+        try:
+            with open(self.xmlfile, 'wb') as file:
+                root.write(file, encoding='utf-8')
+                file.flush()
+                os.fsync(file.fileno())
+        except Exception as e:
+            MessageAlertWritingFailed(self.xmlfile, e)
+
+    def withDecisions(self, rules: List[PolicyRule]) -> 'ConflictPolicy':
+        '''Returns an unattended copy of the policy that applies the given rules first'''
+        policy = copy.copy(self)
+        policy.rules = rules + self.rules
+        policy.unattended = True
+        return policy
+
+    def decide(self, type: str, modname: str, context: str, action: str, key: str = '') -> Tuple[Optional[str], str]:  # pylint: disable=redefined-builtin
+        '''Returns the decision and its source, or None if the user has to decide'''
+        for index, rule in enumerate(self.rules):
+            if rule.matches(type, modname, context, action, key):
+                return rule.decision, f"rule {index + 1}"
+        if self.unattended:
+            return (self.folder if type == CONFLICT_FOLDER else self.key), "default"
+        return None, ""
+
+    def resolveFolder(self, modname: str, folder: str, kind: str) -> Optional[str]:
+        '''Decides whether an already installed mod or dlc folder is overwritten'''
+        decision, source = self.decide(CONFLICT_FOLDER, modname, kind, folder)
+        if decision not in (None, POLICY_OVERWRITE):
+            decision = POLICY_KEEP
+        if decision:
+            self.log(modname, CONFLICT_FOLDER, kind, folder, decision, source)
+        return decision
+
+    def resolveKey(self, modname: str, existing: Key, key: Key) -> Optional[str]:
+        '''Decides whether an existing key binding is replaced by the conflicting key of the mod'''
+        context = existing.context.strip('[]')
+        decision, source = self.decide(CONFLICT_KEY, modname, context, str(key.action["Action"]), key.key)
+        if decision == POLICY_KEYBOARD:
+            decision = POLICY_OVERWRITE if key.type == 'keyboard' else POLICY_KEEP
+        elif decision == POLICY_CONTROLLER:
+            decision = POLICY_OVERWRITE if key.type in ('controller', 'PS4') else POLICY_KEEP
+        elif decision not in (None, POLICY_OVERWRITE):
+            decision = POLICY_KEEP
+        if decision:
+            self.log(modname, CONFLICT_KEY, context, f"{existing} -> {key}", decision, source)
+        return decision
+
+    def log(self, modname: str, type: str, context: str, subject: str, decision: str, source: str) -> None:  # pylint: disable=redefined-builtin
+        '''Appends a decision to the conflict log for later review'''
+        try:
+            with open(self.logfile, 'a', encoding='utf-8') as file:
+                file.write('\t'.join((strftime("%Y-%m-%d %H:%M:%S", localtime()),
+                                      modname, type, context, subject, decision, source)) + '\n')
+        except OSError as e:
+            print(f"could not write conflict log: {e}")
+
+    @property
+    def xmlfile(self) -> str:
+        return data.config.configuration + '/policies.xml'
+
+    @property
+    def logfile(self) -> str:
+        return data.config.configuration + '/conflicts.log'
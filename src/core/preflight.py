@@ -0,0 +1,122 @@
+'''Pre-flight conflict analysis'''
+# pylint: disable=invalid-name,missing-docstring,wildcard-import,unused-wildcard-import
+
+import zipfile
+from dataclasses import dataclass
+from glob import escape
+from os import listdir, path
+from typing import Any, Callable, List, Set
+
+from src.core.fetcher import *
+from src.core.policy import CONFLICT_FOLDER, CONFLICT_KEY, POLICY_OVERWRITE, PolicyRule
+from src.domain.key import Key
+from src.domain.mod import Mod
+from src.globals import data
+from src.globals.constants import translate
+from src.util.util import *
+
+
+@dataclass
+class Conflict:
+    '''Folder collision or key binding conflict found before installing.
+    For folder conflicts the context is 'mod' or 'dlc' and the action is the folder name'''
+
+    type: str
+    modname: str
+    context: str
+    action: str
+    key: str = ''
+    existing: str = ''
+    new: str = ''
+    decision: str = POLICY_OVERWRITE
+
+    def rule(self) -> PolicyRule:
+        '''Returns a policy rule applying the decision to exactly this conflict'''
+        return PolicyRule(self.type, self.decision, escape(self.modname), escape(self.context),
+                          escape(self.action), escape(self.key) if self.key else '*')
+
+
+def scanMod(modPath: str, output: Callable[[str], Any] = lambda _: None) -> Mod:
+    '''Collects the data folders, dlcs and input keys of a mod. Zip archives are read from their
+    listing and only their settings files are decompressed, other archives are extracted'''
+    if zipfile.is_zipfile(modPath):
+        mod = scanZip(modPath)
+    else:
+        try:
+            mod, _, _ = fetchMod(modPath, output)
+        finally:
+            if path.exists(data.config.extracted):
+                removeDirectory(data.config.extracted)
+    mod.name = path.split(modPath)[1]
+    return mod
+
+
+def scanZip(modPath: str) -> Mod:
+    mod = Mod(path.split(modPath)[1])
+    with zipfile.ZipFile(modPath) as archive:
+        folders: Set[str] = set()
+        for name in archive.namelist():
+            parts = name.rstrip('/').split('/')
+            for index in range(1, len(parts) + (1 if name.endswith('/') else 0)):
+                folders.add('/'.join(parts[:index]))
+        lowered = set(folder.lower() for folder in folders)
+        for folder in sorted(folders):
+            parent, name = path.split(folder)
+            if folder.lower() + '/content' in lowered:
+                if isModFolder(name, path.basename(parent)):
+                    mod.files.append(name)
+                elif isDlcFolder(name, path.basename(parent)):
+                    mod.dlcs.append(name)
+        for info in archive.infolist():
+            name = path.basename(info.filename)
+            if info.is_dir() or not isTxtOrInputXmlFile(name) or info.file_size > data.config.maxconfigfilesize:
+                continue
+            content = archive.read(info)
+            try:
+                text = content.decode("utf-8")
+            except UnicodeError:
+                try:
+                    text = content.decode("utf-16")
+                except UnicodeError:
+                    continue
+            if name == "input.xml":
+                text = fetchRelevantDataFromInputXml(text, mod)
+            mod.inputsettings += fetchInputSettings(text)
+    return mod
+
+
+def preflight(modPaths: List[str], output: Callable[[str], Any] = lambda _: None,
+              progress: Callable[[float], Any] = lambda _: None) -> List[Conflict]:
+    '''Analyzes all mods of a batch before installing and returns every folder collision
+    with installed mods and dlcs and every input key conflict, including the ones between the mods of the batch'''
+    installedMods = set(listdir(data.config.mods)) if data.config.mods else set()
+    installedDlcs = set(listdir(data.config.dlc)) if data.config.dlc else set()
+    if data.config.disableddlc and path.isdir(data.config.disableddlc):
+        # disabled dlcs still belong to their mods
+        installedDlcs.update(listdir(data.config.disableddlc))
+    existing: List[Key] = []
+    filename = data.config.settings + "/input.settings"
+    if path.exists(filename):
+        with open(filename, 'r', encoding=detectEncoding(filename)) as file:
+            existing = fetchInputSettings(file.read())
+    conflicts: List[Conflict] = []
+    for index, modPath in enumerate(modPaths):
+        try:
+            mod = scanMod(modPath, output)
+        except Exception as err:
+            output(translate("MainWindow", "Could not analyze") + f" {path.basename(modPath)}: {err}")
+            continue
+        for folders, installed, kind in ((mod.files, installedMods, 'mod'), (mod.dlcs, installedDlcs, 'dlc')):
+            for folder in folders:
+                if folder in installed:
+                    conflicts.append(Conflict(CONFLICT_FOLDER, mod.name, kind, folder,
+                                              existing=folder, new=path.basename(modPath)))
+                installed.add(folder)
+        _, keyConflicts = mod.findKeyConflicts(existing)
+        for key, conflicting in keyConflicts:
+            # the decision applies to every binding the key conflicts with, so they share one row
+            conflicts.append(Conflict(CONFLICT_KEY, mod.name, key.context.strip('[]'), str(key.action["Action"]),
+                                      key.key, ', '.join(str(e) for e in conflicting), str(key)))
+            existing.append(key)
+        progress((index + 1) / len(modPaths))
+    return conflicts
@@ -0,0 +1,93 @@
+'''Mod profiles'''
+# pylint: disable=invalid-name,missing-docstring,wildcard-import,unused-wildcard-import
+
+import xml.etree.ElementTree as XML
+from os import path
+from typing import Dict, List, Tuple
+
+from src.core.model import Model
+from src.domain.mod import Mod
+from src.globals import data
+from src.gui.alerts import MessageAlertReadingConfigurationFailed, MessageAlertWritingFailed
+from src.util.syntax import *
+from src.util.util import *
+
+
+class Profiles:
+    '''Named sets of enabled mods and their priorities'''
+
+    def __init__(self):
+        self.profiles: Dict[str, Dict[str, Tuple[bool, str]]] = {}
+        self.reload()
+
+    def reload(self) -> None:
+        self.profiles = {}
+        if path.exists(self.xmlfile):
+            try:
+                with open(self.xmlfile, 'r', encoding=detectEncoding(self.xmlfile)) as file:
+                    tree = XML.parse(file)
+                for xmlprofile in tree.getroot().findall('profile'):
+                    self.profiles[str(xmlprofile.get('name'))] = {
+                        str(xmlmod.get('name')): (
+                            xmlmod.get('enabled') == 'True', str(xmlmod.get('priority')))
+                        for xmlmod in xmlprofile.findall('mod')
+                    }
+            except XML.ParseError as e:
+                MessageAlertReadingConfigurationFailed(self.xmlfile, e)
+
+    def write(self) -> None:
+        root = XML.ElementTree(XML.Element('profiles'))
+        for name, mods in self.profiles.items():
+            xmlprofile = XML.SubElement(root.getroot(), 'profile')
+            xmlprofile.set('name', name)
+            for modname, (enabled, priority) in mods.items():
+                xmlmod = XML.SubElement(xmlprofile, 'mod')
+                xmlmod.set('name', modname)
+                xmlmod.set('enabled', str(enabled))
+                xmlmod.set('priority', priority)
+        indent(root.getroot())
+        print(f"writing profiles to {self.xmlfile}")
+        try:
+            with open(self.xmlfile, 'wb') as file:
+                root.write(file, encoding='utf-8')
+                file.flush()
+                os.fsync(file.fileno())
+        except Exception as e:
+            MessageAlertWritingFailed(self.xmlfile, e)
+
+    def list(self) -> List[str]:
+        return sorted(self.profiles.keys(), key=str.lower)
+
+    def save(self, name: str, model: Model) -> None:
+        '''Records the enabled state and priority of all mods in the model as the named profile'''
+        self.profiles[name] = {
+            mod.name: (mod.enabled, mod.priority) for mod in model.all()}
+        self.write()
+
+    def remove(self, name: str) -> None:
+        if name in self.profiles:
+            del self.profiles[name]
+        self.write()
+
+    def diff(self, name: str, model: Model) -> Tuple[List[Mod], List[Mod], List[Tuple[Mod, str]], List[str]]:
+        '''Computes the mods to enable, the mods to disable and the priorities to change
+        to get from the current state of the model to the named profile.
+        Mods missing from the profile are disabled, missing installed mods are returned last'''
+        profile = self.profiles[name]
+        enable: List[Mod] = []
+        disable: List[Mod] = []
+        priorities: List[Tuple[Mod, str]] = []
+        for mod in model.all():
+            enabled, priority = profile.get(mod.name, (False, mod.priority))
+            if enabled and not mod.enabled:
+                enable.append(mod)
+            elif not enabled and mod.enabled:
+                disable.append(mod)
+            if priority != mod.priority:
+                priorities.append((mod, priority))
+        missing = [modname for modname in profile if modname not in model.list()]
+        return enable, disable, priorities, missing
+
+    @property
+    def xmlfile(self) -> str:
+        return data.config.configuration + '/profiles.xml'
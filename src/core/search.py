@@ -0,0 +1,132 @@
+'''Mod search index'''
+# pylint: disable=invalid-name,missing-docstring
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from src.domain.mod import Mod
+
+SEARCH_FIELDS = ('name', 'data', 'dlc', 'menu', 'key', 'setting', 'readme')
+DEFAULT_FIELDS = ('name', 'data', 'dlc', 'menu', 'key', 'setting')
+FIELD_ALIASES = {
+    'mod': 'data',
+    'file': 'data',
+    'input': 'key',
+    'action': 'key',
+    'settings': 'setting',
+    'option': 'setting',
+}
+GRAM_SIZE = 3
+
+
+def grams(text: str) -> Set[str]:
+    '''Returns all substrings of the text up to the gram size'''
+    found = set()
+    for size in range(1, GRAM_SIZE + 1):
+        for index in range(len(text) - size + 1):
+            found.add(text[index:index + size])
+    return found
+
+
+def fieldGrams(strings: List[str]) -> Set[str]:
+    '''Returns the grams of all whitespace separated tokens of the strings'''
+    return set(gram for token in set(token for string in strings for token in string.split())
+               for gram in grams(token))
+
+
+def fieldValues(mod: Mod) -> Dict[str, List[str]]:
+    '''Collects the lowercase searchable strings of a mod per field'''
+    keys = []
+    for key in mod.inputsettings:
+        keys.append(str(key.key).lower())
+        if not key.empty and key.action is not None:
+            keys.append(str(key.action["Action"]).lower())
+    return {
+        'name': [mod.name.lower()],
+        'data': [folder.lower() for folder in mod.files],
+        'dlc': [dlc.lower() for dlc in mod.dlcs],
+        'menu': [menu.lower() for menu in mod.menus],
+        'key': keys,
+        'setting': [value for setting in mod.usersettings
+                    for value in (setting.option.lower(), setting.context.lower())],
+        'readme': [readme.lower() for readme in mod.readmes],
+    }
+
+
+class SearchIndex:
+    '''Gram index over the names, data folders, dlcs, menus, input keys, user settings and readmes of the mods.
+    Queries are space separated terms that all have to match, terms can be scoped to a field like key:IK_F5'''
+
+    def __init__(self, mods: Iterable[Mod] = ()):
+        self.postings: Dict[Tuple[str, str], Set[str]] = {}
+        self.values: Dict[str, Dict[str, List[str]]] = {}
+        for mod in mods:
+            self.add(mod)
+
+    def add(self, mod: Mod) -> None:
+        if mod.name in self.values:
+            self.remove(mod.name)
+        values = fieldValues(mod)
+        self.values[mod.name] = values
+        for field, strings in values.items():
+            for gram in fieldGrams(strings):
+                self.postings.setdefault((field, gram), set()).add(mod.name)
+
+    def remove(self, modname: str) -> None:
+        values = self.values.pop(modname, None)
+        if values is None:
+            return
+        for field, strings in values.items():
+            for gram in fieldGrams(strings):
+                names = self.postings.get((field, gram))
+                if names is not None:
+                    names.discard(modname)
+                    if not names:
+                        del self.postings[(field, gram)]
+
+    def update(self, mod: Mod) -> None:
+        self.add(mod)
+
+    @staticmethod
+    def parse(query: str) -> List[Tuple[Tuple[str, ...], str]]:
+        '''Splits a query into terms with the fields they apply to'''
+        terms = []
+        for term in query.lower().split():
+            field, separator, value = term.partition(':')
+            field = FIELD_ALIASES.get(field, field)
+            if separator and field in SEARCH_FIELDS:
+                if value:
+                    terms.append(((field,), value))
+            else:
+                terms.append((DEFAULT_FIELDS, term))
+        return terms
+
+    def match(self, fields: Tuple[str, ...], term: str) -> Set[str]:
+        '''Returns the names of the mods containing the term in any of the fields'''
+        found: Set[str] = set()
+        for field in fields:
+            if len(term) <= GRAM_SIZE:
+                found |= self.postings.get((field, term), set())
+                continue
+            candidates: Optional[Set[str]] = None
+            for index in range(len(term) - GRAM_SIZE + 1):
+                names = self.postings.get((field, term[index:index + GRAM_SIZE]), set())
+                candidates = names if candidates is None else candidates & names
+                if not candidates:
+                    break
+            if candidates:
+                found |= {name for name in candidates
+                          if any(term in string for string in self.values[name][field])}
+        return found
+
+    def search(self, query: str) -> Optional[Set[str]]:
+        '''Returns the names of the mods matching all terms of the query, or None for an empty query'''
+        terms = self.parse(query)
+        if not terms:
+            return None
+        result: Optional[Set[str]] = None
+        for fields, term in terms:
+            matches = self.match(fields, term)
+            result = matches if result is None else result & matches
+            if not result:
+                return set()
+        return result
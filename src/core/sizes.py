@@ -0,0 +1,86 @@
+'''Mod size cache'''
+# pylint: disable=invalid-name,missing-docstring,wildcard-import,unused-wildcard-import
+
+import xml.etree.ElementTree as XML
+from os import path
+from typing import Dict, Iterable, Optional
+
+from src.globals import data
+from src.util.syntax import *
+from src.util.util import *
+
+
+class SizeCache:
+    '''Persisted sizes of the data folders in the Mods folder, keyed by folder name without the disabled ~ prefix.
+    Sizes are computed in the background and only invalidated when the folders change'''
+
+    def __init__(self):
+        self.sizes: Dict[str, int] = {}
+        self.changed = False
+        self.reload()
+
+    def reload(self) -> None:
+        self.sizes = {}
+        if path.exists(self.xmlfile):
+            try:
+                with open(self.xmlfile, 'r', encoding='utf-8') as file:
+                    tree = XML.parse(file)
+                for xmlfolder in tree.getroot().findall('folder'):
+                    self.sizes[str(xmlfolder.get('name'))] = int(str(xmlfolder.get('size')))
+            except (XML.ParseError, ValueError) as e:
+                print(f"could not read size cache: {e}")
+                self.sizes = {}
+
+    def write(self) -> None:
+        if not self.changed:
+            return
+        root = XML.ElementTree(XML.Element('sizes'))
+        for name, size in self.sizes.items():
+            xmlfolder = XML.SubElement(root.getroot(), 'folder')
+            xmlfolder.set('name', name)
+            xmlfolder.set('size', str(size))
+        indent(root.getroot())
+        try:
+            with open(self.xmlfile, 'wb') as file:
+                root.write(file, encoding='utf-8')
+            self.changed = False
+        except OSError as e:
+            print(f"could not write size cache: {e}")
+
+    @staticmethod
+    def key(folder: str) -> str:
+        return folder[1:] if folder.startswith('~') else folder
+
+    def get(self, folder: str) -> Optional[int]:
+        return self.sizes.get(self.key(folder))
+
+    def set(self, folder: str, size: int) -> None:
+        if self.sizes.get(self.key(folder)) != size:
+            self.sizes[self.key(folder)] = size
+            self.changed = True
+
+    def invalidate(self, folders: Iterable[str]) -> None:
+        for folder in folders:
+            if self.key(folder) in self.sizes:
+                del self.sizes[self.key(folder)]
+                self.changed = True
+
+    def total(self, folders: Iterable[str]) -> Optional[int]:
+        '''Returns the total size of the folders, or None if any of them is not known yet'''
+        total = 0
+        for folder in folders:
+            size = self.get(folder)
+            if size is None:
+                return None
+            total += size
+        return total
+
+    @staticmethod
+    def compute(folder: str) -> int:
+        '''Computes the size of the enabled and the disabled copy of a data folder'''
+        return getFolderSize(data.config.mods + "/" + SizeCache.key(folder)) + \
+            getFolderSize(data.config.mods + "/~" + SizeCache.key(folder))
+
+    @property
+    def xmlfile(self) -> str:
+        return data.config.configuration + '/sizes.xml'
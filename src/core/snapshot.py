@@ -0,0 +1,82 @@
+'''Mod list snapshot'''
+# pylint: disable=invalid-name,missing-docstring,wildcard-import,unused-wildcard-import
+
+import xml.etree.ElementTree as XML
+from dataclasses import dataclass
+from os import path
+from typing import Iterable, List, Optional, Tuple
+
+from src.core.sizes import SizeCache
+from src.domain.mod import Mod
+from src.globals import data
+from src.util.syntax import *
+from src.util.util import *
+
+
+@dataclass
+class ModRow:
+    '''Displayed values of a mod in the mod list.
+    Counts are the numbers of data folders, dlcs, menus, xml keys, hidden xml keys and input keys'''
+
+    name: str
+    enabled: bool
+    priority: str
+    counts: Tuple[int, ...]
+    usersettings: bool
+    size: Optional[int]
+    date: str
+
+    @staticmethod
+    def fromMod(mod: Mod, sizes: SizeCache) -> 'ModRow':
+        return ModRow(mod.name, mod.enabled, mod.priority,
+                      (len(mod.files), len(mod.dlcs), len(mod.menus), len(mod.xmlkeys), len(mod.hidden),
+                       len(mod.inputsettings)),
+                      bool(mod.usersettings), sizes.total(mod.files), mod.date)
+
+
+def snapshotFile() -> str:
+    return data.config.configuration + '/snapshot.xml'
+
+
+def readSnapshot() -> Optional[List[ModRow]]:
+    '''Reads the mod list as it was last shown, or None if there is no usable snapshot'''
+    if not path.isfile(snapshotFile()):
+        return None
+    try:
+        with open(snapshotFile(), 'r', encoding='utf-8') as file:
+            tree = XML.parse(file)
+        rows = []
+        for elem in tree.getroot().findall('mod'):
+            size = elem.get('size')
+            rows.append(ModRow(
+                str(elem.get('name')),
+                elem.get('enabled') == 'True',
+                str(elem.get('priority')),
+                tuple(int(count) for count in str(elem.get('counts')).split(',')),
+                elem.get('usersettings') == 'True',
+                int(size) if size else None,
+                str(elem.get('date'))))
+        return rows
+    except (XML.ParseError, ValueError) as e:
+        print(f"could not read mod list snapshot: {e}")
+        return None
+
+
+def writeSnapshot(rows: Iterable[ModRow]) -> None:
+    root = XML.ElementTree(XML.Element('snapshot'))
+    for row in rows:
+        elem = XML.SubElement(root.getroot(), 'mod')
+        elem.set('name', row.name)
+        elem.set('enabled', str(row.enabled))
+        elem.set('priority', row.priority)
+        elem.set('counts', ','.join(str(count) for count in row.counts))
+        elem.set('usersettings', str(row.usersettings))
+        if row.size is not None:
+            elem.set('size', str(row.size))
+        elem.set('date', row.date)
+    indent(root.getroot())
+    try:
+        with open(snapshotFile(), 'wb') as file:
+            root.write(file, encoding='utf-8')
+    except OSError as e:
+        print(f"could not write mod list snapshot: {e}")
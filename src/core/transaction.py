@@ -0,0 +1,87 @@
+'''Settings transactions'''
+# pylint: disable=invalid-name,missing-docstring
+
+import os
+from os import path
+from typing import Dict, Optional, Tuple
+
+from src.util.util import detectEncoding
+
+
+class SettingsTransaction:
+    '''Buffers edits to game config files in memory. Every file is read once when first accessed
+    and written once on commit, savepoints allow discarding the edits of a single failed mod'''
+
+    def __init__(self):
+        self.original: Dict[str, Optional[str]] = {}
+        self.files: Dict[str, Optional[str]] = {}
+        self.encodings: Dict[str, str] = {}
+        self.originalEncodings: Dict[str, str] = {}
+
+    def read(self, filename: str) -> Optional[str]:
+        '''Returns the buffered text of the file, or None if it doesn't exist'''
+        if filename not in self.files:
+            text = None
+            if path.exists(filename):
+                encoding = detectEncoding(filename)
+                with open(filename, 'r', encoding=encoding) as file:
+                    text = file.read()
+                self.originalEncodings[filename] = encoding
+            self.original[filename] = text
+            self.files[filename] = text
+        return self.files[filename]
+
+    def exists(self, filename: str) -> bool:
+        return self.read(filename) is not None
+
+    def write(self, filename: str, text: str, encoding: str = 'utf-8') -> None:
+        '''Buffers the new text of the file until commit'''
+        self.read(filename)
+        self.files[filename] = text
+        self.encodings[filename] = encoding
+
+    def savepoint(self) -> Tuple[Dict[str, Optional[str]], Dict[str, str]]:
+        return dict(self.files), dict(self.encodings)
+
+    def rollback(self, savepoint: Optional[Tuple[Dict[str, Optional[str]], Dict[str, str]]] = None) -> None:
+        '''Discards all edits made since the savepoint, or all buffered edits'''
+        if savepoint is None:
+            self.files = dict(self.original)
+            self.encodings = {}
+        else:
+            files, encodings = savepoint
+            for filename in self.files:
+                self.files[filename] = files.get(filename, self.original[filename])
+            self.encodings = dict(encodings)
+
+    def commit(self) -> int:
+        '''Writes every changed file once. If writing fails the already written files are restored.
+        Returns the number of files written'''
+        written = []
+        try:
+            for filename, text in self.files.items():
+                if text is None or text == self.original[filename]:
+                    continue
+                print(f"writing {filename}")
+                self.writeFile(filename, text, self.encodings.get(filename, 'utf-8'))
+                written.append(filename)
+        except Exception:
+            for filename in written:
+                try:
+                    if self.original[filename] is None:
+                        os.remove(filename)
+                    else:
+                        self.writeFile(filename, str(self.original[filename]),
+                                       self.originalEncodings.get(filename, 'utf-8'))
+                except OSError as e:
+                    print(f"failed to restore {filename}: {e}")
+            raise
+        self.original = dict(self.files)
+        return len(written)
+
+    @staticmethod
+    def writeFile(filename: str, text: str, encoding: str) -> None:
+        with open(filename, 'w', encoding=encoding) as file:
+            file.write(text)
+            file.flush()
+            os.fsync(file.fileno())
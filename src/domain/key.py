@@ -106,7 +106,7 @@ class Key:
                 self.type = 'keyboard'
 
     def __repr__(self):
-        if (self.key.startswith("Version")):
+        if (self.empty or self.key.startswith("Version")):
             return self.key
         else:
             return self.key + "=(" + repr(self.action) + ")"
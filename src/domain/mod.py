@@ -2,20 +2,34 @@
 # pylint: disable=invalid-name,wildcard-import,unused-wildcard-import,superfluous-parens,missing-docstring
 
 import re
-from configparser import ConfigParser
 from dataclasses import dataclass, field
-from os import path, rename, walk
+from os import makedirs, path, rename, walk
 from time import gmtime, strftime
-from typing import List, Optional, Union, Tuple
+from typing import Callable, List, Optional, Union, Tuple
 
 from PySide2.QtWidgets import QMessageBox
 
+from src.core.policy import CONFLICT_KEY, POLICY_KEEP, POLICY_OVERWRITE, ConflictPolicy
+from src.core.transaction import SettingsTransaction
 from src.domain.key import Key
 from src.globals import data
 from src.globals.constants import translate
 from src.gui.alerts import MessageRebindKeys
+from src.util.profiling import traced
 from src.util.util import *
 
+DLC_SCHEME_FOLDER = 'folder'
+DLC_SCHEME_FILES = 'files'
+
+DETAILS_DATA = 'data'
+DETAILS_DLC = 'dlc'
+DETAILS_MENUS = 'menus'
+DETAILS_XML = 'xml'
+DETAILS_HIDDEN = 'hidden'
+DETAILS_INPUT = 'input'
+DETAILS_USERSETTINGS = 'usersettings'
+DETAILS_README = 'readme'
+
 
 @dataclass
 class Mod:
@@ -26,6 +40,7 @@ class Mod:
     enabled: bool = True
     date: str = ''
     source: str = ''
+    dlcscheme: str = DLC_SCHEME_FOLDER
 
     files: List[str] = field(default_factory=list)
     dlcs: List[str] = field(default_factory=list)
@@ -53,9 +68,14 @@ class Mod:
 
     @priority.setter
     def priority(self, value: Union[str, int, None]):
+        self.setPriority(value)
+
+    def setPriority(self, value: Union[str, int, None], write: bool = True):
+        '''Sets the priority of all data folders of the mod. Without write, removed priorities
+        are only written to mods.settings with the next write_priority'''
         if value is None or not str(value).isdecimal():
             for modfile in iter(self.files):
-                data.config.removePriority(modfile)
+                data.config.removePriority(modfile, write)
             self._priority = None
         else:
             for filedata in iter(self.files):
@@ -97,64 +117,68 @@ class Mod:
 
         return name
 
-    def enable(self) -> list[str]:
-        incomplete = []
-        if (not self.enabled):
-            try:
-                self.installXmlKeys()
-            except Exception as e:
-                incomplete.append("input.xml")
-                print("failed to install xmlkeys", e)
-            try:
-                self.installMenus()
-            except Exception as e:
-                incomplete.append(translate("MainWindow", "menu xml files"))
-                print("failed to install menus", e)
-            for menu in iter(self.menus):
-                if path.exists(data.config.menu + "/" + menu + ".disabled"):
-                    rename(
-                        data.config.menu + "/" + menu + ".disabled",
-                        data.config.menu + "/" + menu)
-            for dlc in iter(self.dlcs):
-                if path.exists(data.config.dlc + "/" + dlc):
-                    for subdir, _, fls in walk(data.config.dlc + "/" + dlc):
-                        for file in fls:
-                            if (path.exists(subdir + "/" + file)):
-                                if file.endswith(".disabled") and not file.startswith("."):
-                                    rename(subdir + "/" + file,
-                                           subdir + "/" + file[:-9])
-            for filedata in iter(self.files):
-                if path.exists(data.config.mods + "/~" + filedata):
-                    rename(
-                        data.config.mods + "/~" + filedata,
-                        data.config.mods + "/" + filedata)
-            self.enabled = True
-        return incomplete
+    def enable(self):
+        '''Renames the disabled menu and data files of the mod back to their enabled names and moves the dlcs back.
+        Game config files are rebuilt separately for all mods with rebuildGameConfigs'''
+        if self.enabled:
+            return
+        for menu in iter(self.menus):
+            if path.exists(data.config.menu + "/" + menu + ".disabled"):
+                rename(
+                    data.config.menu + "/" + menu + ".disabled",
+                    data.config.menu + "/" + menu)
+        for dlc in iter(self.dlcs):
+            if path.exists(data.config.disableddlc + "/" + dlc) and not path.exists(data.config.dlc + "/" + dlc):
+                rename(
+                    data.config.disableddlc + "/" + dlc,
+                    data.config.dlc + "/" + dlc)
+            elif self.dlcscheme == DLC_SCHEME_FILES and path.exists(data.config.dlc + "/" + dlc):
+                # migrate dlcs disabled by renaming every file
+                for subdir, _, fls in walk(data.config.dlc + "/" + dlc):
+                    for file in fls:
+                        if (path.exists(subdir + "/" + file)):
+                            if file.endswith(".disabled") and not file.startswith("."):
+                                rename(subdir + "/" + file,
+                                       subdir + "/" + file[:-9])
+        self.dlcscheme = DLC_SCHEME_FOLDER
+        for filedata in iter(self.files):
+            if path.exists(data.config.mods + "/~" + filedata):
+                rename(
+                    data.config.mods + "/~" + filedata,
+                    data.config.mods + "/" + filedata)
+        self.enabled = True
 
     def disable(self):
-        if (self.enabled):
-            self.uninstallXmlKeys()
-            self.uninstallMenus()
-            for menu in iter(self.menus):
-                if path.exists(data.config.menu + "/" + menu) and not menu.endswith(".disabled"):
+        '''Renames the menu and data files of the mod to their disabled names and moves the dlcs out of the DLC folder.
+        Game config files are rebuilt separately for all mods with rebuildGameConfigs'''
+        if not self.enabled:
+            return
+        clashes = [dlc for dlc in self.dlcs
+                   if path.exists(data.config.dlc + "/" + dlc) and path.exists(data.config.disableddlc + "/" + dlc)]
+        if clashes:
+            # the disabled copy may belong to another installed mod, it's never deleted
+            raise Exception(
+                self.name + translate("MOD", " could not be disabled, these dlcs already exist in ") +
+                data.config.disableddlc + ": " + ", ".join(clashes))
+        for menu in iter(self.menus):
+            if path.exists(data.config.menu + "/" + menu) and not menu.endswith(".disabled"):
+                rename(
+                    data.config.menu + "/" + menu,
+                    data.config.menu + "/" + menu + ".disabled")
+        for dlc in iter(self.dlcs):
+            if path.exists(data.config.dlc + "/" + dlc):
+                makedirs(data.config.disableddlc, exist_ok=True)
+                rename(
+                    data.config.dlc + "/" + dlc,
+                    data.config.disableddlc + "/" + dlc)
+        self.dlcscheme = DLC_SCHEME_FOLDER
+        for filedata in iter(self.files):
+            if path.exists(data.config.mods + "/" + filedata):
+                if not filedata.startswith("~"):
                     rename(
-                        data.config.menu + "/" + menu,
-                        data.config.menu + "/" + menu + ".disabled")
-            for dlc in iter(self.dlcs):
-                if path.exists(data.config.dlc + "/" + dlc):
-                    for subdir, _, fls in walk(data.config.dlc + "/" + dlc):
-                        for file in fls:
-                            if not file.endswith(".disabled") and not file.startswith("."):
-                                rename(
-                                    path.join(subdir, file),
-                                    path.join(subdir, file) + ".disabled")
-            for filedata in iter(self.files):
-                if path.exists(data.config.mods + "/" + filedata):
-                    if not filedata.startswith("~"):
-                        rename(
-                            data.config.mods + "/" + filedata,
-                            data.config.mods + "/~" + filedata)
-            self.enabled = False
+                        data.config.mods + "/" + filedata,
+                        data.config.mods + "/~" + filedata)
+        self.enabled = False
 
     def checkPriority(self):
         if (not self.priority):
@@ -162,122 +186,10 @@ class Mod:
                 if (data.config.priority.has_section(filedata)):
                     self.priority = data.config.getPriority(filedata)
 
-    def installMenus(self):
-        if (data.config.gameversion == "ng" and self.menus):
-            with open(data.config.menu + "/dx11filelist.txt", 'r', encoding=detectEncoding(data.config.menu + "/dx11filelist.txt")) as userfile:
-                text = userfile.read()
-            for menu in iter(self.menus):
-                menu_line = menu + ";"
-                if (menu_line not in text):
-                    text = text + '\n' + menu_line
-            with open(data.config.menu + "/dx11filelist.txt", 'w', encoding="utf-16") as userfile:
-                text = text.replace('\n\n', '\n')
-                text = userfile.write(text)
-                userfile.flush()
-                os.fsync(userfile.fileno())
-            with open(data.config.menu + "/dx12filelist.txt", 'r', encoding=detectEncoding(data.config.menu + "/dx12filelist.txt")) as userfile:
-                text = userfile.read()
-            for menu in iter(self.menus):
-                menu_line = menu + ";"
-                if (menu_line not in text):
-                    text = text + '\n' + menu_line
-            with open(data.config.menu + "/dx12filelist.txt", 'w', encoding="utf-16") as userfile:
-                text = text.replace('\n\n', '\n')
-                text = userfile.write(text)
-                userfile.flush()
-                os.fsync(userfile.fileno())
-
-    def installXmlKeys(self):
-        if (self.xmlkeys):
-            text = ''
-            with open(data.config.menu + "/input.xml", 'r', encoding=detectEncoding(data.config.menu + "/input.xml")) as userfile:
-                text = userfile.read()
-            for xml in iter(self.xmlkeys):
-                if (xml not in text):
-                    text = text.replace(
-                        '<!-- [BASE_CharacterMovement] -->',
-                        xml+'\n<!-- [BASE_CharacterMovement] -->')
-            with open(data.config.menu + "/input.xml", 'w', encoding="utf-16") as userfile:
-                text = userfile.write(text)
-                userfile.flush()
-                os.fsync(userfile.fileno())
-        if (self.hidden):
-            text = ''
-            with open(data.config.menu + "/hidden.xml", 'r', encoding=detectEncoding(data.config.menu + "/hidden.xml")) as userfile:
-                text = userfile.read()
-            for xml in iter(self.hidden):
-                if (xml not in text):
-                    text = text.replace(
-                        '</VisibleVars>',
-                        xml+'\n</VisibleVars>')
-            with open(data.config.menu + "/hidden.xml", 'w', encoding="utf-16") as userfile:
-                text = userfile.write(text)
-                userfile.flush()
-                os.fsync(userfile.fileno())
-
-    def uninstallMenus(self):
-        if (data.config.gameversion == "ng" and self.menus):
-            if path.exists(data.config.menu + "/dx11filelist.txt"):
-                with open(data.config.menu + "/dx11filelist.txt", 'r', encoding=detectEncoding(data.config.menu + "/dx11filelist.txt")) as userfile:
-                    text = userfile.read()
-                for menu in iter(self.menus):
-                    menu_line = menu + ";"
-                    if (menu_line in text):
-                        text = text.replace('\n'+menu_line, '')
-                with open(data.config.menu + "/dx11filelist.txt", 'w', encoding="utf-16") as userfile:
-                    text = text.replace('\n\n', '\n')
-                    text = userfile.write(text)
-                    userfile.flush()
-                    os.fsync(userfile.fileno())
-            if path.exists(data.config.menu + "/dx12filelist.txt"):
-                with open(data.config.menu + "/dx12filelist.txt", 'r', encoding=detectEncoding(data.config.menu + "/dx12filelist.txt")) as userfile:
-                    text = userfile.read()
-                for menu in iter(self.menus):
-                    menu_line = menu + ";"
-                    if (menu_line in text):
-                        text = text.replace('\n'+menu_line, '')
-                with open(data.config.menu + "/dx12filelist.txt", 'w', encoding="utf-16") as userfile:
-                    text = text.replace('\n\n', '\n')
-                    text = userfile.write(text)
-                    userfile.flush()
-                    os.fsync(userfile.fileno())
-
-    def uninstallXmlKeys(self):
-        if (self.xmlkeys) and path.exists(data.config.menu + "/input.xml"):
-            text = ''
-            with open(data.config.menu + "/input.xml", 'r', encoding=detectEncoding(data.config.menu + "/input.xml")) as userfile:
-                text = userfile.read()
-            for xml in iter(self.xmlkeys):
-                if xml in text:
-                    text = text.replace(xml+"\n", '')
-            with open(data.config.menu + "/input.xml", 'w', encoding="utf-16") as userfile:
-                text = userfile.write(text)
-                userfile.flush()
-                os.fsync(userfile.fileno())
-        if (self.hidden) and path.exists(data.config.menu + "/hidden.xml"):
-            text = ''
-            with open(data.config.menu + "/hidden.xml", 'r', encoding=detectEncoding(data.config.menu + "/hidden.xml")) as userfile:
-                text = userfile.read()
-            for xml in iter(self.hidden):
-                if xml in text:
-                    text = text.replace(xml+"\n", '')
-            with open(data.config.menu + "/hidden.xml", 'w', encoding="utf-16") as userfile:
-                text = userfile.write(text)
-                userfile.flush()
-                os.fsync(userfile.fileno())
-
-    def installInputKeys(self) -> Tuple[int, int]:
-        from src.core.fetcher import fetchInputSettings
-
-        print("installing input settings", str(self.inputsettings))
+    def findKeyConflicts(self, existing: List[Key]) -> Tuple[int, List[Tuple[Key, List[Key]]]]:
+        '''Adds the input keys of the mod that don't conflict to existing.
+        Returns the number of added keys and the keys conflicting with existing bindings'''
         added = 0
-        skipped = 0
-        existing: List[Key] = []
-        filename = data.config.settings + "/input.settings"
-        if path.exists(filename):
-            with open(filename, 'r', encoding=detectEncoding(filename)) as userfile:
-                text = userfile.read()
-                existing = fetchInputSettings(text)
         conflicts: List[Tuple[Key, List[Key]]] = []
         if (self.inputsettings):
             for key in iter(self.inputsettings):
@@ -292,15 +204,38 @@ class Mod:
                     existing.append(key)
                 else:
                     conflicts.append((key, conflicting))
+        return added, conflicts
+
+    @traced("installInputKeys", lambda mod, *_: mod.name)
+    def installInputKeys(self, transaction: Optional[SettingsTransaction] = None,
+                         policy: Optional[ConflictPolicy] = None) -> Tuple[int, int]:
+        from src.core.fetcher import fetchInputSettings
+
+        print("installing input settings", str(self.inputsettings))
+        committing = transaction is None
+        transaction = transaction or SettingsTransaction()
+        skipped = 0
+        existing: List[Key] = []
+        filename = data.config.settings + "/input.settings"
+        if transaction.exists(filename):
+            existing = fetchInputSettings(str(transaction.read(filename)))
+        added, conflicts = self.findKeyConflicts(existing)
         if conflicts:
             saved = None
             for (key, conflicting) in conflicts:
                 print("conflicting key", key, conflicting)
                 for e in conflicting:
                     justModifiers = e.key == key.key and e.action != key.action
-                    if saved is None:
+                    decision = policy.resolveKey(self.name, e, key) if policy else None
+                    if decision:
+                        msg = QMessageBox.Yes if decision == POLICY_OVERWRITE else QMessageBox.No
+                    elif saved is None:
                         msg = MessageRebindKeys(
                             e, key, e.context, justModifiers)
+                        if policy:
+                            policy.log(self.name, CONFLICT_KEY, e.context.strip('[]'), f"{e} -> {key}",
+                                       POLICY_OVERWRITE if msg in (QMessageBox.Yes, QMessageBox.YesToAll)
+                                       else POLICY_KEEP, "user")
                     else:
                         msg = saved
                     if msg == QMessageBox.Yes:
@@ -333,111 +268,61 @@ class Mod:
                 text += '\n'
             if not key.empty:
                 text += repr(key) + "\n"
-        with open(filename, 'w', encoding="utf-8") as userfile:
-            userfile.write(text)
-            userfile.flush()
-            os.fsync(userfile.fileno())
+        transaction.write(filename, text)
+        if committing:
+            transaction.commit()
 
         return added, skipped
 
-    def installUserSettings(self) -> int:
-        added = 0
+    def detailSections(self) -> List[Tuple[str, Callable[[], str]]]:
+        '''Returns the non-empty detail sections with functions rendering their text on demand'''
+        sections: List[Tuple[str, Callable[[], str]]] = []
+        for section, values in ((DETAILS_DATA, self.files), (DETAILS_DLC, self.dlcs), (DETAILS_MENUS, self.menus),
+                                (DETAILS_XML, self.xmlkeys), (DETAILS_HIDDEN, self.hidden)):
+            if values:
+                sections.append((section, lambda values=values: '\n'.join(values)))
+        if self.inputsettings:
+            sections.append((DETAILS_INPUT, lambda: self.groupedText(self.inputsettings, '{}')))
         if self.usersettings:
-            added = self.installUserSettingsToFile("user.settings")
-
-            if data.config.gameversion == "ng":
-                dx12AdditionCount = self.installUserSettingsToFile(
-                    "dx12user.settings")
-                if added != dx12AdditionCount:
-                    raise Exception(self.name + ' failed to install same number of user settings to dx11 and dx12 user.settings files dx11 count: '
-                                    + added + 'dx12 count: ' + dx12AdditionCount)
-        return added
+            sections.append((DETAILS_USERSETTINGS, lambda: self.groupedText(self.usersettings, '[{}]')))
+        for readme in self.readmes:
+            sections.append((DETAILS_README, lambda readme=readme: readme))
+        return sections
 
-    def installUserSettingsToFile(self, fileName) -> int:
-        added = 0
-        absFilePath = data.config.settings + '/' + fileName
-        config = ConfigParser(strict=False)
-        config.optionxform = str
-        if path.exists(absFilePath):
-            config.read(absFilePath, encoding=detectEncoding(absFilePath))
-        for setting in iter(self.usersettings):
-            if not config.has_section(setting.context):
-                config.add_section(setting.context)
-            config.set(setting.context, setting.option, setting.value)
-            added += 1
-        with open(absFilePath, 'w', encoding="utf-8") as userfile:
-            config.write(userfile, space_around_delimiters=False)
-            userfile.flush()
-            os.fsync(userfile.fileno())
-        return added
-
-    def uninstallUserSettings(self):
-        if self.usersettings:
-            self.uninstallUserSettingsFromFile("user.settings")
-
-            if data.config.gameversion == "ng":
-                self.uninstallUserSettingsFromFile("dx12user.settings")
-
-    def uninstallUserSettingsFromFile(self, fileName):
-        absFilePath = data.config.settings + '/' + fileName
-        if not path.exists(absFilePath):
-            return
-        config = ConfigParser(strict=False)
-        config.optionxform = str
-        config.read(absFilePath, encoding=detectEncoding(absFilePath))
-        for setting in iter(self.usersettings):
-            if config.has_section(setting.context):
-                config.remove_option(setting.context, setting.option)
-        with open(absFilePath, 'w', encoding="utf-8") as userfile:
-            config.write(userfile, space_around_delimiters=False)
-            userfile.flush()
-            os.fsync(userfile.fileno())
+    @staticmethod
+    def groupedText(settings: List[object], contextFormat: str) -> str:
+        '''Renders settings grouped by their context'''
+        lines: List[str] = []
+        context = ''
+        for elem in iter(settings):
+            if (elem.context != context):
+                if (context != ''):
+                    lines.append('')
+                context = elem.context
+                lines.append(contextFormat.format(context))
+            lines.append(str(elem))
+        return '\n'.join(lines)
+
+    def summary(self) -> str:
+        return translate("MOD", "NAME: ") + str(self.name) + "\n" + translate("MOD", "ENABLED: ") + \
+            str(self.enabled) + "\n" + translate("MOD", "PRIORITY: ") + self.priority + "\n"
 
     def __repr__(self):
-        string = translate("MOD", "NAME: ") + str(self.name) + "\n" + translate("MOD", "ENABLED: ") + str(self.enabled) + \
-            "\n" + translate("MOD", "PRIORITY: ") + self.priority + "\n"
-        if (self.files):
-            string += "\n"+translate("MOD", "DATA:")+"\n"
-            for file in iter(self.files):
-                string += file + "\n"
-        if (self.dlcs):
-            string += "\n"+translate("MOD", "DLC:")+"\n"
-            for dlc in iter(self.dlcs):
-                string += dlc + "\n"
-        if (self.menus):
-            string += "\n"+translate("MOD", "MENUS:")+"\n"
-            for menu in iter(self.menus):
-                string += menu + "\n"
-        if (self.xmlkeys):
-            string += "\n"+translate("MOD", "XML VARIABLES:")+"\n"
-            for xml in iter(self.xmlkeys):
-                string += xml + "\n"
-        if (self.hidden):
-            string += "\n"+translate("MOD", "HIDDEN XML:")+"\n"
-            for xml in iter(self.hidden):
-                string += xml + "\n"
-        if (self.inputsettings):
-            string += "\n"+translate("MOD", "INPUT KEYS:")+"\n"
-            context = ''
-            for elem in iter(self.inputsettings):
-                if (elem.context != context):
-                    if (context != ''):
-                        string += '\n'
-                    context = elem.context
-                    string += context + '\n'
-                string += str(elem) + "\n"
-        if (self.usersettings):
-            string += "\n"+translate("MOD", "USER SETTINGS:")+"\n"
-            context = ''
-            for elem in iter(self.usersettings):
-                if (elem.context != context):
-                    if (context != ''):
-                        string += '\n'
-                    context = elem.context
-                    string += '[' + context + ']' + '\n'
-                string += str(elem) + "\n"
-        if (self.readmes):
-            string += "\n"+translate("MOD", "READMES:")+"\n"
-            for readme in iter(self.readmes):
-                string += readme + "\n"
-        return string
+        headings = {
+            DETAILS_DATA: translate("MOD", "DATA:"),
+            DETAILS_DLC: translate("MOD", "DLC:"),
+            DETAILS_MENUS: translate("MOD", "MENUS:"),
+            DETAILS_XML: translate("MOD", "XML VARIABLES:"),
+            DETAILS_HIDDEN: translate("MOD", "HIDDEN XML:"),
+            DETAILS_INPUT: translate("MOD", "INPUT KEYS:"),
+            DETAILS_USERSETTINGS: translate("MOD", "USER SETTINGS:"),
+            DETAILS_README: translate("MOD", "READMES:"),
+        }
+        parts = [self.summary()]
+        previous = ''
+        for section, render in self.detailSections():
+            if section != previous:
+                parts.append("\n" + headings[section] + "\n")
+                previous = section
+            parts.append(render() + "\n")
+        return ''.join(parts)
@@ -1,17 +1,18 @@
-
 '''Details Dialog'''
 # pylint: disable=invalid-name
 
+from typing import Callable, Dict
+
 from PySide2 import QtCore
-from PySide2.QtGui import QTextDocument
-from PySide2.QtWidgets import QWidget, QHBoxLayout, QTextEdit
+from PySide2.QtWidgets import QWidget, QHBoxLayout, QTabWidget, QTextEdit
 
 from src.globals.constants import translate
-from src.domain.mod import Mod
+from src.domain.mod import DETAILS_DATA, DETAILS_DLC, DETAILS_HIDDEN, DETAILS_INPUT, DETAILS_MENUS, \
+    DETAILS_README, DETAILS_USERSETTINGS, DETAILS_XML, Mod
 
 
 class DetailsDialog(QWidget):
-    '''Dialog showing mod details'''
+    '''Dialog showing mod details, one tab per section. Sections are rendered when their tab is first opened'''
 
     def __init__(self, parent: QWidget, mod: Mod):
         super().__init__(parent)
@@ -22,25 +23,58 @@ class DetailsDialog(QWidget):
         self.setMinimumSize(600, 600)
         self.layout = QHBoxLayout(self)
         self.layout.setObjectName("layout")
-        self.document = QTextDocument()
-        self.document.setPlainText(str(mod))
-        self.text = QTextEdit(self)
-        self.text.setObjectName("text")
-        self.text.setDocument(self.document)
-        self.text.setAutoFormatting(QTextEdit.AutoAll)
-        self.text.setReadOnly(True)
-        self.text.setLineWrapMode(QTextEdit.NoWrap)
-        self.layout.addWidget(self.text)
+        self.tabs = QTabWidget(self)
+        self.tabs.setObjectName("tabs")
+        self.layout.addWidget(self.tabs)
+        self.renderers: Dict[int, Callable[[], str]] = {}
+
+        titles = {
+            DETAILS_DATA: translate("Details", "Data"),
+            DETAILS_DLC: translate("Details", "DLC"),
+            DETAILS_MENUS: translate("Details", "Menus"),
+            DETAILS_XML: translate("Details", "XML Variables"),
+            DETAILS_HIDDEN: translate("Details", "Hidden XML"),
+            DETAILS_INPUT: translate("Details", "Input Keys"),
+            DETAILS_USERSETTINGS: translate("Details", "User Settings"),
+            DETAILS_README: translate("Details", "Readme"),
+        }
+        self.addSection(translate("Details", "Overview"), mod.summary)
+        sections = mod.detailSections()
+        readmes = sum(1 for section, _ in sections if section == DETAILS_README)
+        readme = 0
+        for section, render in sections:
+            title = titles[section]
+            if section == DETAILS_README and readmes > 1:
+                readme += 1
+                title += f" {readme}"
+            self.addSection(title, render, section == DETAILS_README)
+        self.tabs.currentChanged.connect(self.renderTab)
+        self.renderTab(0)
 
         self.setWindowTitle(mod.name + " " + translate("Details", "Details"))
         QtCore.QMetaObject.connectSlotsByName(self)
 
+    def addSection(self, title: str, render: Callable[[], str], wrap: bool = False):
+        '''Adds an empty tab that is filled by render when it is opened'''
+        text = QTextEdit(self.tabs)
+        text.setAutoFormatting(QTextEdit.AutoAll)
+        text.setReadOnly(True)
+        text.setLineWrapMode(QTextEdit.WidgetWidth if wrap else QTextEdit.NoWrap)
+        self.renderers[self.tabs.addTab(text, title)] = render
+
+    def renderTab(self, index: int):
+        '''Renders the section of the tab if it wasn't rendered yet'''
+        render = self.renderers.pop(index, None)
+        if render is not None:
+            self.tabs.widget(index).setPlainText(render())
+
     def adjustWidth(self):
         '''Fits size to content'''
+        text = self.tabs.currentWidget()
         self.resize(
-            self.document.idealWidth() +
-            self.text.contentsMargins().left() + self.text.contentsMargins().right() +
-            self.contentsMargins().left() + self.contentsMargins().right() + 50,
+            max(self.width(), int(text.document().idealWidth()) +
+                text.contentsMargins().left() + text.contentsMargins().right() +
+                self.contentsMargins().left() + self.contentsMargins().right() + 50),
             self.height())
 
     def showEvent(self, event):
@@ -1,10 +1,15 @@
 '''Main Widget'''
 # pylint: disable=invalid-name,superfluous-parens,wildcard-import,bare-except,broad-except,wildcard-import,unused-wildcard-import,missing-docstring,too-many-lines
 
+from functools import wraps
 from os import path
+from queue import Queue
 from sys import platform
+from threading import Lock, Thread
+from typing import List, Optional, Set
 
-from PySide2.QtCore import QFileInfo, QMetaObject, QRect, QSize, Qt, QThread, Signal
+from PySide2.QtCore import QFileInfo, QItemSelection, QItemSelectionModel, QMetaObject, QObject, QRect, QSize, Qt, \
+    QTimer, Signal
 from PySide2.QtGui import QCursor, QResizeEvent
 from PySide2.QtWidgets import (
     QAbstractItemView,
@@ -24,64 +29,145 @@ from PySide2.QtWidgets import (
     QSplitter,
     QTextEdit,
     QToolBar,
+    QTreeView,
     QTreeWidget,
     QVBoxLayout,
     QWidget,
 )
-from watchdog.events import PatternMatchingEventHandler
-from watchdog.observers import Observer
 
+from src.core.changes import CHANGE_MENU, CHANGE_MOD_CONTENT, CHANGE_MOD_LISTING, CHANGE_SETTINGS, ROOT_DLC, \
+    ROOT_MENU, ROOT_MODS, ROOT_SETTINGS, ChangeFeed
 from src.core.installer import Installer
+from src.core.loadorder import CHANGE_INSERT, CHANGE_REMOVE, LoadOrder
 from src.core.model import Model
+from src.core.policy import ConflictPolicy
+from src.core.preflight import preflight
+from src.core.profiles import Profiles
+from src.core.sizes import SizeCache
+from src.core.snapshot import ModRow
 from src.globals import data
 from src.globals.constants import *
 from src.gui.alerts import (
     MessageAlertIncompleteInstallation,
     MessageAlertScript,
+    MessageInitializationFailed,
     MessageUnsupportedOSAction,
 )
 from src.gui.details_dialog import DetailsDialog
+from src.gui.mod_list import COLUMN_NAME, ModFilterProxyModel, ModListModel
+from src.gui.preflight_dialog import PreflightDialog
+from src.gui.stall_monitor import StallMonitor, operation
 from src.gui.tree_widget import CustomTreeWidgetItem
+from src.util.iostats import accounting
+from src.util.profiling import MEMORY, TIMELINE, traced
 from src.util.syntax import *
 from src.util.util import *
 
 
-class ModsSettingsWatcher(QThread):
-    refresh = Signal(object)
+def accountedIO(f):
+    '''Decorator outputting the file system operations of the decorated main widget operation'''
+    @wraps(f)
+    def wrapped(self, *args, **kwargs):
+        with operation(f.__name__), accounting() as stats:
+            result = f(self, *args, **kwargs)
+        if stats is not None:
+            self.outputIO(stats)
+            MEMORY.snapshot(f.__name__)
+        return result
+    return wrapped
+
+
+class SizeWorker(QObject):
+    '''Computes the sizes of data folders in a background thread'''
+    computed = Signal(str, int)
+    idle = Signal()
 
     def __init__(self, *args, **kwargs):
-        self.modsEventHandler = PatternMatchingEventHandler(
-            patterns=["*mods.settings"],
-            ignore_patterns=[],
-            ignore_directories=True)
-        self.modsEventHandler.on_modified = lambda e: self.refresh.emit(e)
-        self.running = False
-        self.observer = Observer()
-        self.observer.schedule(self.modsEventHandler,
-                               path=data.config.settings, recursive=False)
         super().__init__(*args, **kwargs)
-        self.observer.start()
+        self.queue: Queue = Queue()
+        self.pending: Set[str] = set()
+        self.lock = Lock()
+        self.thread = Thread(target=self.work, daemon=True)
+        self.thread.start()
+
+    def request(self, folders):
+        for folder in folders:
+            folder = SizeCache.key(folder)
+            with self.lock:
+                if folder in self.pending:
+                    continue
+                self.pending.add(folder)
+            self.queue.put(folder)
+
+    def work(self):
+        while True:
+            folder = self.queue.get()
+            with self.lock:
+                self.pending.discard(folder)
+            try:
+                size = SizeCache.compute(folder)
+            except Exception as err:
+                print(f"could not compute size of {folder}: {err}")
+                size = 0
+            self.computed.emit(folder, size)
+            if self.queue.empty():
+                self.idle.emit()
+
+
+class ModelLoader(QObject):
+    '''Reads the mod list and fixes user.settings in a background thread while the snapshot is shown'''
+    loaded = Signal(object)
+    failed = Signal(object)
 
-    def __drop__(self):
-        if self.observer:
-            self.observer.stop()
-            self.observer.join()
-            self.observer = None
+    def __init__(self, model: Model, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.model = model
+        self.thread = Thread(target=self.work, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def work(self):
+        try:
+            fixUserSettingsDuplicateBrackets()
+            self.loaded.emit(self.model.read())
+        except Exception as err:
+            self.failed.emit(err)
 
 
 class CustomMainWidget(QWidget):
     '''Main Widget'''
 
-    def __init__(self, parent: QWidget, model: Model):
+    def __init__(self, parent: QWidget, model: Model, snapshot: Optional[List[ModRow]] = None):
         super().__init__(parent)
 
         self.mainWindow = parent
         self.model = model
+        self.profiles = Profiles()
+        self.policy = ConflictPolicy()
         self.searchString = ""
 
-        self.modsSettingsWatcher = ModsSettingsWatcher()
-        self.modsSettingsWatcher.refresh.connect(
-            lambda e: self.refreshLoadOrder())
+        self.modsLoadOrder = LoadOrder()
+        self.loadOrderFolders: Set[str] = set()
+        self.loadOrderRescan = False
+        self.loadOrderReload = False
+        self.loadOrderTimer = QTimer(self)
+        self.loadOrderTimer.setSingleShot(True)
+        self.loadOrderTimer.setInterval(100)
+        self.loadOrderTimer.timeout.connect(self.applyLoadOrder)
+
+        self.sizeWorker = SizeWorker()
+        self.sizeWorker.computed.connect(self.sizeComputed)
+        self.sizeWorker.idle.connect(self.model.sizes.write)
+
+        self.changeFeed = ChangeFeed(parent=self)
+        self.changeFeed.subscribe(CHANGE_MOD_CONTENT, self.modContentChanged)
+        self.changeFeed.subscribe(CHANGE_MOD_LISTING, self.modListingChanged)
+        self.changeFeed.subscribe(CHANGE_MENU, self.configFilesChanged)
+        self.changeFeed.subscribe(CHANGE_SETTINGS, self.configFilesChanged)
+        self.stallMonitor = StallMonitor(
+            data.config.stallthreshold, data.config.configuration + '/stalls.log', parent=self)
+        self.shown = False
 
         self.mainWindow.setObjectName("MainWindow")
 
@@ -107,14 +193,22 @@ class CustomMainWidget(QWidget):
         self.searchWidget = QLineEdit(self.centralwidget)
         self.searchWidget.setObjectName("searchWidget")
         self.searchWidget.setPlaceholderText(translate("MainWindow", "Search"))
+        self.searchWidget.setToolTip(translate(
+            "MainWindow", "Search terms can be limited to name:, data:, dlc:, menu:, key:, setting: or readme:"))
         self.verticalLayout_2.addWidget(self.searchWidget)
 
-        self.treeWidget = QTreeWidget(self.centralwidget)
+        self.modList = ModListModel(self.model, self)
+        self.modListProxy = ModFilterProxyModel(self)
+        self.modListProxy.setSourceModel(self.modList)
+
+        self.treeWidget = QTreeView(self.centralwidget)
+        self.treeWidget.setModel(self.modListProxy)
         self.treeWidget.setMinimumSize(QSize(600, 350))
         self.treeWidget.setUniformRowHeights(True)
         self.treeWidget.setAnimated(True)
         self.treeWidget.setHeaderHidden(False)
-        self.treeWidget.setColumnCount(8)
+        self.treeWidget.setRootIsDecorated(False)
+        self.treeWidget.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.treeWidget.setObjectName("treeWidget")
         self.treeWidget.header().setCascadingSectionResizes(True)
         self.treeWidget.header().setHighlightSections(False)
@@ -197,6 +291,12 @@ class CustomMainWidget(QWidget):
         self.menuSelect_Language.setObjectName("menuSelect_Language")
         self.menuConfigure_Settings = QMenu(self.menuSettings)
         self.menuConfigure_Settings.setObjectName("menuConfigure_Settings")
+        self.menuProfiles = QMenu(self.menubar)
+        self.menuProfiles.setObjectName("menuProfiles")
+        self.menuActivate_Profile = QMenu(self.menuProfiles)
+        self.menuActivate_Profile.setObjectName("menuActivate_Profile")
+        self.menuDelete_Profile = QMenu(self.menuProfiles)
+        self.menuDelete_Profile.setObjectName("menuDelete_Profile")
         self.menuHelp = QMenu(self.menubar)
         self.menuHelp.setObjectName("menuHelp")
         self.mainWindow.setMenuBar(self.menubar)
@@ -262,11 +362,12 @@ class CustomMainWidget(QWidget):
         self.actionAlert_to_run_Script_Merger.setCheckable(True)
         self.actionAlert_to_run_Script_Merger.setObjectName(
             "actionAlert_to_run_Script_Merger")
+        self.actionUnattended_Installs = QAction(self.mainWindow)
+        self.actionUnattended_Installs.setCheckable(True)
+        self.actionUnattended_Installs.setObjectName(
+            "actionUnattended_Installs")
         self.languageActionGroup = QActionGroup(self.mainWindow)
-        for lang in os.listdir(getProgramRootFolder() + '/translations/'):
-            temp = self.makeLangAction(lang)
-            self.languageActionGroup.addAction(temp)
-            self.menuSelect_Language.addAction(temp)
+        self.menuSelect_Language.aboutToShow.connect(self.fillLanguageMenu)
         self.actionChange_Game_Path = QAction(self.mainWindow)
         self.actionChange_Game_Path.setObjectName("actionChange_Game_Path")
         self.actionChange_Script_Merger_Path = QAction(self.mainWindow)
@@ -274,6 +375,8 @@ class CustomMainWidget(QWidget):
             "actionChange_Script_Merger_Path")
         self.actionClearOutput = QAction(self.mainWindow)
         self.actionClearOutput.setObjectName("actionClearOutput")
+        self.actionSave_Profile = QAction(self.mainWindow)
+        self.actionSave_Profile.setObjectName("actionSave_Profile")
 
         self.menuFile.addAction(self.actionInstall_Mods)
         self.menuFile.addAction(self.actionUninstall_Mods)
@@ -294,25 +397,47 @@ class CustomMainWidget(QWidget):
         self.menuConfigure_Settings.addSeparator()
         self.menuConfigure_Settings.addAction(
             self.actionAlert_to_run_Script_Merger)
+        self.menuConfigure_Settings.addAction(
+            self.actionUnattended_Installs)
         self.menuConfigure_Settings.addSeparator()
         self.menuSettings.addAction(self.menuConfigure_Settings.menuAction())
         self.menuSettings.addAction(self.menuSelect_Language.menuAction())
 
+        self.menuProfiles.addAction(self.actionSave_Profile)
+        self.menuProfiles.addSeparator()
+        self.menuProfiles.addAction(self.menuActivate_Profile.menuAction())
+        self.menuProfiles.addAction(self.menuDelete_Profile.menuAction())
+
         self.menuHelp.addAction(self.actionAbout)
         self.menuHelp.addAction(self.actionMain_Web_Page)
         self.menuHelp.addAction(self.actionGitHub)
         self.menubar.addAction(self.menuFile.menuAction())
         self.menubar.addAction(self.menuEdit.menuAction())
+        self.menubar.addAction(self.menuProfiles.menuAction())
         self.menubar.addAction(self.menuSettings.menuAction())
         self.menubar.addAction(self.menuHelp.menuAction())
 
         self.actionAddToToolbar = None
 
-        self.translateUi()
-        self.configureUi()
-        self.configureToolbar()
-        self.checkLanguage()
-        self.refreshList()
+        TIMELINE.mark("widgets created")
+        with TIMELINE.phase("translate ui"):
+            self.translateUi()
+        with TIMELINE.phase("configure ui"):
+            self.configureUi()
+        with TIMELINE.phase("toolbar"):
+            self.configureToolbar(lazy=True)
+        self.modelLoader = None
+        if not self.model.loaded:
+            # show the last list right away and patch it once the mods are read
+            self.modList.editable = False
+            self.modList.reset(snapshot or [])
+            self.setModelActionsEnabled(False)
+            self.modelLoader = ModelLoader(self.model, self)
+            self.modelLoader.loaded.connect(self.modelLoaded)
+            self.modelLoader.failed.connect(self.modelLoadFailed)
+            self.modelLoader.start()
+        with TIMELINE.phase("mod list"):
+            self.refreshList()
 
         QMetaObject.connectSlotsByName(self.mainWindow)
 
@@ -331,19 +456,19 @@ class CustomMainWidget(QWidget):
         self.mainWindow.setWindowTitle(
             translate("MainWindow", TITLE))
 
-        self.treeWidget.headerItem().setText(0, translate("MainWindow", "Enabled"))
-        self.treeWidget.headerItem().setText(1, translate("MainWindow", "Mod Name"))
-        self.treeWidget.headerItem().setText(2, translate("MainWindow", "Priority"))
-        self.treeWidget.headerItem().setText(3, translate("MainWindow", "Data"))
-        self.treeWidget.headerItem().setText(4, translate("MainWindow", "DLC"))
-        self.treeWidget.headerItem().setText(5, translate("MainWindow", "Menu"))
-        self.treeWidget.headerItem().setText(6, translate("MainWindow", "Var"))
-        self.treeWidget.headerItem().setText(7, translate("MainWindow", "Hidden"))
-        self.treeWidget.headerItem().setText(8, translate("MainWindow", "Key"))
-        self.treeWidget.headerItem().setText(9, translate("MainWindow", "Settings"))
-        self.treeWidget.headerItem().setText(10, translate("MainWindow", "Size"))
-        self.treeWidget.headerItem().setText(
-            11, translate("MainWindow", "Date Installed"))
+        self.modList.setHeaderData(0, Qt.Horizontal, translate("MainWindow", "Enabled"))
+        self.modList.setHeaderData(1, Qt.Horizontal, translate("MainWindow", "Mod Name"))
+        self.modList.setHeaderData(2, Qt.Horizontal, translate("MainWindow", "Priority"))
+        self.modList.setHeaderData(3, Qt.Horizontal, translate("MainWindow", "Data"))
+        self.modList.setHeaderData(4, Qt.Horizontal, translate("MainWindow", "DLC"))
+        self.modList.setHeaderData(5, Qt.Horizontal, translate("MainWindow", "Menu"))
+        self.modList.setHeaderData(6, Qt.Horizontal, translate("MainWindow", "Var"))
+        self.modList.setHeaderData(7, Qt.Horizontal, translate("MainWindow", "Hidden"))
+        self.modList.setHeaderData(8, Qt.Horizontal, translate("MainWindow", "Key"))
+        self.modList.setHeaderData(9, Qt.Horizontal, translate("MainWindow", "Settings"))
+        self.modList.setHeaderData(10, Qt.Horizontal, translate("MainWindow", "Size"))
+        self.modList.setHeaderData(
+            11, Qt.Horizontal, translate("MainWindow", "Date Installed"))
 
         self.loadOrder.headerItem().setText(0, translate("MainWindow", "Load Order"))
         self.loadOrder.headerItem().setText(1, translate("MainWindow", "Priority"))
@@ -362,6 +487,11 @@ class CustomMainWidget(QWidget):
             translate("MainWindow", "Select Language"))
         self.menuConfigure_Settings.setTitle(
             translate("MainWindow", "Configure Settings"))
+        self.menuProfiles.setTitle(translate("MainWindow", "Profiles"))
+        self.menuActivate_Profile.setTitle(
+            translate("MainWindow", "Activate Profile"))
+        self.menuDelete_Profile.setTitle(
+            translate("MainWindow", "Delete Profile"))
         self.menuHelp.setTitle(translate("MainWindow", "Help"))
         self.toolBar.setWindowTitle(translate("MainWindow", "toolBar"))
 
@@ -412,12 +542,20 @@ class CustomMainWidget(QWidget):
         self.actionGitHub.setShortcut("Ctrl+F2")
         self.actionAlert_to_run_Script_Merger.setText(
             translate("MainWindow", "Alert to run Script Merger"))
+        self.actionUnattended_Installs.setText(
+            translate("MainWindow", "Unattended Installs"))
+        self.actionUnattended_Installs.setToolTip(
+            translate("MainWindow", "Resolve install conflicts with the conflict policies instead of asking"))
         self.actionChange_Game_Path.setText(
             translate("MainWindow", "Change Game Path"))
         self.actionChange_Script_Merger_Path.setText(
             translate("MainWindow", "Change Script Merger Path"))
         self.actionClearOutput.setText(
             translate("MainWindow", "Clear Output"))
+        self.actionSave_Profile.setText(
+            translate("MainWindow", "Save Profile"))
+        self.actionSave_Profile.setToolTip(
+            translate("MainWindow", "Save the enabled mods and their priorities as a named profile"))
         self.actionRename.setText(
             translate("MainWindow", "Rename"))
         self.actionRename.setShortcut("F2")
@@ -473,9 +611,9 @@ class CustomMainWidget(QWidget):
         self.actionEnable_Disable_Mods.triggered.connect(
             self.enableDisableMods)
         self.actionRefresh_Mod_List.triggered.connect(
-            lambda e: self.refreshList())
+            lambda e: self.refreshModList())
         self.actionRefresh_Load_Order.triggered.connect(
-            lambda e: self.refreshLoadOrder())
+            lambda e: self.reloadLoadOrder())
         self.actionSelect_All_Mods.triggered.connect(self.selectAllMods)
         self.actionRun_The_Game.triggered.connect(self.runTheGame)
         self.actionRun_Script_Merger.triggered.connect(self.runScriptMerger)
@@ -483,6 +621,8 @@ class CustomMainWidget(QWidget):
         self.actionGitHub.triggered.connect(lambda: openUrl(URL_GIT))
         self.actionAlert_to_run_Script_Merger.triggered.connect(
             self.alertPopupChanged)
+        self.actionUnattended_Installs.triggered.connect(
+            self.unattendedInstallsChanged)
         self.actionChange_Game_Path.triggered.connect(self.changeGamePath)
         self.actionChange_Script_Merger_Path.triggered.connect(
             self.changeScriptMergerPath)
@@ -495,6 +635,11 @@ class CustomMainWidget(QWidget):
         self.actionSetPriority.triggered.connect(self.setPriority)
         self.actionUnsetPriority.triggered.connect(self.unsetPriority)
         self.actionRestoreColumns.triggered.connect(self.restoreColumns)
+        self.actionSave_Profile.triggered.connect(self.saveProfile)
+        self.menuActivate_Profile.aboutToShow.connect(
+            lambda: self.fillProfileMenu(self.menuActivate_Profile, self.activateProfile))
+        self.menuDelete_Profile.aboutToShow.connect(
+            lambda: self.fillProfileMenu(self.menuDelete_Profile, self.deleteProfile))
 
         self.pushButton_4.clicked.connect(self.runScriptMerger)
         self.pushButton_5.clicked.connect(self.runTheGame)
@@ -508,14 +653,15 @@ class CustomMainWidget(QWidget):
         self.textEdit.setContextMenuPolicy(Qt.CustomContextMenu)
         self.textEdit.customContextMenuRequested.connect(self.openEditMenu)
 
-        self.treeWidget.itemChanged.connect(self.modToggled)
-        self.treeWidget.itemDoubleClicked.connect(self.modDoubleClicked)
+        self.modList.toggled.connect(self.modToggled)
+        self.treeWidget.doubleClicked.connect(self.modDoubleClicked)
         self.treeWidget.header().setStretchLastSection(False)
 
         self.loadOrder.itemDoubleClicked.connect(self.loadOrderDoubleClicked)
 
         self.actionAlert_to_run_Script_Merger.setChecked(
             data.config.allowpopups == '1')
+        self.actionUnattended_Installs.setChecked(self.policy.unattended)
 
         self.searchWidget.textChanged.connect(self.setSearchString)
 
@@ -523,8 +669,8 @@ class CustomMainWidget(QWidget):
         '''Open or run any kind of folder/file or executable by configuration key'''
         openFile(getattr(data.config, option))
 
-    def configureToolbar(self):
-        '''Creates and configures toolbar'''
+    def configureToolbar(self, lazy=False):
+        '''Creates and configures toolbar. Lazily the custom actions are added after the window is shown'''
         self.toolBar.clear()
 
         self.toolBar.addAction(self.actionInstall_Mods)
@@ -604,12 +750,17 @@ class CustomMainWidget(QWidget):
 
         self.toolBar.addSeparator()
 
-        for custom in data.config.getOptions('TOOLBAR'):
-            self.addToToolbar(custom)
+        if not lazy:
+            self.addCustomToolbarActions()
         self.actionAddToToolbar = QAction(self.mainWindow)
         self.actionAddToToolbar.triggered.connect(self.addToToolbar)
         self.actionAddToToolbar.setText(translate("MainWindow", 'Add New..'))
 
+    def addCustomToolbarActions(self):
+        '''Adds the custom actions of the user to the toolbar'''
+        for custom in data.config.getOptions('TOOLBAR'):
+            self.addToToolbar(custom)
+
     def openMenu(self, position):
         '''Right click menu on mod list (Left panel)'''
         menu = QMenu()
@@ -744,27 +895,31 @@ class CustomMainWidget(QWidget):
             except Exception as err:
                 self.output(formatUserError(err))
 
-    def modToggled(self, item, column):
+    @accountedIO
+    def modToggled(self, modname, checked):
         '''Triggered when the mod check state is changed.
             Enables or disables the mod based on the current check state'''
         try:
-            if item.checkState(column) == Qt.Checked:
-                incomplete = self.model.get(item.text(1)).enable()
-                if incomplete:
-                    for i in incomplete:
-                        self.output(translate("MainWindow", "Note: Additions to ") +
-                                    i + translate("MainWindow", " could not be automatically installed."))
-            elif item.checkState(column) == Qt.Unchecked:
-                self.model.get(item.text(1)).disable()
-            self.model.write()
-            self.refreshLoadOrder()
+            mod = self.model.get(modname)
+            installer = Installer(self.model, output=self.output)
+            if checked:
+                incomplete = installer.toggleMods([mod], [])
+            else:
+                incomplete = installer.toggleMods([], [mod])
+            for i in incomplete:
+                self.output(translate("MainWindow", "Note: Additions to ") +
+                            i + translate("MainWindow", " could not be automatically installed."))
+            self.refreshLoadOrder(mod.files)
             self.alertRunScriptMerger()
         except Exception as err:
             self.output(formatUserError(err))
+        finally:
+            self.modList.refreshMod(modname)
 
     def modDoubleClicked(self):
         '''Triggered when double clicked on the mod'''
-        self.setPriority()
+        if self.model.loaded:
+            self.setPriority()
 
     def loadOrderDoubleClicked(self, item):
         '''Triggered when double clicked on the mod on the right panel. Sets priority'''
@@ -788,7 +943,7 @@ class CustomMainWidget(QWidget):
             if (ok):
                 data.config.setPriority(str(selected), str(priority))
                 data.config.write_priority()
-                self.refreshList()
+                self.refreshLoadOrder([selected])
         except Exception as err:
             self.output(formatUserError(err))
 
@@ -805,8 +960,8 @@ class CustomMainWidget(QWidget):
                 value = 0
             value = value + 1
             data.config.setPriority(str(selected), str(value))
-            item.setText(1, str(value))
             data.config.write_priority()
+            self.refreshLoadOrder([selected])
 
     def decreaseLoadOrderPriority(self):
         '''Decreases the priority of the selected mods in the load order list'''
@@ -818,12 +973,11 @@ class CustomMainWidget(QWidget):
             if (selectedvalue):
                 value = max(-1, int(selectedvalue) - 1)
                 if value < 0:
-                    data.config.removeSection(str(selected))
-                    item.setText(1, "")
+                    data.config.removePriority(str(selected))
                 else:
                     data.config.setPriority(str(selected), str(value))
-                    item.setText(0, str(value))
                 data.config.write_priority()
+                self.refreshLoadOrder([selected])
 
     def alertPopupChanged(self):
         '''Triggered when option to alert popup is changed. Saves the change'''
@@ -832,6 +986,11 @@ class CustomMainWidget(QWidget):
         else:
             data.config.allowpopups = '0'
 
+    def unattendedInstallsChanged(self):
+        '''Triggered when option to install unattended is changed. Saves the change'''
+        self.policy.unattended = self.actionUnattended_Installs.isChecked()
+        self.policy.write()
+
     def changeLanguage(self, language):
         '''Triggered when language is changed. Saves the change and restarts the program'''
         data.config.language = str(language)
@@ -844,6 +1003,16 @@ class CustomMainWidget(QWidget):
         if (button == QMessageBox.Yes):
             restartProgram()
 
+    def fillLanguageMenu(self):
+        '''Lists the available translations the first time the language menu is opened'''
+        if self.menuSelect_Language.actions():
+            return
+        for lang in os.listdir(getProgramRootFolder() + '/translations/'):
+            temp = self.makeLangAction(lang)
+            self.languageActionGroup.addAction(temp)
+            self.menuSelect_Language.addAction(temp)
+        self.checkLanguage()
+
     def checkLanguage(self):
         '''Checks which language is selected, and checks it'''
         language = data.config.language
@@ -879,7 +1048,7 @@ class CustomMainWidget(QWidget):
                             "You cannot set priority to disabled mod") +
                             " '" + modname + "'")
                 data.config.write_priority()
-                self.refreshList()
+                self.refreshMods(selected)
         except Exception as err:
             self.output(formatUserError(err))
 
@@ -890,7 +1059,7 @@ class CustomMainWidget(QWidget):
             for modname in selected:
                 self.model.get(modname).priority = None
             data.config.write_priority()
-            self.refreshList()
+            self.refreshMods(selected)
 
     def increasePriority(self):
         '''Increases the priority of the selected mods'''
@@ -899,7 +1068,7 @@ class CustomMainWidget(QWidget):
             for modname in selected:
                 self.model.get(modname).increasePriority()
             data.config.write_priority()
-            self.refreshList()
+            self.refreshMods(selected)
 
     def decreasePriority(self):
         '''Decreases the priority of the selected mods'''
@@ -908,11 +1077,13 @@ class CustomMainWidget(QWidget):
             for modname in selected:
                 self.model.get(modname).decreasePriority()
             data.config.write_priority()
-            self.refreshList()
+            self.refreshMods(selected)
 
     def changeGamePath(self):
         '''Changes game path'''
         if reconfigureGamePath():
+            if self.shown:
+                self.watchFolders()
             self.refreshList()
             self.translateUi()
             self.configureToolbar()
@@ -921,38 +1092,110 @@ class CustomMainWidget(QWidget):
         '''Changes script merger path'''
         reconfigureScriptMergerPath()
 
+    def fillProfileMenu(self, menu, callback):
+        '''Lists the saved profiles in the given menu'''
+        menu.clear()
+        for name in self.profiles.list():
+            action = QAction(name, menu)
+            action.triggered.connect(lambda _=False, name=name: callback(name))
+            menu.addAction(action)
+        if menu.isEmpty():
+            action = QAction(translate("MainWindow", "No profiles saved"), menu)
+            action.setEnabled(False)
+            menu.addAction(action)
+
+    def saveProfile(self):
+        '''Saves the enabled mods and their priorities as a named profile'''
+        try:
+            name, ok = QInputDialog.getText(
+                self,
+                translate("MainWindow", "Save Profile"),
+                translate("MainWindow", "Enter profile name") + ": ",
+                QLineEdit.Normal)
+            name = name.strip()
+            if ok and name:
+                self.profiles.save(name, self.model)
+                self.output(translate("MainWindow", "Saved profile") + f" '{name}'")
+        except Exception as err:
+            self.output(formatUserError(err))
+
+    @accountedIO
+    def activateProfile(self, name):
+        '''Switches the enabled mods and priorities to the named profile'''
+        try:
+            self.setProgress(0)
+            installer = Installer(
+                self.model, output=self.output, progress=lambda p: self.setProgress(100 * p))
+            incomplete = installer.activateProfile(self.profiles, name)
+            for i in incomplete:
+                self.output(translate("MainWindow", "Note: Additions to ") +
+                            i + translate("MainWindow", " could not be automatically installed."))
+            self.refreshMods(selected)
+            self.alertRunScriptMerger()
+            self.setProgress(0)
+        except Exception as err:
+            self.setProgress(0)
+            self.output(formatUserError(err))
+
+    def deleteProfile(self, name):
+        '''Deletes the named profile'''
+        clicked = QMessageBox.question(
+            self, translate("MainWindow", "Confirm"),
+            translate("MainWindow", "Are you sure you want to delete the profile ") + f"'{name}'?",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        if clicked == QMessageBox.Yes:
+            self.profiles.remove(name)
+
     def installMods(self):
         '''Installs selected mods'''
         self.clear()
         file = getFile(self, data.config.lastpath, "*.zip *.rar *.7z")
         self.installModFiles(file)
 
+    @accountedIO
     def installModFiles(self, file):
         '''Installs passed list of mods'''
+        if not self.model.loaded:
+            self.output(translate("MainWindow", "The mod list is still loading, try again in a moment"))
+            return
         try:
             successCount = 0
             errorCount = 0
             incompleteCount = 0
             if file:
+                policy = self.policy
+                if len(file) > 1:
+                    self.output(translate("MainWindow", "Checking for conflicts"))
+                    conflicts = preflight(file, self.output, lambda p: self.setProgress(100 * p))
+                    self.setProgress(0)
+                    if conflicts and not PreflightDialog(self, conflicts).exec_():
+                        self.output(translate("MainWindow", "Installation canceled"))
+                        return
+                    policy = self.policy.withDecisions([conflict.rule() for conflict in conflicts])
                 progress = 0
                 progressMax = len(file)
-                installer = Installer(self.model, output=self.output)
-                for mod in file:
-                    progressStart = 100 * progress / progressMax
-                    progressEnd = 100 * (progress + 1) / progressMax
-                    progressCur = progressEnd - progressStart
-                    # pylint: disable=cell-var-from-loop
-                    installer.progress = lambda p: \
-                        self.setProgress(progressStart + progressCur * p)
-                    result, count, incomplete = installer.installMod(mod)
-                    if result:
-                        successCount += count
-                    else:
-                        errorCount += 1
-                    if incomplete:
+                installer = Installer(self.model, output=self.output, policy=policy)
+                installer.beginBatch()
+                try:
+                    for mod in file:
+                        progressStart = 100 * progress / progressMax
+                        progressEnd = 100 * (progress + 1) / progressMax
+                        progressCur = progressEnd - progressStart
+                        # pylint: disable=cell-var-from-loop
+                        installer.progress = lambda p: \
+                            self.setProgress(progressStart + progressCur * p)
+                        result, count, incomplete = installer.installMod(mod)
+                        if result:
+                            successCount += count
+                        else:
+                            errorCount += 1
+                        if incomplete:
+                            incompleteCount += 1
+                        progress += 1
+                        self.setProgress(100 * progress / progressMax)
+                finally:
+                    if installer.commitBatch() and not incompleteCount:
                         incompleteCount += 1
-                    progress += 1
-                    self.setProgress(100 * progress / progressMax)
                 lastpath, _ = path.split(file[0])
                 data.config.lastpath = lastpath
                 self.refreshList()
@@ -976,6 +1219,7 @@ class CustomMainWidget(QWidget):
             translate("MainWindow", "errors")+')' +
             (f' ({incompleteCount} ' + translate("MainWindow", "incomplete") + ')' if incompleteCount else ''))
 
+    @accountedIO
     def uninstallMods(self):
         '''Uninstalls selected mods'''
         try:
@@ -993,13 +1237,17 @@ class CustomMainWidget(QWidget):
                     progress = 0
                     progressMax = len(selected)
                     installer = Installer(self.model, output=self.output)
-                    for modname in selected:
-                        success = installer.uninstallMod(
-                            self.model.get(modname))
-                        if not success:
-                            errors += 1
-                        progress += 1
-                        self.setProgress(100 * progress / progressMax)
+                    installer.beginBatch()
+                    try:
+                        for modname in selected:
+                            success = installer.uninstallMod(
+                                self.model.get(modname))
+                            if not success:
+                                errors += 1
+                            progress += 1
+                            self.setProgress(100 * progress / progressMax)
+                    finally:
+                        installer.commitBatch()
                     self.refreshList()
                     self.setProgress(0)
                     if errors:
@@ -1011,6 +1259,7 @@ class CustomMainWidget(QWidget):
             self.setProgress(0)
             self.output(formatUserError(err))
 
+    @accountedIO
     def reinstallMods(self):
         '''Reinstalls selected mods'''
         try:
@@ -1029,13 +1278,18 @@ class CustomMainWidget(QWidget):
                     QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes)
                 if clicked == QMessageBox.Yes:
                     self.setProgress(20)
-                    installer = Installer(self.model, output=self.output)
-                    for modname in selected:
-                        success, incomplete = installer.reinstallMod(
-                            self.model.get(modname))
-                        if not success:
-                            errors += 1
-                        if incomplete:
+                    installer = Installer(self.model, output=self.output, policy=self.policy)
+                    installer.beginBatch()
+                    try:
+                        for modname in selected:
+                            success, incomplete = installer.reinstallMod(
+                                self.model.get(modname))
+                            if not success:
+                                errors += 1
+                            if incomplete:
+                                incompleteCount += 1
+                    finally:
+                        if installer.commitBatch() and not incompleteCount:
                             incompleteCount += 1
                     self.setProgress(100)
                     self.refreshList()
@@ -1093,22 +1347,28 @@ class CustomMainWidget(QWidget):
         '''Selects all mods in the list'''
         self.treeWidget.selectAll()
 
+    @accountedIO
     def enableDisableMods(self):
         '''Changes checked state of the selected mods'''
         try:
-            selected = self.treeWidget.selectedItems()
+            selected = self.getSelectedMods()
             if not selected:
                 return
             self.setProgress(0)
-            progress = 0
-            progressMax = len(selected)
-            for item in selected:
-                if (item.checkState(0) == Qt.Checked):
-                    item.setCheckState(0, Qt.Unchecked)
+            enable = []
+            disable = []
+            for modname in selected:
+                mod = self.model.get(modname)
+                if mod.enabled:
+                    disable.append(mod)
                 else:
-                    item.setCheckState(0, Qt.Checked)
-                progress += 1
-                self.setProgress(100 * progress / progressMax)
+                    enable.append(mod)
+            installer = Installer(
+                self.model, output=self.output, progress=lambda p: self.setProgress(100 * p))
+            incomplete = installer.toggleMods(enable, disable)
+            for i in incomplete:
+                self.output(translate("MainWindow", "Note: Additions to ") +
+                            i + translate("MainWindow", " could not be automatically installed."))
             self.refreshList()
             self.alertRunScriptMerger()
             self.setProgress(0)
@@ -1118,196 +1378,217 @@ class CustomMainWidget(QWidget):
 
     def setSearchString(self, searchString):
         self.searchString = searchString
-        self.refreshList()
+        self.modListProxy.setMatches(self.searchMatches())
+
+    def modelLoaded(self, mods):
+        '''Triggered when the mod list was read in the background. Replaces the snapshot with the actual mods'''
+        with TIMELINE.phase("mod list loaded"):
+            self.model.setMods(mods)
+            self.modList.editable = True
+            self.setModelActionsEnabled(True)
+            self.updateList()
+        if self.shown:
+            TIMELINE.finish()
+
+    def firstShown(self):
+        '''Triggered once the window is shown. Initializes everything that isn't needed for the first paint'''
+        TIMELINE.mark("first paint")
+        with TIMELINE.phase("deferred initialization"):
+            self.addCustomToolbarActions()
+            self.watchFolders()
+            self.changeFeed.start()
+            self.stallMonitor.start()
+        self.shown = True
+        if self.model.loaded:
+            TIMELINE.finish()
+
+    def watchFolders(self):
+        '''Watches the folders of the configured game and documents paths instead of the previous ones'''
+        self.changeFeed.clear()
+        self.changeFeed.watch(data.config.mods, ROOT_MODS, recursive=True)
+        self.changeFeed.watch(data.config.dlc, ROOT_DLC)
+        self.changeFeed.watch(data.config.menu, ROOT_MENU)
+        self.changeFeed.watch(data.config.settings, ROOT_SETTINGS)
+
+    def modelLoadFailed(self, err):
+        MessageInitializationFailed(formatUserError(err))
+        data.app.exit(1)
 
     # Helpers
 
+    def setModelActionsEnabled(self, enabled):
+        '''Enables or disables all actions that need the mod list to be loaded'''
+        for action in (self.actionInstall_Mods, self.actionUninstall_Mods, self.actionEnable_Disable_Mods,
+                       self.actionReinstall_Mods, self.actionRefresh_Mod_List, self.actionSetPriority,
+                       self.actionUnsetPriority, self.actionRename, self.actionDetails, self.actionOpenFolder,
+                       self.actionIncreasePriority, self.actionDecreasePriority, self.actionSave_Profile):
+            action.setEnabled(enabled)
+        self.menuProfiles.setEnabled(enabled)
+
+    def searchMatches(self):
+        if not self.model.loaded or not self.searchString.strip():
+            return None
+        return self.model.search.search(self.searchString)
+
     @throttle(200)
+    @traced("refreshList")
     def refreshList(self):
         '''Refreshes mod list'''
+        return self.updateList()
+
+    @traced("updateList")
+    def updateList(self):
+        '''Brings the mod list in line with the model'''
+        if not self.model.loaded:
+            self.refreshLoadOrder()
+            return None
         try:
             selected = self.getSelectedMods()
-            self.treeWidget.clear()
-            moddata = []
+            self.modList.patch()
+            self.modListProxy.setMatches(self.searchMatches())
             for mod in self.model.all():
-                if len(self.searchString) > 0:
-                    if self.searchString.lower() not in mod.name.lower():
-                        continue
-                moddata += mod.files
-                modsize = 0
-                for modfile in mod.files:
-                    modsize += getSize(data.config.mods + "/" + modfile)
-                    modsize += getSize(data.config.mods + "/~" + modfile)
-                userstr = translate("MainWindow", 'No')
-                if (mod.usersettings):
-                    userstr = translate("MainWindow", 'Yes')
-                self.addToList(
-                    mod.enabled,
-                    mod.name,
-                    mod.priority,
-                    len(mod.files),
-                    len(mod.dlcs),
-                    len(mod.menus),
-                    len(mod.xmlkeys),
-                    len(mod.hidden),
-                    len(mod.inputsettings),
-                    userstr,
-                    modsize,
-                    mod.date
-                )
-            for item in selected:
-                rows = self.treeWidget.findItems(item, Qt.MatchEndsWith, 1)
-                if (rows):
-                    for row in rows:
-                        row.setSelected(True)
+                if self.model.sizes.total(mod.files) is None:
+                    self.sizeWorker.request(mod.files)
+            self.selectMods(selected)
             self.refreshLoadOrder()
             self.model.write()
+            MEMORY.snapshot("first refreshList", once=True)
         except Exception as err:
             self.output(
                 translate("MainWindow", "Couldn't refresh list: ") + f"{formatUserError(err)}")
             return err
         return None
 
-    @debounce(100)
-    def refreshLoadOrder(self):
-        '''Refreshes right panel list - load order'''
+    @accountedIO
+    def refreshModList(self):
+        '''Refreshes the mod list and the load order right away'''
+        self.updateList()
+        self.loadOrderTimer.stop()
+        self.applyLoadOrder()
+
+    @accountedIO
+    def reloadLoadOrder(self):
+        '''Rereads mods.settings and refreshes the load order right away'''
+        self.refreshLoadOrder(reload=True)
+        self.loadOrderTimer.stop()
+        self.applyLoadOrder()
+
+    def refreshMods(self, modnames):
+        '''Refreshes the rows of the given mods only'''
+        for modname in modnames:
+            self.modList.refreshMod(modname)
+        self.refreshLoadOrder(
+            folder for modname in modnames if modname in self.model.modList for folder in self.model.get(modname).files)
+        self.model.write()
+
+    def selectMods(self, modnames):
+        '''Selects the rows of the given mods'''
+        selection = QItemSelection()
+        for modname in modnames:
+            row = self.modList.row(modname)
+            if row is not None:
+                index = self.modListProxy.mapFromSource(self.modList.index(row, 0))
+                if index.isValid():
+                    selection.select(index, index)
+        self.treeWidget.selectionModel().select(
+            selection, QItemSelectionModel.ClearAndSelect | QItemSelectionModel.Rows)
+
+    def sizeComputed(self, folder: str, size: int):
+        '''Stores a size computed in the background and fills it in for the mods that are complete'''
+        self.model.sizes.set(folder, size)
+        for mod in self.model.all():
+            if folder in mod.files:
+                self.modList.refreshMod(mod.name)
+
+    def modContentChanged(self, events):
+        '''Triggered when the contents of data folders changed. Invalidates and recomputes their sizes'''
+        folders = set(event.name for event in events)
+        self.model.sizes.invalidate(folders)
+        self.sizeWorker.request(
+            folder for mod in self.model.all() for folder in mod.files if SizeCache.key(folder) in folders)
+
+    def modListingChanged(self, events):
+        '''Triggered when data folders were added, removed or renamed in the Mods folder'''
+        self.refreshLoadOrder(event.name for event in events)
+
+    def configFilesChanged(self, events):
+        '''Triggered when files in the menu or settings folder changed'''
+        for event in events:
+            forgetEncoding(event.path)
+            if event.name.lower() == 'mods.settings':
+                self.refreshLoadOrder([])
+
+    def refreshLoadOrder(self, folders=None, reload=False):
+        '''Schedules an update of the right panel list - load order.
+            Only the given folders are checked, or the whole Mods folder if none are given'''
+        if folders is None:
+            self.loadOrderRescan = True
+        else:
+            self.loadOrderFolders.update(folders)
+        self.loadOrderReload = self.loadOrderReload or reload
+        self.loadOrderTimer.start()
+
+    @traced("applyLoadOrder")
+    def applyLoadOrder(self):
+        '''Applies the collected load order changes to the right panel list'''
+        folders, rescan, reload = self.loadOrderFolders, self.loadOrderRescan, self.loadOrderReload
+        self.loadOrderFolders, self.loadOrderRescan, self.loadOrderReload = set(), False, False
         try:
-            selected = self.getSelectedFiles()
-            self.loadOrder.clear()
-            data.config.readPriority()
-            dirs = []
-            for data_ in os.listdir(data.config.mods):
-                templist = []
-                templist.append(data_)
-                prt = data.config.getPriority(data_)
-                if (prt):
-                    temp = int(prt)
-                else:
-                    temp = 16777215
-                templist.append(temp)
-                dirs.append(templist)
-            dirs = sorted(dirs, key=getKey)
-            for directory in dirs:
-                if (isData(directory[0])):
-                    if (directory[1] == 16777215):
-                        res = ''
-                    else:
-                        res = str(directory[1])
-                    dirlist = [directory[0], res]
-                    item = CustomTreeWidgetItem(dirlist)
-                    item.setTextAlignment(1, Qt.AlignCenter)
-                    self.loadOrder.addTopLevelItem(item)
-            for item in selected:
-                rows = self.loadOrder.findItems(
-                    item.replace("~", ""), Qt.MatchEndsWith, 0)
-                if (rows):
-                    for row in rows:
-                        row.setSelected(True)
+            changes = []
+            if reload:
+                data.config.readPriority()
+                changes += self.modsLoadOrder.reprioritize()
+            elif data.config.readPriorityIfChanged():
+                changes += self.modsLoadOrder.reprioritize()
+            if rescan:
+                changes += self.modsLoadOrder.scan()
+            elif folders:
+                changes += self.modsLoadOrder.check(folders)
+            self.updateLoadOrder(changes)
         except Exception as err:
             self.output(
                 translate("MainWindow", "Couldn't read or refresh load order: ") + f"{formatUserError(err)}")
             return err
         return None
 
+    def updateLoadOrder(self, changes):
+        '''Inserts, removes and moves the rows of the load order list.
+            Selected folders stay selected when they are enabled or disabled'''
+        selected = set()
+        for change in changes:
+            if change.type == CHANGE_REMOVE:
+                item = self.loadOrder.takeTopLevelItem(change.row)
+                if item is not None and item.isSelected():
+                    selected.add(change.folder.replace("~", ""))
+            elif change.type == CHANGE_INSERT:
+                item = CustomTreeWidgetItem(
+                    [change.folder, str(change.priority) if change.priority is not None else ''])
+                item.setTextAlignment(1, Qt.AlignCenter)
+                self.loadOrder.insertTopLevelItem(change.row, item)
+                item.setSelected(change.folder.replace("~", "") in selected)
+            else:
+                item = self.loadOrder.topLevelItem(change.row)
+                if change.target != change.row:
+                    isSelected = item.isSelected()
+                    item = self.loadOrder.takeTopLevelItem(change.row)
+                    self.loadOrder.insertTopLevelItem(change.target, item)
+                    item.setSelected(isSelected)
+                item.setText(1, str(change.priority) if change.priority is not None else '')
+
+    def outputIO(self, stats):
+        '''Outputs the I/O summary of an operation, and the most accessed paths in debug mode'''
+        self.output(stats.summary())
+        if data.debug:
+            for line in stats.breakdown():
+                self.output(line)
+
     def setProgress(self, currentProgress):
         '''Sets the progress to currentProgress'''
         self.progressBar.setProperty("value", currentProgress)
 
-    def addToList(
-            self,
-            on,
-            name,
-            prio,
-            data_,
-            dlc,
-            menu,
-            keys,
-            hidden,
-            inputkeys,
-            settings,
-            size,
-            date):
-        '''Adds mod data to the list'''
-        if (data_ == 0):
-            datastr = '-'
-        else:
-            datastr = str(data_)
-        if (dlc == 0):
-            dlcstr = '-'
-        else:
-            dlcstr = str(dlc)
-        if (menu == 0):
-            menustr = '-'
-        else:
-            menustr = str(menu)
-        if (keys == 0):
-            keystr = '-'
-        else:
-            keystr = str(keys)
-        if (inputkeys == 0):
-            inkeystr = '-'
-        else:
-            inkeystr = str(inputkeys)
-        if (hidden == 0):
-            hiddenstr = '-'
-        else:
-            hiddenstr = str(hidden)
-        size //= 1024
-        if (size // 1024 == 0):
-            sizestr = str(size) + 'KB'
-        else:
-            size /= 1024
-            sizestr = f"{size:.1f}" + 'MB'
-        proplist = [
-            '',
-            str(name),
-            str(prio),
-            datastr,
-            dlcstr,
-            menustr,
-            keystr,
-            hiddenstr,
-            inkeystr,
-            str(settings),
-            sizestr,
-            str(date)]
-        item = CustomTreeWidgetItem(proplist)
-        item.setTextAlignment(2, Qt.AlignCenter)
-        item.setTextAlignment(3, Qt.AlignCenter)
-        item.setTextAlignment(4, Qt.AlignCenter)
-        item.setTextAlignment(5, Qt.AlignCenter)
-        item.setTextAlignment(6, Qt.AlignCenter)
-        item.setTextAlignment(7, Qt.AlignCenter)
-        item.setTextAlignment(8, Qt.AlignCenter)
-        item.setTextAlignment(9, Qt.AlignCenter)
-        item.setTextAlignment(10, Qt.AlignRight)
-        item.setTextAlignment(11, Qt.AlignCenter)
-        if ('~' not in name):
-            if (on):
-                item.setCheckState(0, Qt.Checked)
-            else:
-                item.setCheckState(0, Qt.Unchecked)
-        self.treeWidget.addTopLevelItem(item)
-        return item
-
     def getSelectedMods(self):
         '''Returns list of mod names of the selected mods'''
-        array = []
-        getSelected = self.treeWidget.selectedItems()
-        if getSelected:
-            for selected in getSelected:
-                baseNode = selected
-                array.append(baseNode.text(1))
-        return array
-
-    def getSelectedFiles(self):
-        array = []
-        getSelected = self.loadOrder.selectedItems()
-        if getSelected:
-            for selected in getSelected:
-                baseNode = selected
-                array.append(baseNode.text(0))
-        return array
+        return [index.data() for index in self.treeWidget.selectionModel().selectedRows(COLUMN_NAME)]
 
     def makeTempAction(self, action):
         '''Temp function for bypassing actions with same names problem'''
@@ -0,0 +1,174 @@
+'''Mod List'''
+# pylint: disable=invalid-name,missing-docstring
+
+import sys
+from typing import Any, Dict, List, Optional, Set
+
+from PySide2.QtCore import QAbstractTableModel, QModelIndex, QSortFilterProxyModel, Qt, Signal
+
+from src.core.model import Model
+from src.core.snapshot import ModRow
+from src.globals.constants import translate
+from src.util.util import formatSize
+
+SORT_ROLE = Qt.UserRole
+
+COLUMN_ENABLED = 0
+COLUMN_NAME = 1
+COLUMN_PRIORITY = 2
+COLUMN_SIZE = 10
+COLUMN_COUNT = 12
+
+
+class ModListModel(QAbstractTableModel):
+    '''Table model of the installed mods, backed by the mod management model or by a snapshot
+    of the last shown list until the model is loaded.
+    Display texts are formatted on demand and typed values are provided for sorting'''
+
+    toggled = Signal(str, bool)
+
+    def __init__(self, model: Model, parent=None):
+        super().__init__(parent)
+        self.model = model
+        self.mods: List[ModRow] = []
+        self.rows: Dict[str, int] = {}
+        self.headers: List[str] = [''] * COLUMN_COUNT
+        self.editable = True
+
+    def modRows(self) -> List[ModRow]:
+        return [ModRow.fromMod(mod, self.model.sizes) for mod in self.model.all()]
+
+    def reset(self, mods: Optional[List[ModRow]] = None) -> None:
+        '''Reloads all rows from the model, or shows the given rows'''
+        self.beginResetModel()
+        self.mods = mods if mods is not None else self.modRows()
+        self.rows = {mod.name: row for row, mod in enumerate(self.mods)}
+        self.endResetModel()
+
+    def patch(self) -> None:
+        '''Brings the rows in line with the model, only touching the rows that differ'''
+        current = {mod.name: mod for mod in self.modRows()}
+        for row in reversed(range(len(self.mods))):
+            if self.mods[row].name not in current:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self.mods[row]
+                self.endRemoveRows()
+        for row, mod in enumerate(self.mods):
+            if current[mod.name] != mod:
+                self.mods[row] = current[mod.name]
+                self.dataChanged.emit(self.index(row, 0), self.index(row, COLUMN_COUNT - 1))
+        shown = set(mod.name for mod in self.mods)
+        added = [mod for name, mod in current.items() if name not in shown]
+        if added:
+            self.beginInsertRows(QModelIndex(), len(self.mods), len(self.mods) + len(added) - 1)
+            self.mods += added
+            self.endInsertRows()
+        self.rows = {mod.name: row for row, mod in enumerate(self.mods)}
+
+    def refreshMod(self, modname: str) -> None:
+        '''Updates the row of a single mod'''
+        row = self.rows.get(modname)
+        if row is not None and modname in self.model.modList:
+            mod = ModRow.fromMod(self.model.get(modname), self.model.sizes)
+            if mod != self.mods[row]:
+                self.mods[row] = mod
+                self.dataChanged.emit(self.index(row, 0), self.index(row, COLUMN_COUNT - 1))
+
+    def mod(self, row: int) -> ModRow:
+        return self.mods[row]
+
+    def row(self, modname: str) -> Optional[int]:
+        return self.rows.get(modname)
+
+    def rowCount(self, parent=QModelIndex()) -> int:  # pylint: disable=unused-argument
+        return 0 if parent.isValid() else len(self.mods)
+
+    def columnCount(self, parent=QModelIndex()) -> int:  # pylint: disable=unused-argument
+        return 0 if parent.isValid() else COLUMN_COUNT
+
+    def headerData(self, section: int, orientation, role=Qt.DisplayRole) -> Any:
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole and section < COLUMN_COUNT:
+            return self.headers[section]
+        return None
+
+    def setHeaderData(self, section: int, orientation, value, role=Qt.EditRole) -> bool:  # pylint: disable=unused-argument
+        if orientation != Qt.Horizontal or section >= COLUMN_COUNT:
+            return False
+        self.headers[section] = str(value)
+        self.headerDataChanged.emit(orientation, section, section)
+        return True
+
+    def flags(self, index: QModelIndex):
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        if self.editable and index.column() == COLUMN_ENABLED and '~' not in self.mods[index.row()].name:
+            flags |= Qt.ItemIsUserCheckable
+        return flags
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        mod = self.mods[index.row()]
+        column = index.column()
+        if role == Qt.DisplayRole:
+            return self.text(mod, column)
+        if role == SORT_ROLE:
+            return self.sortValue(mod, column)
+        if role == Qt.CheckStateRole and column == COLUMN_ENABLED and '~' not in mod.name:
+            return Qt.Checked if mod.enabled else Qt.Unchecked
+        if role == Qt.TextAlignmentRole and column >= COLUMN_PRIORITY:
+            return int(Qt.AlignRight | Qt.AlignVCenter) if column == COLUMN_SIZE else int(Qt.AlignCenter)
+        return None
+
+    def setData(self, index: QModelIndex, value, role=Qt.EditRole) -> bool:
+        if role != Qt.CheckStateRole or index.column() != COLUMN_ENABLED:
+            return False
+        self.toggled.emit(self.mods[index.row()].name, value == Qt.Checked or value == int(Qt.Checked))
+        return True
+
+    def text(self, mod: ModRow, column: int) -> str:
+        if column == COLUMN_ENABLED:
+            return ''
+        if column == COLUMN_NAME:
+            return mod.name
+        if column == COLUMN_PRIORITY:
+            return mod.priority
+        if 3 <= column <= 8:
+            count = mod.counts[column - 3]
+            return str(count) if count else '-'
+        if column == 9:
+            return translate("MainWindow", 'Yes') if mod.usersettings else translate("MainWindow", 'No')
+        if column == COLUMN_SIZE:
+            return formatSize(mod.size) if mod.size is not None else '...'
+        return mod.date
+
+    def sortValue(self, mod: ModRow, column: int) -> Any:
+        if column == COLUMN_ENABLED:
+            return int(mod.enabled)
+        if column == COLUMN_NAME:
+            return mod.name.lower()
+        if column == COLUMN_PRIORITY:
+            return int(mod.priority) if mod.priority.isdecimal() else sys.maxsize
+        if 3 <= column <= 8:
+            return mod.counts[column - 3] or sys.maxsize
+        if column == 9:
+            return int(bool(mod.usersettings))
+        if column == COLUMN_SIZE:
+            return mod.size if mod.size is not None else -1
+        return mod.date
+
+
+class ModFilterProxyModel(QSortFilterProxyModel):
+    '''Sorts the mod list by the typed sort values and filters it by the results of the search index'''
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setSortRole(SORT_ROLE)
+        self.matches: Optional[Set[str]] = None
+
+    def setMatches(self, matches: Optional[Set[str]]) -> None:
+        '''Shows only the mods with the given names, or all mods if None'''
+        self.matches = matches
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, sourceRow: int, sourceParent: QModelIndex) -> bool:  # pylint: disable=unused-argument
+        return self.matches is None or self.sourceModel().mod(sourceRow).name in self.matches
@@ -0,0 +1,81 @@
+'''Preflight Dialog'''
+# pylint: disable=invalid-name
+
+from typing import List
+
+from PySide2 import QtCore
+from PySide2.QtWidgets import QComboBox, QDialog, QDialogButtonBox, QHeaderView, QLabel, QPushButton, \
+    QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget
+
+from src.core.policy import CONFLICT_FOLDER, POLICY_KEEP, POLICY_OVERWRITE
+from src.core.preflight import Conflict
+from src.globals.constants import translate
+
+
+class PreflightDialog(QDialog):
+    '''Dialog listing all conflicts of a batch install to decide them before installing'''
+
+    def __init__(self, parent: QWidget, conflicts: List[Conflict]):
+        super().__init__(parent)
+        self.conflicts = conflicts
+
+        self.setObjectName("Preflight")
+        self.resize(900, 500)
+        self.layout = QVBoxLayout(self)
+        self.layout.setObjectName("layout")
+        self.label = QLabel(self)
+        self.label.setText(
+            translate("Preflight", "The following conflicts were found. Choose how to resolve them, "
+                      "the installation will then run without further questions."))
+        self.label.setWordWrap(True)
+        self.layout.addWidget(self.label)
+
+        self.table = QTableWidget(len(conflicts), 6, self)
+        self.table.setObjectName("table")
+        self.table.setHorizontalHeaderLabels([
+            translate("Preflight", "Mod"),
+            translate("Preflight", "Type"),
+            translate("Preflight", "Context"),
+            translate("Preflight", "Existing"),
+            translate("Preflight", "New"),
+            translate("Preflight", "Decision")])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        for row, conflict in enumerate(conflicts):
+            kind = translate("Preflight", "Folder") if conflict.type == CONFLICT_FOLDER \
+                else translate("Preflight", "Key")
+            for column, text in enumerate((conflict.modname, kind, conflict.context, conflict.existing, conflict.new)):
+                self.table.setItem(row, column, QTableWidgetItem(text))
+            decision = QComboBox(self.table)
+            decision.addItem(translate("Preflight", "Overwrite"), POLICY_OVERWRITE)
+            decision.addItem(translate("Preflight", "Keep existing"), POLICY_KEEP)
+            decision.setCurrentIndex(0 if conflict.decision == POLICY_OVERWRITE else 1)
+            self.table.setCellWidget(row, 5, decision)
+        self.layout.addWidget(self.table)
+
+        self.buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel, self)
+        self.overwriteAll = QPushButton(translate("Preflight", "Overwrite All"), self)
+        self.keepAll = QPushButton(translate("Preflight", "Keep All"), self)
+        self.buttons.addButton(self.overwriteAll, QDialogButtonBox.ActionRole)
+        self.buttons.addButton(self.keepAll, QDialogButtonBox.ActionRole)
+        self.overwriteAll.clicked.connect(lambda: self.setAll(0))
+        self.keepAll.clicked.connect(lambda: self.setAll(1))
+        self.buttons.accepted.connect(self.accept)
+        self.buttons.rejected.connect(self.reject)
+        self.layout.addWidget(self.buttons)
+
+        self.setWindowTitle(translate("Preflight", "Install Conflicts"))
+        QtCore.QMetaObject.connectSlotsByName(self)
+
+    def setAll(self, index: int):
+        '''Sets the same decision for every conflict'''
+        for row in range(self.table.rowCount()):
+            self.table.cellWidget(row, 5).setCurrentIndex(index)
+
+    def accept(self):
+        '''Stores the chosen decisions in the conflicts'''
+        for row, conflict in enumerate(self.conflicts):
+            conflict.decision = self.table.cellWidget(row, 5).currentData()
+        super().accept()
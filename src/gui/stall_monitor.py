@@ -0,0 +1,124 @@
+'''GUI thread stall monitor'''
+# pylint: disable=invalid-name,missing-docstring,protected-access,broad-except
+
+import logging
+import sys
+import threading
+import traceback
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from logging.handlers import RotatingFileHandler
+from time import monotonic
+from typing import Iterator, List, Optional, Tuple
+
+from PySide2.QtCore import QObject, QTimer
+
+MAX_SAMPLES = 5
+
+# names of the running main widget operations, innermost last
+OPERATIONS: List[str] = []
+
+
+@contextmanager
+def operation(name: str) -> Iterator[None]:
+    '''Names the operation running on the GUI thread for the stall log'''
+    OPERATIONS.append(name)
+    try:
+        yield
+    finally:
+        OPERATIONS.pop()
+
+
+@dataclass
+class Stall:
+    started: float
+    operation: str
+    samples: List[Tuple[float, str]] = field(default_factory=list)
+
+
+class StallMonitor(QObject):
+    '''Watches the GUI thread from a background thread. When the event loop doesn't run the heartbeat timer
+    for longer than the threshold, the stack of the GUI thread is sampled, and once the event loop resumes
+    the stall is written to the rotating stalls.log'''
+
+    def __init__(self, threshold: int, logfile: str, interval: int = 100, parent=None):
+        super().__init__(parent)
+        self.threshold = threshold / 1000
+        self.interval = interval / 1000
+        self.logfile = logfile
+        self.guiThread = threading.get_ident()
+        self.beat = monotonic()
+        self.stopped = threading.Event()
+        self.logger: Optional[logging.Logger] = None
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.heartbeat)
+
+    def start(self) -> None:
+        if self.threshold <= 0:
+            return
+        self.beat = monotonic()
+        self.timer.start()
+        threading.Thread(target=self.watch, name="stall monitor", daemon=True).start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.timer.stop()
+
+    def heartbeat(self) -> None:
+        self.beat = monotonic()
+
+    def watch(self) -> None:
+        stall: Optional[Stall] = None
+        while not self.stopped.wait(self.interval):
+            try:
+                stall = self.check(stall)
+            except Exception as e:
+                # the monitor must outlive errors of a single check
+                print(f"stall monitor: {e}")
+                stall = None
+
+    def check(self, stall: Optional[Stall]) -> Optional[Stall]:
+        beat = self.beat
+        if stall is not None and beat > stall.started:
+            # the timer fires one interval after the last beat even without a stall
+            self.log(stall, beat - stall.started - self.interval)
+            stall = None
+        blocked = monotonic() - beat - self.interval
+        if blocked < self.threshold:
+            return stall
+        frame = sys._current_frames().get(self.guiThread)
+        if stall is None:
+            # the GUI thread pushes and pops operations meanwhile, the slice is taken at once
+            current = OPERATIONS[-1:]
+            stall = Stall(beat, current[0] if current else handler(frame))
+        if frame is not None and len(stall.samples) < MAX_SAMPLES and \
+                blocked >= self.threshold * (len(stall.samples) + 1):
+            stall.samples.append((blocked, ''.join(traceback.format_stack(frame))))
+        return stall
+
+    def log(self, stall: Stall, duration: float) -> None:
+        print(f"GUI thread blocked for {duration * 1000:.0f}ms during {stall.operation}, see {self.logfile}")
+        try:
+            if self.logger is None:
+                self.logger = logging.getLogger("stalls")
+                self.logger.propagate = False
+                self.logger.setLevel(logging.INFO)
+                handler = RotatingFileHandler(self.logfile, maxBytes=1024 * 1024, backupCount=3, encoding='utf-8')
+                handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+                self.logger.addHandler(handler)
+            self.logger.info(
+                f"GUI thread blocked for {duration * 1000:.0f}ms during {stall.operation}\n" +
+                ''.join(f"stack after {blocked * 1000:.0f}ms:\n{stack}" for blocked, stack in stall.samples))
+        except OSError as e:
+            print(f"could not write stall log: {e}")
+
+
+def handler(frame) -> str:
+    '''Finds the outermost main widget method of a stack'''
+    name = "event loop"
+    while frame is not None:
+        if frame.f_code.co_filename.replace('\\', '/').endswith('src/gui/main_widget.py'):
+            name = frame.f_code.co_name
+        frame = frame.f_back
+    return name
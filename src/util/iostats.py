@@ -0,0 +1,154 @@
+'''I/O accounting'''
+# pylint: disable=invalid-name,missing-docstring,global-statement
+
+import os
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional, Set, Tuple
+
+from src.globals.constants import translate
+
+STAT = os.stat
+FSYNC = os.fsync
+WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_APPEND | os.O_CREAT
+
+
+class IOStats:
+    '''File system operations of the thread that started the accounting. As files are read and written as a whole,
+    bytes read are the sizes of the files opened for reading and bytes written the sizes of the files opened
+    for writing once the operation is finished'''
+
+    def __init__(self):
+        self.thread = threading.get_ident()
+        self.opened = 0
+        self.read = 0
+        self.written = 0
+        self.fsyncs = 0
+        self.renames = 0
+        self.removes = 0
+        self.copies = 0
+        self.stats = 0
+        self.listings = 0
+        self.writing: Set[str] = set()
+        self.files: Counter = Counter()
+        self.folders: Counter = Counter()
+        self.statted: Counter = Counter()
+
+    def event(self, event: str, args: Tuple[Any, ...]) -> None:
+        if event == 'open':
+            filename, mode, flags = args
+            if not isinstance(filename, (str, bytes)):
+                return
+            filename = os.fsdecode(filename)
+            self.opened += 1
+            if os.path.isabs(filename):
+                # relative names are opened through directory descriptors, like by rmtree
+                self.files[filename] += 1
+            writing = any(char in mode for char in 'wax+') if mode else flags & WRITE_FLAGS
+            if writing:
+                self.writing.add(filename)
+            else:
+                self.read += fileSize(filename)
+        elif event in ('os.listdir', 'os.scandir'):
+            self.listings += 1
+            if isinstance(args[0], (str, bytes)):
+                self.folders[os.fsdecode(args[0])] += 1
+        elif event == 'os.rename':
+            self.renames += 1
+        elif event in ('os.remove', 'os.rmdir'):
+            self.removes += 1
+        elif event == 'shutil.copyfile':
+            self.copies += 1
+
+    def finish(self) -> None:
+        self.written += sum(fileSize(filename) for filename in self.writing)
+
+    def summary(self) -> str:
+        return translate("MainWindow", "I/O") + ": " + ", ".join((
+            f"{self.opened} " + translate("MainWindow", "files opened"),
+            f"{formatBytes(self.read)} " + translate("MainWindow", "read"),
+            f"{formatBytes(self.written)} " + translate("MainWindow", "written"),
+            f"{self.fsyncs} " + translate("MainWindow", "fsyncs"),
+            f"{self.renames} " + translate("MainWindow", "renames"),
+            f"{self.removes} " + translate("MainWindow", "removals"),
+            f"{self.copies} " + translate("MainWindow", "copies"),
+            f"{self.stats} " + translate("MainWindow", "stats"),
+            f"{self.listings} " + translate("MainWindow", "directory listings")))
+
+    def breakdown(self, top: int = 5) -> List[str]:
+        '''The paths that were accessed most often'''
+        lines = []
+        for title, counter in ((translate("MainWindow", "Most opened files"), self.files),
+                               (translate("MainWindow", "Most listed directories"), self.folders),
+                               (translate("MainWindow", "Most checked paths"), self.statted)):
+            if counter:
+                lines.append(title + ":")
+                lines.extend(f"  {count}x {name}" for name, count in counter.most_common(top))
+        return lines
+
+
+CURRENT: Optional[IOStats] = None
+HOOKED = False
+
+
+def fileSize(filename: str) -> int:
+    try:
+        return STAT(filename).st_size
+    except (OSError, ValueError):
+        return 0
+
+
+def formatBytes(size: int) -> str:
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024  # type: ignore
+    return f"{size:.1f} GB"
+
+
+def audit(event: str, args: Tuple[Any, ...]) -> None:
+    stats = CURRENT
+    if stats is not None and threading.get_ident() == stats.thread:
+        stats.event(event, args)
+
+
+def countingStat(filename, *args, **kwargs):
+    stats = CURRENT
+    if stats is not None and threading.get_ident() == stats.thread:
+        stats.stats += 1
+        if isinstance(filename, (str, bytes)):
+            stats.statted[os.fsdecode(filename)] += 1
+    return STAT(filename, *args, **kwargs)
+
+
+def countingFsync(fd):
+    stats = CURRENT
+    if stats is not None and threading.get_ident() == stats.thread:
+        stats.fsyncs += 1
+    return FSYNC(fd)
+
+
+@contextmanager
+def accounting() -> Iterator[Optional[IOStats]]:
+    '''Counts the file system operations of the current thread until the end of the block.
+    Nested blocks count into the outermost one and get None'''
+    global CURRENT, HOOKED
+    if CURRENT is not None:
+        yield None
+        return
+    if not HOOKED:
+        # audit hooks can't be removed, while no operation is accounted it returns right away
+        sys.addaudithook(audit)
+        HOOKED = True
+    stats = IOStats()
+    CURRENT = stats
+    # there are no audit events for stats and fsyncs
+    os.stat, os.fsync = countingStat, countingFsync
+    try:
+        yield stats
+    finally:
+        os.stat, os.fsync = STAT, FSYNC
+        CURRENT = None
+        stats.finish()
@@ -0,0 +1,221 @@
+'''Startup profiling, operation tracing and memory profiling'''
+# pylint: disable=invalid-name,missing-docstring
+
+import gc
+import json
+import os
+import threading
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+# imported first by main.py, so this is as close to the start of the process as the timeline gets
+STARTED = perf_counter()
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MEMORY_TYPES = ('Mod', 'Key', 'Action', 'Usersetting', 'CustomTreeWidgetItem')
+
+
+class StartupTimeline:
+    '''Records nested startup phases relative to the start of the program.
+    Disabled by default, then phases cost a single attribute check'''
+
+    def __init__(self):
+        self.enabled = False
+        self.output = ''
+        self.phases: List[Tuple[str, float, float, int]] = []
+        self.depth = 0
+        self.finished = False
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        start = perf_counter() - STARTED
+        self.depth += 1
+        try:
+            yield
+        finally:
+            self.depth -= 1
+            self.phases.append((name, start, perf_counter() - STARTED, self.depth))
+
+    def mark(self, name: str) -> None:
+        if self.enabled:
+            now = perf_counter() - STARTED
+            self.phases.append((name, now, now, self.depth))
+
+    def report(self) -> str:
+        lines = ["startup timeline:", f"{'start':>10} {'duration':>10}  phase"]
+        for name, start, end, depth in sorted(self.phases, key=lambda phase: (phase[1], phase[3])):
+            duration = f"{(end - start) * 1000:8.1f}ms" if end > start else f"{'':>10}"
+            lines.append(f"{start * 1000:8.1f}ms {duration}  {'  ' * depth}{name}")
+        return '\n'.join(lines)
+
+    def toJson(self) -> str:
+        return json.dumps({
+            'phases': [{'name': name, 'start': start, 'end': end, 'depth': depth}
+                       for name, start, end, depth in self.phases],
+            'total': max((end for _, _, end, _ in self.phases), default=0.0)
+        }, indent=2)
+
+    def finish(self) -> None:
+        '''Prints the timeline, or writes it to the output file, once the startup is complete'''
+        if not self.enabled or self.finished:
+            return
+        self.finished = True
+        self.mark("startup complete")
+        if self.output and self.output != '-':
+            try:
+                writeReport(self.output, self.toJson())
+            except OSError as e:
+                print(f"could not write startup profile: {e}")
+        print(self.report())
+
+
+class Tracer:
+    '''Records spans of operations as Chrome trace events, viewable in chrome://tracing or Perfetto.
+    Disabled by default, then spans cost a single attribute check'''
+
+    def __init__(self):
+        self.enabled = False
+        self.output = ''
+        self.events: List[Dict[str, Any]] = []
+        self.threads: Dict[int, str] = {}
+
+    @contextmanager
+    def span(self, name: str, **args) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, perf_counter(), args)
+
+    def record(self, name: str, start: float, end: float, args: Optional[Dict[str, Any]] = None) -> None:
+        # spans end on the thread they started on, and list appends are atomic
+        thread = threading.current_thread()
+        self.threads[thread.ident or 0] = thread.name
+        event = {'name': name, 'ph': 'X', 'ts': (start - STARTED) * 1e6, 'dur': (end - start) * 1e6,
+                 'pid': os.getpid(), 'tid': thread.ident or 0}
+        if args:
+            event['args'] = args
+        self.events.append(event)
+
+    def toJson(self) -> str:
+        names = [{'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': tid, 'args': {'name': name}}
+                 for tid, name in self.threads.items()]
+        return json.dumps({'traceEvents': names + self.events, 'displayTimeUnit': 'ms'})
+
+    def finish(self) -> None:
+        '''Writes the recorded spans to the output file'''
+        if not self.enabled or not self.output:
+            return
+        try:
+            writeReport(self.output, self.toJson())
+            print(f"wrote {len(self.events)} trace events to {self.output}")
+        except OSError as e:
+            print(f"could not write trace: {e}")
+
+
+class MemoryProfile:
+    '''Snapshots the memory traced by tracemalloc after loading the mods, the first refresh and each operation,
+    and reports the top allocation sites and the number of live objects of the main types.
+    Disabled by default, then snapshots cost a single attribute check'''
+
+    def __init__(self):
+        self.enabled = False
+        self.output = ''
+        self.top = 15
+        self.reports: List[Dict[str, Any]] = []
+        self.labels: Set[str] = set()
+
+    def start(self) -> None:
+        if self.enabled and not tracemalloc.is_tracing():
+            tracemalloc.start(8)
+
+    def snapshot(self, label: str, once: bool = False) -> Optional[Dict[str, Any]]:
+        if not self.enabled or not tracemalloc.is_tracing() or (once and label in self.labels):
+            return None
+        self.labels.add(label)
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            tracemalloc.Filter(False, "<unknown>")))
+        sites: Dict[str, List[int]] = {}
+        for stat in snapshot.statistics('traceback'):
+            # attributed to the innermost frame of the manager, allocations in the standard library are too generic
+            frame = next((frame for frame in reversed(stat.traceback) if frame.filename.startswith(ROOT)),
+                         stat.traceback[-1])
+            site = sites.setdefault(f"{os.path.relpath(frame.filename, ROOT)}:{frame.lineno}", [0, 0])
+            site[0] += stat.size
+            site[1] += stat.count
+        objects = Counter(type(obj).__name__ for obj in gc.get_objects())
+        report = {
+            'label': label,
+            'current': current,
+            'peak': peak,
+            'objects': {name: objects[name] for name in MEMORY_TYPES},
+            'sites': sorted(((site, size, count) for site, (size, count) in sites.items()),
+                            key=lambda site: site[1], reverse=True)[:self.top]
+        }
+        self.write(report)
+        self.reports.append(report)
+        return report
+
+    @staticmethod
+    def format(report: Dict[str, Any]) -> str:
+        lines = [f"memory after {report['label']}: {report['current'] / 1048576:.1f} MB traced, "
+                 f"peak {report['peak'] / 1048576:.1f} MB",
+                 "objects: " + ", ".join(f"{name} {count}" for name, count in report['objects'].items()),
+                 "top allocation sites:"]
+        lines.extend(f"{size / 1024:10.1f} KB {count:8} blocks  {site}" for site, size, count in report['sites'])
+        return '\n'.join(lines) + '\n'
+
+    def write(self, report: Dict[str, Any]) -> None:
+        if not self.output or self.output == '-':
+            print(self.format(report))
+            return
+        try:
+            with open(self.output, 'a' if self.reports else 'w', encoding='utf-8') as file:
+                file.write(self.format(report) + '\n')
+        except OSError as e:
+            print(f"could not write memory profile: {e}")
+
+
+def traced(name: str, detail: Optional[Callable[..., Any]] = None):
+    '''Decorator recording every call of the function as a span while tracing is enabled.
+    detail is called with the positional arguments of the function and its result is added to the span'''
+    def decorate(f):
+        @wraps(f)
+        def wrapped(*args, **kwargs):
+            if not TRACER.enabled:
+                return f(*args, **kwargs)
+            start = perf_counter()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                TRACER.record(name, start, perf_counter(),
+                              {'detail': str(detail(*args))} if detail else None)
+        return wrapped
+    return decorate
+
+
+def writeReport(filename: str, text: str) -> None:
+    '''Writes to a copy first, so readers waiting for the file never see it partially written'''
+    with open(filename + '.new', 'w', encoding='utf-8') as file:
+        file.write(text)
+    os.replace(filename + '.new', filename)
+
+
+TIMELINE = StartupTimeline()
+TRACER = Tracer()
+MEMORY = MemoryProfile()
@@ -0,0 +1,153 @@
+'''Settings document'''
+# pylint: disable=invalid-name
+
+from typing import Dict, List, Optional, Tuple
+
+
+def sectionName(header: str) -> str:
+    '''Strips any number of brackets from either side of a section header'''
+    return header.strip().lstrip("[").rstrip("]")
+
+
+def isSectionHeader(line: str) -> bool:
+    line = line.strip()
+    return line[:1] == "[" and line[-1:] == "]"
+
+
+class SettingsDocument:
+    '''Line-level document of an ini-style settings file like user.settings.
+    Options are indexed by (section, option) and only the lines of changed options are rewritten,
+    all other lines including comments and ordering are kept verbatim'''
+
+    def __init__(self, text: str = ''):
+        self.lines: List[Optional[str]] = text.splitlines(keepends=True)
+        self.newline = '\r\n' if '\r\n' in text else '\n'
+        self.headers: Dict[str, int] = {}
+        self.ends: Dict[str, int] = {}
+        self.options: Dict[Tuple[str, str], List[int]] = {}
+        self.added: Dict[str, Dict[str, str]] = {}
+        self.changed = False
+        section = None
+        for index, line in enumerate(self.lines):
+            stripped = str(line).strip()
+            if isSectionHeader(stripped):
+                section = sectionName(stripped)
+                if section not in self.headers:
+                    self.headers[section] = index
+                self.ends[section] = index
+            elif section is not None and stripped and stripped[0] not in ';#':
+                self.ends[section] = index
+                if '=' in stripped:
+                    option = stripped.split('=', 1)[0].strip()
+                    self.options.setdefault((section, option), []).append(index)
+
+    def sections(self) -> List[str]:
+        return list(self.headers) + [section for section in self.added if section not in self.headers]
+
+    def has(self, section: str, option: str) -> bool:
+        return (section, option) in self.options or option in self.added.get(section, {})
+
+    def get(self, section: str, option: str) -> Optional[str]:
+        if option in self.added.get(section, {}):
+            return self.added[section][option]
+        indices = self.options.get((section, option))
+        if indices:
+            return str(self.lines[indices[-1]]).split('=', 1)[1].strip()
+        return None
+
+    def set(self, section: str, option: str, value: str) -> None:
+        '''Sets the option, rewriting only its own line or adding a line to the end of the section'''
+        indices = self.options.get((section, option))
+        if indices:
+            index = indices[-1]
+            line = str(self.lines[index])
+            ending = line[len(line.rstrip('\r\n')):]
+            newline = option + '=' + value + ending
+            if line != newline:
+                self.lines[index] = newline
+                self.changed = True
+            for duplicate in indices[:-1]:
+                self.lines[duplicate] = None
+                self.changed = True
+            self.options[(section, option)] = [index]
+        elif self.added.get(section, {}).get(option) != value:
+            self.added.setdefault(section, {})[option] = value
+            self.changed = True
+
+    def remove(self, section: str, option: str) -> bool:
+        '''Removes the option, returns whether it existed'''
+        removed = False
+        for index in self.options.pop((section, option), []):
+            self.lines[index] = None
+            removed = True
+        if option in self.added.get(section, {}):
+            del self.added[section][option]
+            removed = True
+        self.changed = self.changed or removed
+        return removed
+
+    def text(self) -> str:
+        insertions = {index: section for section, index in self.ends.items()
+                      if self.added.get(section)}
+        out: List[str] = []
+        for index, line in enumerate(self.lines):
+            if line is not None:
+                out.append(line)
+            if index in insertions:
+                self.appendOptions(out, self.added[insertions[index]])
+        for section, options in self.added.items():
+            if section not in self.headers and options:
+                if out:
+                    self.terminate(out)
+                    if out[-1].strip():
+                        out.append(self.newline)
+                out.append('[' + section + ']' + self.newline)
+                self.appendOptions(out, options)
+        return ''.join(out)
+
+    def fixDuplicateBrackets(self) -> bool:
+        '''Rewrites section headers with duplicate brackets like [[Section]] or [Section]] to [Section].
+        Sections that also exist with correct brackets are dropped. Returns whether anything changed
+
+        >>> document = SettingsDocument('[Foo]]\\na=1\\n[[Bar]\\nb=2\\n[Baz]\\nc=3\\n[[Baz]]\\nd=4\\n')
+        >>> document.fixDuplicateBrackets()
+        True
+        >>> document.text()
+        '[Foo]\\na=1\\n[Bar]\\nb=2\\n[Baz]\\nc=3\\n'
+        '''
+        proper = set(sectionName(str(line)) for line in self.lines
+                     if line is not None and isSectionHeader(line) and sectionName(line) == line.strip()[1:-1])
+        out: List[str] = []
+        dropping = False
+        fixed = False
+        for line in self.lines:
+            if line is None:
+                continue
+            stripped = line.strip()
+            if isSectionHeader(stripped):
+                dropping = False
+                if stripped[:2] == '[[' or stripped[-2:] == ']]':
+                    fixed = True
+                    name = sectionName(stripped)
+                    if name in proper:
+                        dropping = True
+                        continue
+                    proper.add(name)
+                    line = '[' + name + ']' + line[len(line.rstrip('\r\n')):]
+            if not dropping:
+                out.append(line)
+        if fixed:
+            added = self.added
+            self.__init__(''.join(out))  # pylint: disable=unnecessary-dunder-call
+            self.added = added
+            self.changed = True
+        return fixed
+
+    def terminate(self, out: List[str]) -> None:
+        if out and not out[-1].endswith('\n'):
+            out[-1] += self.newline
+
+    def appendOptions(self, out: List[str], options: Dict[str, str]) -> None:
+        self.terminate(out)
+        for option, value in options.items():
+            out.append(option + '=' + value + self.newline)
@@ -1,22 +1,25 @@
 '''Global Helpers'''
 # pylint: disable=invalid-name,superfluous-parens,missing-docstring,wildcard-import,unused-wildcard-import,import-outside-toplevel
 
+import codecs
+import hashlib
 import os
 import re
 import subprocess
 import sys
 import traceback
 import webbrowser
-from configparser import ConfigParser
 from platform import python_version
 from shutil import copytree, rmtree
 from sys import platform
 from threading import Timer
-from typing import Any, Callable
+from typing import Any, Callable, Dict, Optional, Tuple
 
 from PySide2 import QtGui, __version__
 from PySide2.QtWidgets import QFileDialog, QMessageBox
 
+from src.util.profiling import traced
+
 
 def formatUserError(error: Exception) -> str:
     from src.globals import data
@@ -194,6 +197,7 @@ def openFolder(path: str):
         os.startfile(path, "explore")
 
 
+@traced("copyFolder", lambda src, dst: src)
 def copyFolder(src, dst):
     '''Copy folder from src to dst'''
     dst = os.path.normpath(dst)
@@ -240,16 +244,31 @@ def getFile(parent=None, directory="", extensions="", title=None) -> list[str]:
     return [normalizePath(file) for file in result if os.path.isfile(file)]
 
 
-def getSize(start_path='.'):
-    '''Calculates the size of the selected folder'''
+def getFolderSize(start_path: str) -> int:
+    '''Calculates the size of the selected folder using scandir, returns 0 if it doesn't exist'''
     total_size = 0
-    for dirpath, _, filenames in os.walk(start_path):
-        for f in filenames:
-            fp = os.path.join(dirpath, f)
-            total_size += os.path.getsize(fp)
+    stack = [start_path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        total_size += entry.stat(follow_symlinks=False).st_size
+        except OSError:
+            continue
     return total_size
 
 
+def formatSize(size: int) -> str:
+    '''Formats a size in bytes as KB or MB'''
+    size //= 1024
+    if (size // 1024 == 0):
+        return str(size) + 'KB'
+    return f"{size / 1024:.1f}" + 'MB'
+
+
 def getIcon(filename):
     '''Gets icon from the res folder'''
     icon = QtGui.QIcon()
@@ -287,49 +306,119 @@ def translateToChosenLanguage() -> bool:
         return False
 
 
+ENCODINGS: Dict[str, Tuple[str, str]] = {}
+
+
+def encodingKey(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+@traced("detectEncoding", lambda path: path)
 def detectEncoding(path: str) -> str:
-    import charset_normalizer
-    if os.path.exists(path):
-        with open(path, 'rb') as file:
-            text = file.read()
-            detected = charset_normalizer.detect(
-                text, should_rename_legacy=True)
-            print("detected", path, "as", detected)
-            if detected and "encoding" in detected:
-                if detected["encoding"] == "ascii":
-                    return "utf-8"
-                if float(detected["confidence"]) > 0.5:
-                    return str(detected["encoding"])
+    '''Detects the encoding of a file. Results are cached until the size or modification time of the file changes'''
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return "utf-8"
+    stamp = f"{stat.st_size}:{stat.st_mtime_ns}"
+    cached = ENCODINGS.get(encodingKey(path))
+    if cached and cached[0] == stamp:
+        return cached[1]
+    encoding = detectFileEncoding(path)
+    ENCODINGS[encodingKey(path)] = (stamp, encoding)
+    return encoding
+
+
+def detectFileEncoding(path: str) -> str:
+    with open(path, 'rb') as file:
+        text = file.read()
+        # plain ascii and utf-16 with a byte order mark don't need charset_normalizer, which is slow to import
+        if (text.startswith(codecs.BOM_UTF16_LE) and not text.startswith(codecs.BOM_UTF32_LE)) or \
+                text.startswith(codecs.BOM_UTF16_BE):
+            return "utf-16"
+        if text.isascii():
             return "utf-8"
-    else:
+        import charset_normalizer
+        detected = charset_normalizer.detect(
+            text, should_rename_legacy=True)
+        print("detected", path, "as", detected)
+        if detected and "encoding" in detected:
+            if detected["encoding"] == "ascii":
+                return "utf-8"
+            if float(detected["confidence"]) > 0.5:
+                return str(detected["encoding"])
         return "utf-8"
 
 
+def forgetEncoding(path: Optional[str] = None) -> None:
+    '''Drops the cached encoding of a file, or of all files'''
+    if path is None:
+        ENCODINGS.clear()
+    else:
+        ENCODINGS.pop(encodingKey(path), None)
+
+
+SNIFF_SIZE = 4096
+
+
+def sniffTextFile(path: str, maxSize: int = 0) -> str:
+    '''Checks the size and the first few KB of a file for signs that it can't be a text file.
+    Returns the reason the file should be skipped, or an empty string'''
+    from src.globals.constants import translate
+    try:
+        size = os.path.getsize(path)
+        if maxSize and size > maxSize:
+            return translate("MainWindow", "larger than") + f" {maxSize // 1024}KB"
+        with open(path, 'rb') as file:
+            head = file.read(SNIFF_SIZE)
+    except OSError as e:
+        return str(e)
+    if head.startswith((codecs.BOM_UTF8, codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return ''
+    if b'\0' in head:
+        # text without a BOM can still be utf-16, which has NUL bytes in every other position
+        sample = head[:len(head) - len(head) % 2].decode('utf-16', errors='replace')
+        if sample.count('\ufffd') > 1 or any(ord(c) < 32 and c not in '\r\n\t' for c in sample):
+            return translate("MainWindow", "binary content")
+    else:
+        sample = head.decode('latin-1')
+    if size > SNIFF_SIZE and '\n' not in sample:
+        return translate("MainWindow", "no line structure")
+    return ''
+
+
 def fixUserSettingsDuplicateBrackets():
-    '''Fix invalid section names in user.settings'''
+    '''Fix invalid section names in user.settings.
+    Skips files whose content stamp matches the last verified-clean file or that contain no [[ at all'''
     from src.globals import data
+    from src.util.settingsdocument import SettingsDocument
     try:
-        config = ConfigParser(strict=False)
-        config.optionxform = str
-        config.read(data.config.settings + "/user.settings",
-                    encoding=detectEncoding(data.config.settings + "/user.settings"))
-        for section in config.sections():
-            newSection = section
-            while newSection[:1] == "[":
-                newSection = newSection[1:]
-            while newSection[-1:] == "]":
-                newSection = newSection[:-1]
-            if newSection != section:
-                items = config.items(section)
-                if not config.has_section(newSection):
-                    config.add_section(newSection)
-                    for item in items:
-                        config.set(newSection, item[0], item[1])
-                config.remove_section(section)
-        with open(data.config.settings+"/user.settings", 'w', encoding="utf-8") as userfile:
-            config.write(userfile, space_around_delimiters=False)
-            userfile.flush()
-            os.fsync(userfile.fileno())
+        filename = data.config.settings + "/user.settings"
+        if not os.path.isfile(filename):
+            return
+        stat = os.stat(filename)
+        prefix = f"{stat.st_size}:{stat.st_mtime_ns}:"
+        stamp = data.config.usersettingsstamp
+        if stamp.startswith(prefix):
+            return
+        with open(filename, 'rb') as userfile:
+            content = userfile.read()
+        digest = hashlib.sha1(content).hexdigest()
+        if stamp.endswith(":" + digest) or (b"[[" not in content and b"[\x00[" not in content):
+            data.config.usersettingsstamp = prefix + digest
+            return
+        with open(filename, 'r', encoding=detectEncoding(filename)) as userfile:
+            document = SettingsDocument(userfile.read())
+        if document.fixDuplicateBrackets():
+            print("fixing duplicate brackets in user.settings")
+            with open(filename, 'w', encoding="utf-8") as userfile:
+                userfile.write(document.text())
+                userfile.flush()
+                os.fsync(userfile.fileno())
+            with open(filename, 'rb') as userfile:
+                digest = hashlib.sha1(userfile.read()).hexdigest()
+            stat = os.stat(filename)
+        data.config.usersettingsstamp = f"{stat.st_size}:{stat.st_mtime_ns}:{digest}"
     except:
         print("fixing duplicate brackets failed")
 
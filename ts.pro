@@ -1,8 +1,10 @@
 SOURCES         = main.py \
                   src/configuration/config.py \
                   src/core/fetcher.py \
+                  src/core/gameconfig.py \
                   src/core/installer.py \
                   src/core/model.py \
+                  src/core/preflight.py \
                   src/domain/key.py \
                   src/domain/mod.py \
                   src/domain/usersetting.py \
@@ -13,7 +15,10 @@ SOURCES         = main.py \
                   src/gui/file_dialog.py \
                   src/gui/main_widget.py \
                   src/gui/main_window.py \
+                  src/gui/mod_list.py \
+                  src/gui/preflight_dialog.py \
                   src/gui/tree_widget.py \
+                  src/util/iostats.py \
                   src/util/syntax.py \
                   src/util/util.py
 TRANSLATIONS    = English.ts